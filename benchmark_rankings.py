@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+F1 Live Timing - Ranking Tick Benchmark
+Measures calculate_live_rankings latency against fleet size.
+
+Usage:
+    python benchmark_rankings.py --data-dir Truck_Cal/cropped_data --sizes 5 25 100 250 1000
+
+Fleets larger than the recorded session are synthesized by cloning the
+recorded cars with random time shifts. "before" is the original per-car
+DataFrame loop (kept here as a reference implementation, without reset
+handling); "after" is the engine's vectorized tick.
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import config
+from core import F1LiveTiming
+
+
+def build_fleet(data_dir, size, seed=42):
+    """Engine loaded with `size` cars cloned from the recorded session"""
+    engine = F1LiveTiming(data_dir, None)
+    engine.load_car_data()
+    base_cars = list(engine.car_data.values())
+    rng = np.random.default_rng(seed)
+
+    fleet = {}
+    for i in range(size):
+        base = base_cars[i % len(base_cars)]
+        df = base['data'].copy()
+        if i >= len(base_cars):
+            # Shift clones in time so they spread out on track
+            df['timeStamp'] = df['timeStamp'] + pd.Timedelta(seconds=float(rng.uniform(0, 20)))
+        fleet[1000 + i] = {
+            'data': df,
+            'truck_name': f"{base['truck_name']}-{i}",
+            'file_name': base['file_name']
+        }
+
+    engine.car_data = fleet
+    engine.build_telemetry_index()
+    engine.race_start_time = max(car['data']['timeStamp'].min() for car in fleet.values())
+    engine.current_time = engine.race_start_time
+    return engine
+
+
+# ----- Reference (pre-vectorization) implementation -----
+
+def _legacy_distance(df, up_to_time):
+    """Distance from a DataFrame slice (GPS, then speed integration, then x,y)"""
+    car_positions = df.loc[df['timeStamp'] <= up_to_time].copy()
+    if len(car_positions) < 2:
+        return 0.0
+
+    valid_gps = (car_positions['lat'] != 0.0) & (car_positions['lon'] != 0.0) & \
+                (~car_positions['lat'].isna()) & (~car_positions['lon'].isna())
+    if valid_gps.sum() >= 2:
+        gps = car_positions[valid_gps]
+        lat_diff = gps['lat'].diff() * 111000
+        lon_diff = gps['lon'].diff() * 111000 * np.cos(np.radians(gps['lat']))
+        return np.sqrt(lat_diff ** 2 + lon_diff ** 2).sum()
+
+    valid_speed = car_positions['speed'].notna() & (car_positions['speed'] >= 0)
+    if valid_speed.sum() >= 2:
+        speed_data = car_positions[valid_speed].copy()
+        time_diff = speed_data['timeStamp'].diff().dt.total_seconds()
+        return (speed_data['speed'] * 1000 / 3600 * time_diff).sum()
+
+    return np.sqrt(car_positions['x'].diff() ** 2 + car_positions['y'].diff() ** 2).sum()
+
+
+def _legacy_pace(df, reference_time, window_seconds=30):
+    """Windowed mean speed from a DataFrame mask"""
+    start_time = reference_time - pd.Timedelta(seconds=window_seconds)
+    recent = df.loc[(df['timeStamp'] >= start_time) & (df['timeStamp'] <= reference_time)].copy()
+    if len(recent) >= 2 and not recent['speed'].isna().all():
+        return recent['speed'].dropna().mean()
+    row = df.loc[(df['timeStamp'] - reference_time).abs().idxmin()]
+    return 0.0 if pd.isna(row['speed']) else row['speed']
+
+
+def _legacy_gap(leading_pace, following_pace, distance_gap):
+    """Scalar harmonic-mean time gap with pace differential adjustment"""
+    if distance_gap <= 0:
+        return 0.0
+    leading_ms = max(leading_pace * 1000 / 3600, 1)
+    following_ms = max(following_pace * 1000 / 3600, 1)
+    time_gap = distance_gap / (2 / ((1 / leading_ms) + (1 / following_ms)))
+    pace_differential = following_pace - leading_pace
+    if abs(pace_differential) > 2:
+        time_gap *= max(0.6, min(1.5, 1.0 - pace_differential * 0.05))
+    return time_gap
+
+
+def legacy_rankings(engine):
+    """Per-car loop: distance, position and status per car, then pace twice per car for gaps"""
+    synchronized_time = engine.current_time
+    rankings = []
+    for car_id, car_info in engine.car_data.items():
+        df = car_info['data']
+        if synchronized_time < df['timeStamp'].min() or synchronized_time > df['timeStamp'].max():
+            continue
+        row = df.loc[(df['timeStamp'] - synchronized_time).abs().idxmin()]
+        rankings.append({
+            'car_id': car_id,
+            'distance_traveled': _legacy_distance(df, synchronized_time),
+            'current_speed': 0.0 if pd.isna(row['speed']) else row['speed'],
+            'status': engine.status_detector.determine_car_status({'data': df}, synchronized_time)
+        })
+
+    rankings.sort(key=lambda x: x['distance_traveled'], reverse=True)
+    for i in range(1, len(rankings)):
+        car, ahead, leader = rankings[i], rankings[i - 1], rankings[0]
+        for other, key in ((leader, 'gap_to_leader'), (ahead, 'gap_to_ahead')):
+            car[key] = _legacy_gap(
+                _legacy_pace(engine.car_data[other['car_id']]['data'], synchronized_time),
+                _legacy_pace(engine.car_data[car['car_id']]['data'], synchronized_time),
+                other['distance_traveled'] - car['distance_traveled'])
+    return rankings
+
+
+def time_ticks(engine, tick_function, ticks, start_offset, interval=1.0):
+    """Latencies (ms) of consecutive ticks `interval` seconds apart, starting at start_offset race seconds"""
+    latencies = []
+    # Keep the engine's per-tick console output out of the terminal
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(ticks):
+            engine.current_time = engine.race_start_time + pd.Timedelta(seconds=start_offset + i * interval)
+            start = time.perf_counter()
+            tick_function()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ranking tick latency against fleet size')
+    parser.add_argument('--data-dir', default=config.Data.BASE_DIR, help='Directory with session CSV files')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5, 25, 100, 250, 1000],
+                        help='Fleet sizes to benchmark')
+    parser.add_argument('--ticks', type=int, default=10, help='Ticks measured per fleet size')
+    parser.add_argument('--start', type=float, default=600.0, help='Race time (s) of the first measured tick')
+    parser.add_argument('--interval', type=float, default=1.0,
+                        help='Race seconds between ticks (0.1 for a 10 Hz tick rate)')
+    parser.add_argument('--legacy-max', type=int, default=250,
+                        help='Largest fleet for which the per-car reference loop is timed')
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        engine = build_fleet(args.data_dir, size)
+        after = time_ticks(engine, engine.calculate_live_rankings, args.ticks, args.start, args.interval)
+        before = None
+        if size <= args.legacy_max:
+            before = time_ticks(engine, lambda: legacy_rankings(engine), args.ticks, args.start, args.interval)
+        results.append((size, before, after))
+
+    print("=" * 60)
+    print("⏱  Ranking tick latency (median ms over "
+          f"{args.ticks} ticks, {args.interval:g} s apart)")
+    print("=" * 60)
+    print(f"{'cars':>6} {'before':>12} {'after':>12} {'speedup':>10}")
+    for size, before, after in results:
+        after_ms = np.median(after)
+        if before is None:
+            print(f"{size:>6} {'-':>12} {after_ms:>12.2f} {'-':>10}")
+        else:
+            before_ms = np.median(before)
+            print(f"{size:>6} {before_ms:>12.2f} {after_ms:>12.2f} {before_ms / after_ms:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -48,6 +48,17 @@ class F1Config:
         UPDATE_INTERVAL = 1.0  # How often to process data
         BROADCAST_INTERVAL = 2  # How often to send updates to clients
         
+        # Tick scheduling: what to do when a tick overruns its deadline
+        TICK_OVERRUN_POLICY = 'skip'  # 'skip', 'catch_up' or 'stretch'
+        MAX_CATCH_UP_TICKS = 10  # catch_up skips instead when further behind than this
+        
+        # Adaptive tick rate: tick faster during close battles and status changes
+        ADAPTIVE_TICK_RATE = False  # Opt-in; False = always tick every UPDATE_INTERVAL
+        IDLE_TICK_INTERVAL = UPDATE_INTERVAL  # Seconds between ticks when nothing is happening (never slower than fixed)
+        ACTIVE_TICK_INTERVAL = 0.25  # Seconds between ticks at the maximum rate
+        CLOSE_GAP_METERS = 20       # Adjacent distance gap that counts as a battle
+        ACTIVE_HOLD_SECONDS = 5     # Race seconds to stay at the active rate after activity
+        
         # Cache settings
         DISTANCE_CACHE_SIZE = 1000  # Maximum cache entries
         POSITION_CACHE_SIZE = 500
@@ -58,7 +69,80 @@ class F1Config:
         ENABLE_PERFORMANCE_MONITORING = True
         
         # Memory optimization
-        MAX_RANKINGS_HISTORY = 100  # Keep last N ranking snapshots
+        MAX_RANKINGS_HISTORY = 600  # Keep last N ranking snapshots (10 min at 1 s ticks)
+    
+    # ========== SESSION CONFIGURATION ==========
+    class Sessions:
+        """Multiple race sessions hosted in one server"""
+        DEFAULT_SESSION_ID = 'main'  # Session loaded from Data.BASE_DIR, joined by every client on connect
+        MAX_SESSIONS = 4
+        EXTRA_SESSIONS = {}  # session_id -> data directory, created at startup
+    
+    # ========== SCALING CONFIGURATION ==========
+    class Scaling:
+        """Multi-worker fanout: one engine process and web workers sharing a message queue"""
+        MESSAGE_QUEUE = None  # e.g. 'redis://localhost:6379/0'; 'memory://' = in-process stand-in (tests)
+        # Only Redis shares client counts between workers; with other queues (amqp://, ...)
+        # MAX_CLIENTS_TOTAL is not enforced across workers, only MAX_CLIENTS_PER_WORKER
+        ROLE = 'engine'       # 'engine' runs the race and publishes, 'web' only relays to its clients
+        CHANNEL = 'f1-live-timing'
+        MAX_CLIENTS_TOTAL = 1000      # Admission limit across all workers (Performance.MAX_CLIENTS without a queue)
+        MAX_CLIENTS_PER_WORKER = 250
+        ADMISSION_HEARTBEAT_SECONDS = 10  # Counts of workers silent for 3 heartbeats are dropped
+    
+    # ========== BACKPRESSURE CONFIGURATION ==========
+    class Backpressure:
+        """Slow clients: keep only the newest unsent timing frame instead of queueing"""
+        ENABLED = True
+        COALESCED_EVENTS = ('timing_update', 'timing_update_bin')  # Full-state frames only
+        BEHIND_QUEUE_PACKETS = 0        # Behind when more packets than this are still unsent at the next frame
+        DOWNGRADE_AFTER_SECONDS = 10    # Behind this long -> reduced-rate stream
+        REDUCED_INTERVAL_SECONDS = 5    # One frame per this many seconds on the reduced stream
+        RECOVER_AFTER_SECONDS = 30      # Keeping up this long -> back to every frame
+        FLUSH_INTERVAL_SECONDS = 0.1    # How often parked frames are retried
+    
+    # ========== COMPRESSION CONFIGURATION ==========
+    class Compression:
+        """Negotiated gzip/brotli compression of HTTP responses"""
+        ENABLED = True
+        LEVEL = 6           # gzip level (1 fastest - 9 smallest)
+        BROTLI_QUALITY = 5  # brotli quality (0-11), used when the optional brotli package is installed
+        MIN_SIZE = 1024     # Bodies smaller than this many bytes are sent as is (Engine.IO polling too)
+        MIMETYPES = ('application/json', 'text/html', 'text/css', 'application/javascript')
+    
+    # ========== STREAMING CONFIGURATION ==========
+    class Streaming:
+        """Server-Sent Events stream of timing updates (/stream/timing)"""
+        MAX_SSE_CLIENTS = 1000
+        KEEPALIVE_SECONDS = 15   # Comment line sent when no update arrived for this long
+        RETRY_MILLISECONDS = 3000  # Reconnect delay suggested to EventSource clients
+    
+    # ========== PROTOCOL CONFIGURATION ==========
+    class Protocol:
+        """Wire format of timing updates"""
+        KEYFRAME_INTERVAL = 10  # Delta subscribers get a full keyframe every N frames
+        # Decimals kept for float car fields in delta frames ('*' = any other float field)
+        DELTA_PRECISION = {'lat': 6, 'lon': 6, 'race_time': 3, '*': 2}
+        ALLOW_MSGPACK = True  # Clients connecting with encoding=msgpack get binary columnar frames
+    
+    # ========== HIGH FREQUENCY CONFIGURATION ==========
+    class HighFrequency:
+        """Sub-second race steps with telemetry interpolated between samples"""
+        ENABLED = False
+        SUBSTEP_SECONDS = 0.125     # Longest race-time step computed between ticks (8 Hz telemetry)
+        MAX_SUBSTEPS_PER_TICK = 80  # 10x speed with 1 s ticks needs 80 steps of 0.125 s
+        CPU_BUDGET_FRACTION = 0.5   # Share of the tick interval intermediate steps may use
+        MAX_REPORTED_OVERTAKES = 50  # Overtakes (ticks and substeps) kept for the next broadcast
+    
+    # ========== REPLAY CONFIGURATION ==========
+    class Replay:
+        """Precomputed replay timeline settings"""
+        USE_PRECOMPUTED_TIMELINE = False  # Serve ticks from a precomputed timeline file
+        PRECOMPUTE_IN_BACKGROUND = True   # Build a missing timeline while serving live ticks
+        TIMELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.timeline_cache')
+        TIMELINE_STEP_SECONDS = 0.5       # Race seconds between precomputed ticks
+        BUILD_TIMELINE_FOR_CURSORS = True  # Precompute the timeline when a client opens its own cursor
+        CURSOR_FRAME_CACHE_SIZE = 4096    # Shared frames kept for per-client replay cursors
     
     # ========== SIMULATION CONFIGURATION ==========
     class Simulation:
@@ -107,6 +191,7 @@ class F1Config:
         # Update thresholds
         SIGNIFICANT_SPEED_CHANGE = 5  # km/h - triggers ranking update
         SIGNIFICANT_POSITION_CHANGE = 1  # positions
+        POSITION_CHANGE_WINDOW_SECONDS = 30  # Race time compared for position_change/trend
         
         # Interval calculations
         ENABLE_TIME_GAPS = True
@@ -269,6 +354,12 @@ class F1Config:
         if cls.Performance.UPDATE_INTERVAL <= 0:
             issues.append("UPDATE_INTERVAL must be positive")
         
+        # Check scaling settings
+        if cls.Scaling.ROLE not in ('engine', 'web'):
+            issues.append("Scaling.ROLE must be 'engine' or 'web'")
+        if cls.Scaling.ROLE == 'web' and not cls.Scaling.MESSAGE_QUEUE:
+            issues.append("Scaling.ROLE 'web' needs a Scaling.MESSAGE_QUEUE")
+        
         return issues
     
     @classmethod
@@ -277,7 +368,11 @@ class F1Config:
         print("=== F1 Live Timing Configuration Summary ===")
         print(f"Server: {cls.Server.HOST}:{cls.Server.PORT}")
         print(f"Data Directory: {cls.Data.BASE_DIR}")
-        print(f"Max Clients: {cls.Performance.MAX_CLIENTS}")
+        if cls.Scaling.MESSAGE_QUEUE:
+            print(f"Message Queue: {cls.Scaling.MESSAGE_QUEUE} (role: {cls.Scaling.ROLE})")
+            print(f"Max Clients: {cls.Scaling.MAX_CLIENTS_TOTAL} total, {cls.Scaling.MAX_CLIENTS_PER_WORKER} per worker")
+        else:
+            print(f"Max Clients: {cls.Performance.MAX_CLIENTS}")
         print(f"Default Speed: {cls.Simulation.DEFAULT_SPEED}x")
         print(f"Update Interval: {cls.Performance.UPDATE_INTERVAL}s")
         print(f"Theme: {cls.UI.DEFAULT_THEME}")
@@ -7,5 +7,11 @@ from .timing_engine import F1LiveTiming
 from .performance_monitor import monitor_performance, PerformanceMonitor
 from .car_status import CarStatusDetector
 from .forecasting import OvertakingForecaster
+from .telemetry_index import CarTelemetry, FleetTelemetry
+from .ranking_order import IncrementalRanking
+from .ranking_history import RankingHistory
+from .session_manager import SessionManager
 
-__all__ = ['F1LiveTiming', 'monitor_performance', 'PerformanceMonitor', 'CarStatusDetector', 'OvertakingForecaster']
+__all__ = ['F1LiveTiming', 'monitor_performance', 'PerformanceMonitor', 'CarStatusDetector', 'OvertakingForecaster',
+           'CarTelemetry', 'FleetTelemetry', 'IncrementalRanking',
+           'RankingHistory', 'SessionManager']
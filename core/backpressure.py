@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Backpressure Module
+Socket.IO client manager that coalesces timing frames for slow clients:
+a client that has not drained its previous frames keeps only the newest
+pending one, and a client that stays behind is downgraded to a
+reduced-rate stream until it keeps up again
+"""
+
+import threading
+import time
+
+import socketio
+from engineio import packet as eio_packet
+from socketio import packet
+
+from config import config
+
+
+class ClientSendState:
+    """Send state of one client (Engine.IO session) for coalesced events"""
+
+    def __init__(self, sid):
+        self.sid = sid
+        self.pending = None  # Engine.IO packets of the newest unsent frame
+        self.mode = 'full'
+        self.sent = 0
+        self.dropped = 0
+        self.downgrades = 0
+        self.last_sent = 0.0
+        self.behind_since = None
+        self.caught_up_since = None
+
+    def to_dict(self):
+        return {
+            'sid': self.sid,
+            'mode': self.mode,
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'pending': self.pending is not None,
+            'downgrades': self.downgrades
+        }
+
+
+class CoalescingManager(socketio.Manager):
+    """Client manager whose timing frames never queue up behind a slow client.
+
+    Every Engine.IO socket has its own outgoing queue. When a coalesced
+    event (Backpressure.COALESCED_EVENTS, full-state frames only: dropping
+    one loses nothing the next one does not carry) is emitted while a
+    client still has unsent packets, the frame is parked as the client's
+    pending frame instead, replacing (dropping) any older pending frame. A
+    flush loop sends pending frames once the socket has drained.
+
+    A client that is behind for DOWNGRADE_AFTER_SECONDS is sent at most one
+    frame every REDUCED_INTERVAL_SECONDS, and goes back to every frame after
+    keeping up for RECOVER_AFTER_SECONDS; it is told with a stream_rate
+    event each time.
+    """
+
+    def __init__(self):
+        super().__init__()
+        settings = config.Backpressure
+        self.coalescing = settings.ENABLED
+        self.coalesced_events = frozenset(settings.COALESCED_EVENTS)
+        self.behind_queue_packets = settings.BEHIND_QUEUE_PACKETS
+        self.downgrade_after = settings.DOWNGRADE_AFTER_SECONDS
+        self.reduced_interval = settings.REDUCED_INTERVAL_SECONDS
+        self.recover_after = settings.RECOVER_AFTER_SECONDS
+        self.flush_interval = settings.FLUSH_INTERVAL_SECONDS
+        self.send_states = {}  # eio_sid -> ClientSendState
+        self._send_lock = threading.Lock()
+
+    def initialize(self):
+        super().initialize()
+        if self.coalescing:
+            self.server.start_background_task(self._flush_loop)
+
+    def emit(self, event, data, namespace, room=None, skip_sid=None,
+             callback=None, to=None, **kwargs):
+        if not self.coalescing or callback or event not in self.coalesced_events:
+            return super().emit(event, data, namespace, room=room, skip_sid=skip_sid,
+                                callback=callback, to=to, **kwargs)
+
+        room = to or room
+        if namespace not in self.rooms:
+            return
+        data = list(data) if isinstance(data, tuple) else [data]
+        if not isinstance(skip_sid, list):
+            skip_sid = [skip_sid]
+
+        # Encoded once like Manager.emit, then offered to each client
+        encoded = self.server.packet_class(packet.EVENT, namespace=namespace, data=[event] + data).encode()
+        if not isinstance(encoded, list):
+            encoded = [encoded]
+        packets = [eio_packet.Packet(eio_packet.MESSAGE, p) for p in encoded]
+
+        now = time.monotonic()
+        with self._send_lock:
+            for sid, eio_sid in self.get_participants(namespace, room):
+                if sid not in skip_sid:
+                    self._offer(sid, eio_sid, packets, now)
+
+    def _backlog(self, eio_sid):
+        """Packets still waiting in a client's outgoing queue (0 when unknown)"""
+        try:
+            socket = self.server.eio.sockets.get(eio_sid)
+        except AttributeError:
+            return 0
+        return socket.queue.qsize() if socket is not None else 0
+
+    def _offer(self, sid, eio_sid, packets, now):
+        state = self.send_states.get(eio_sid)
+        if state is None:
+            state = self.send_states[eio_sid] = ClientSendState(sid)
+
+        if state.pending is not None:
+            state.dropped += 1  # Superseded before it could be sent
+        state.pending = packets
+
+        behind = self._backlog(eio_sid) > self.behind_queue_packets
+        if behind:
+            state.caught_up_since = None
+            if state.behind_since is None:
+                state.behind_since = now
+            elif state.mode == 'full' and now - state.behind_since >= self.downgrade_after:
+                self._set_mode(state, eio_sid, 'reduced')
+            return
+
+        state.behind_since = None
+        if state.mode == 'reduced':
+            if state.caught_up_since is None:
+                state.caught_up_since = now
+            elif now - state.caught_up_since >= self.recover_after:
+                self._set_mode(state, eio_sid, 'full')
+            if now - state.last_sent < self.reduced_interval:
+                return  # The flush loop sends it when the interval is up
+        self._send_pending(state, eio_sid, now)
+
+    def _send_pending(self, state, eio_sid, now):
+        for pkt in state.pending:
+            self.server._send_eio_packet(eio_sid, pkt)
+        state.pending = None
+        state.sent += 1
+        state.last_sent = now
+
+    def _set_mode(self, state, eio_sid, mode):
+        state.mode = mode
+        state.behind_since = None
+        state.caught_up_since = None
+        if mode == 'reduced':
+            state.downgrades += 1
+        interval = self.reduced_interval if mode == 'reduced' else None
+        self.server._send_packet(eio_sid, self.server.packet_class(
+            packet.EVENT, data=['stream_rate', {'mode': mode, 'interval': interval}]))
+        print(f"🐢 Client {state.sid} switched to the {mode} timing stream")
+
+    def _flush_loop(self):
+        """Send parked frames of clients that have drained their queue"""
+        while True:
+            self.server.sleep(self.flush_interval)
+            now = time.monotonic()
+            with self._send_lock:
+                for eio_sid, state in list(self.send_states.items()):
+                    if state.pending is None or self._backlog(eio_sid) > self.behind_queue_packets:
+                        continue
+                    if state.mode == 'reduced' and now - state.last_sent < self.reduced_interval:
+                        continue
+                    self._send_pending(state, eio_sid, now)
+
+    def disconnect(self, sid, namespace, **kwargs):
+        eio_sid = self.eio_sid_from_sid(sid, namespace or '/')
+        with self._send_lock:
+            self.send_states.pop(eio_sid, None)
+        return super().disconnect(sid, namespace, **kwargs)
+
+    def get_backpressure_stats(self):
+        """Per-client send state and totals for monitoring"""
+        clients = [state.to_dict() for state in list(self.send_states.values())]
+        return {
+            'enabled': self.coalescing,
+            'coalesced_events': sorted(self.coalesced_events),
+            'reduced_clients': sum(1 for client in clients if client['mode'] == 'reduced'),
+            'dropped_frames': sum(client['dropped'] for client in clients),
+            'clients': clients
+        }
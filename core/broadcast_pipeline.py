@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Broadcast Pipeline Module
+Decouples ranking computation from network fanout with a latest-value queue
+"""
+
+import threading
+import time
+
+
+class LatestValueQueue:
+    """Size-1 queue: putting a value replaces one that has not been taken yet"""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._value = None
+        self._has_value = False
+        self._closed = False
+        self.put_count = 0
+        self.replaced_count = 0  # Values overwritten before the consumer took them
+
+    def put(self, value):
+        """Offer the newest value (never blocks)"""
+        with self._condition:
+            if self._has_value:
+                self.replaced_count += 1
+            self._value = value
+            self._has_value = True
+            self.put_count += 1
+            self._condition.notify()
+
+    def get(self):
+        """Wait for a value; returns None once closed and drained"""
+        with self._condition:
+            while not self._has_value and not self._closed:
+                self._condition.wait()
+            if not self._has_value:
+                return None
+            value = self._value
+            self._value = None
+            self._has_value = False
+            return value
+
+    def close(self):
+        """Wake the consumer; a pending value is still handed out"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class BroadcastStage:
+    """Thread emitting (event, payload) pairs taken from a LatestValueQueue"""
+
+    def __init__(self, emit):
+        self.emit = emit
+        self.queue = LatestValueQueue()
+        self.sent_count = 0
+        self.last_emit_ms = 0.0
+        self.max_emit_ms = 0.0
+        self._thread = None
+
+    def start(self):
+        """Start the broadcast thread with a fresh queue"""
+        self.queue = LatestValueQueue()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def publish(self, event, payload):
+        """Hand a payload to the broadcast thread, replacing any unsent one"""
+        self.queue.put((event, payload))
+
+    def stop(self, timeout=None):
+        """Send whatever is pending, then stop the thread"""
+        self.queue.close()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            event, payload = item
+            start = time.perf_counter()
+            try:
+                self.emit(event, payload)
+            except Exception as e:
+                print(f"❌ Broadcast of {event} failed: {str(e)}")
+            self.last_emit_ms = (time.perf_counter() - start) * 1000
+            self.max_emit_ms = max(self.max_emit_ms, self.last_emit_ms)
+            self.sent_count += 1
+
+    def get_stats(self):
+        """Counters for monitoring"""
+        return {
+            'published': self.queue.put_count,
+            'sent': self.sent_count,
+            'replaced_unsent': self.queue.replaced_count,
+            'last_emit_ms': self.last_emit_ms,
+            'max_emit_ms': self.max_emit_ms
+        }
@@ -25,33 +25,25 @@ class CarStatusDetector:
     
     def determine_car_status(self, car_data, current_time):
         """Determine car status based on telemetry data"""
-        df = car_data['data']
+        window = self._window_stats(car_data, current_time)
         
-        # Get recent data within time window
-        window_seconds = self.status_config['status_window_seconds']
-        start_window = current_time - timedelta(seconds=window_seconds)
-        recent_data = df[(df['timeStamp'] >= start_window) & (df['timeStamp'] <= current_time)]
-        
-        if len(recent_data) == 0:
+        if window is None:
             return "OUT"  # No recent data = car retired
         
         # Get current and recent speeds
-        current_speed = recent_data['speed'].iloc[-1] if len(recent_data) > 0 else 0
-        avg_speed = recent_data['speed'].mean()
-        max_speed = recent_data['speed'].max()
+        current_speed = window['current_speed']
+        avg_speed = window['avg_speed']
+        max_speed = window['max_speed']
         
         # Check data continuity
-        last_data_time = df['timeStamp'].max()
-        time_since_last_data = (current_time - last_data_time).total_seconds()
+        time_since_last_data = (current_time - window['last_data_time']).total_seconds()
         
         if time_since_last_data > self.status_config['data_timeout_seconds']:
             return "OUT"
         
         # Position variance check for stopped detection
-        if len(recent_data) > 3:
-            x_variance = recent_data['x'].var()
-            y_variance = recent_data['y'].var()
-            position_variance = x_variance + y_variance
+        if window['data_points'] > 3:
+            position_variance = window['x_variance'] + window['y_variance']
             
             if position_variance < self.status_config['position_variance_threshold']:
                 if avg_speed < self.status_config['stopped_speed_threshold']:
@@ -68,6 +60,114 @@ class CarStatusDetector:
         else:
             return "RUNNING"
     
+    def determine_fleet_status(self, fleet, slots, current_time):
+        """Status of every car in `slots` at once from the fleet telemetry arrays.
+        
+        Same rules as determine_car_status, evaluated on all status windows
+        together instead of one car at a time.
+        """
+        t_ns = pd.Timestamp(current_time).value
+        window_ns = int(self.status_config['status_window_seconds'] * 1e9)
+        lo, hi = fleet.window(t_ns - window_ns, t_ns)
+        lo, hi = lo[slots], hi[slots]
+        counts = hi - lo
+        cars = len(slots)
+        
+        # Rows of every window laid end to end, tagged with their car
+        segment = np.repeat(np.arange(cars), counts)
+        rows = np.arange(counts.sum()) + np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        
+        speeds = fleet.speed[rows]
+        avg_speed, _ = self._segment_mean(speeds, segment, cars)
+        max_speed = np.full(cars, np.nan)
+        valid = ~np.isnan(speeds)
+        np.fmax.at(max_speed, segment[valid], speeds[valid])
+        current_speed = np.where(counts > 0, fleet.speed[np.maximum(hi - 1, 0)], np.nan)
+        position_variance = self._segment_variance(fleet.x[rows], segment, cars) + \
+                            self._segment_variance(fleet.y[rows], segment, cars)
+        time_since_last_data = (t_ns - fleet.last_timestamps[slots]) / 1e9
+        
+        stopped_threshold = self.status_config['stopped_speed_threshold']
+        out = (counts == 0) | (time_since_last_data > self.status_config['data_timeout_seconds'])
+        parked = (counts > 3) & \
+                 (position_variance < self.status_config['position_variance_threshold']) & \
+                 (avg_speed < stopped_threshold)
+        slow = current_speed < stopped_threshold
+        
+        statuses = np.select(
+            [out, parked, slow & (max_speed < 10), slow, avg_speed < self.status_config['pit_speed_threshold']],
+            ["OUT", "STOPPED", "STOPPED", "PIT", "PIT"],
+            "RUNNING"
+        )
+        return statuses.tolist()
+    
+    @staticmethod
+    def _segment_mean(values, segment, count):
+        """Per-segment mean skipping NaN (NaN for segments without values) and sample counts"""
+        valid = ~np.isnan(values)
+        samples = np.bincount(segment[valid], minlength=count)
+        sums = np.bincount(segment[valid], values[valid], minlength=count)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(samples > 0, sums / np.maximum(samples, 1), np.nan), samples
+    
+    @classmethod
+    def _segment_variance(cls, values, segment, count):
+        """Per-segment sample variance skipping NaN, like pandas var()"""
+        means, samples = cls._segment_mean(values, segment, count)
+        valid = ~np.isnan(values)
+        deviations = values[valid] - means[segment[valid]]
+        squares = np.bincount(segment[valid], deviations ** 2, minlength=count)
+        return np.where(samples >= 2, squares / np.maximum(samples - 1, 1), np.nan)
+    
+    def _window_stats(self, car_data, current_time):
+        """Speed and position statistics over the status window (None if no data).
+        
+        Uses the car's telemetry index when available; NaN handling matches
+        pandas (missing samples skipped, all-missing gives NaN).
+        """
+        window_seconds = self.status_config['status_window_seconds']
+        start_window = current_time - timedelta(seconds=window_seconds)
+        telemetry = car_data.get('telemetry')
+        
+        if telemetry is None:
+            df = car_data['data']
+            recent_data = df[(df['timeStamp'] >= start_window) & (df['timeStamp'] <= current_time)]
+            if len(recent_data) == 0:
+                return None
+            return {
+                'data_points': len(recent_data),
+                'current_speed': recent_data['speed'].iloc[-1],
+                'avg_speed': recent_data['speed'].mean(),
+                'max_speed': recent_data['speed'].max(),
+                'x_variance': recent_data['x'].var(),
+                'y_variance': recent_data['y'].var(),
+                'last_data_time': df['timeStamp'].max()
+            }
+        
+        lo, hi = telemetry.window(pd.Timestamp(start_window).value, pd.Timestamp(current_time).value)
+        if hi == lo:
+            return None
+        
+        speeds = telemetry.speed[lo:hi]
+        valid_speeds = speeds[~np.isnan(speeds)]
+        return {
+            'data_points': hi - lo,
+            'current_speed': speeds[-1],
+            'avg_speed': valid_speeds.mean() if len(valid_speeds) else np.nan,
+            'max_speed': valid_speeds.max() if len(valid_speeds) else np.nan,
+            'x_variance': self._sample_variance(telemetry.x[lo:hi]),
+            'y_variance': self._sample_variance(telemetry.y[lo:hi]),
+            'last_data_time': pd.Timestamp(int(telemetry.timestamps[-1]))
+        }
+    
+    @staticmethod
+    def _sample_variance(values):
+        """Sample variance skipping NaN (NaN with fewer than two values), like pandas var()"""
+        values = values[~np.isnan(values)]
+        if len(values) < 2:
+            return np.nan
+        return values.var(ddof=1)
+    
     def get_status_details(self, car_data, current_time):
         """Get detailed status information for a car"""
         status = self.determine_car_status(car_data, current_time)
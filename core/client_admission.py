@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Client Admission Module
+Connection limits for one Socket.IO worker and across all the workers
+that share a message queue
+"""
+
+import threading
+import uuid
+
+try:
+    import redis
+except ImportError:  # Optional: only needed when the workers share a Redis queue
+    redis = None
+
+
+class LocalAdmissionStore:
+    """Client counts per worker kept in this process.
+
+    Workers in one process (the in-process queue stand-in) that use the
+    same key share one store.
+    """
+
+    _stores = {}
+    _stores_lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, key):
+        """The store of `key` in this process"""
+        with cls._stores_lock:
+            return cls._stores.setdefault(key, cls())
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def try_add(self, worker_id, limit):
+        with self._lock:
+            if sum(self._counts.values()) >= limit:
+                return False
+            self._counts[worker_id] = self._counts.get(worker_id, 0) + 1
+            return True
+
+    def remove(self, worker_id):
+        with self._lock:
+            if self._counts.get(worker_id, 0) > 0:
+                self._counts[worker_id] -= 1
+
+    def heartbeat(self, worker_id):
+        pass
+
+    def drop_worker(self, worker_id):
+        with self._lock:
+            self._counts.pop(worker_id, None)
+
+    def total(self):
+        with self._lock:
+            return sum(self._counts.values())
+
+
+# Drops the counts of workers whose heartbeat expired, then admits the
+# client if the total is below the limit. KEYS[1] = hash of worker -> count,
+# ARGV = worker id, limit, heartbeat key prefix
+_REDIS_TRY_ADD = """
+local total = 0
+for _, worker in ipairs(redis.call('HKEYS', KEYS[1])) do
+    if redis.call('EXISTS', ARGV[3] .. worker) == 0 then
+        redis.call('HDEL', KEYS[1], worker)
+    else
+        total = total + tonumber(redis.call('HGET', KEYS[1], worker))
+    end
+end
+if total >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+return 1
+"""
+
+
+class RedisAdmissionStore:
+    """Client counts per worker in a Redis hash shared by every worker.
+
+    Each worker refreshes a heartbeat key; counts of workers that stopped
+    refreshing it (crashed processes) are dropped at the next admission.
+    """
+
+    def __init__(self, url, key, heartbeat_ttl=30):
+        if redis is None:
+            raise RuntimeError("The redis package is required for a Redis admission store")
+        self.redis = redis.Redis.from_url(url)
+        self.key = key
+        self.heartbeat_prefix = f"{key}:alive:"
+        self.heartbeat_ttl = heartbeat_ttl
+        self._try_add = self.redis.register_script(_REDIS_TRY_ADD)
+
+    def try_add(self, worker_id, limit):
+        return bool(self._try_add(keys=[self.key], args=[worker_id, limit, self.heartbeat_prefix]))
+
+    def remove(self, worker_id):
+        if self.redis.hincrby(self.key, worker_id, -1) < 0:
+            self.redis.hset(self.key, worker_id, 0)
+
+    def heartbeat(self, worker_id):
+        self.redis.set(self.heartbeat_prefix + worker_id, 1, ex=self.heartbeat_ttl)
+
+    def drop_worker(self, worker_id):
+        self.redis.hdel(self.key, worker_id)
+        self.redis.delete(self.heartbeat_prefix + worker_id)
+
+    def total(self):
+        return sum(int(count) for count in self.redis.hvals(self.key))
+
+
+def create_admission_store(url, key):
+    """Admission store shared by the workers of a message queue URL (None = this process only).
+
+    Only Redis shares counts between processes. 'memory://' workers share
+    a store within their process; any other queue (Kombu/AMQP) falls back
+    to a per-process store, so MAX_CLIENTS_TOTAL is not enforced across
+    workers and only the per-worker limit applies.
+    """
+    if url and url.startswith(('redis://', 'rediss://')):
+        return RedisAdmissionStore(url, key)
+    if url and not url.startswith('memory://'):
+        print(f"⚠️ Client admission is per worker with {url.split('://')[0]}:// queues: "
+              f"the total client limit is only enforced across workers with Redis")
+    if url:
+        return LocalAdmissionStore.shared(key)
+    return LocalAdmissionStore()
+
+
+class ClientAdmission:
+    """Admits Socket.IO clients of one worker within a per-worker and a global limit.
+
+    The global limit is checked against the store shared by all workers;
+    with a single worker and a local store both limits are the same.
+    """
+
+    def __init__(self, max_clients, max_worker_clients=None, store=None, worker_id=None):
+        self.max_clients = max_clients
+        self.max_worker_clients = max_worker_clients or max_clients
+        self.store = store or LocalAdmissionStore()
+        self.worker_id = worker_id or uuid.uuid4().hex[:12]
+        self.clients = set()
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self.store.heartbeat(self.worker_id)
+
+    def try_admit(self, sid):
+        """Admit a client; False when this worker or the whole tier is full"""
+        with self._lock:
+            if len(self.clients) >= self.max_worker_clients \
+                    or not self.store.try_add(self.worker_id, self.max_clients):
+                self.rejected += 1
+                return False
+            self.clients.add(sid)
+            return True
+
+    def release(self, sid):
+        """Forget a disconnected client"""
+        with self._lock:
+            if sid not in self.clients:
+                return
+            self.clients.discard(sid)
+            self.store.remove(self.worker_id)
+
+    def heartbeat(self):
+        """Keep this worker's count alive in a shared store"""
+        self.store.heartbeat(self.worker_id)
+
+    def close(self):
+        """Drop this worker's count (worker shutdown)"""
+        with self._lock:
+            self.clients.clear()
+            self.store.drop_worker(self.worker_id)
+
+    def get_stats(self):
+        """Admission counters for monitoring"""
+        return {
+            'worker_id': self.worker_id,
+            'worker_clients': len(self.clients),
+            'total_clients': self.store.total(),
+            'max_worker_clients': self.max_worker_clients,
+            'max_clients': self.max_clients,
+            'rejected': self.rejected
+        }
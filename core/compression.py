@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Compression Module
+Accept-Encoding negotiation, gzip/brotli body compression and per-endpoint
+byte counters for HTTP responses
+"""
+
+import gzip
+import threading
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only when brotli is not installed
+    brotli = None
+
+
+def available_encodings():
+    """Content encodings this server can produce, best first"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def negotiate_encoding(accept_encoding, available=None):
+    """Best of the available encodings the client accepts (None = send identity)"""
+    available = available or available_encodings()
+    accepted = {}
+    for item in (accept_encoding or '').split(','):
+        parts = item.strip().split(';')
+        name = parts[0].strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+
+    best = None
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return best[0] if best else None
+
+
+def compress(body, encoding, level):
+    """body compressed with `encoding` at `level` (gzip 1-9, brotli 0-11)"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class CompressionStats:
+    """Uncompressed and sent bytes per endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, encoding, uncompressed, sent):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    'responses': 0, 'compressed_responses': 0,
+                    'uncompressed_bytes': 0, 'sent_bytes': 0, 'encodings': {}
+                }
+            stats['responses'] += 1
+            stats['uncompressed_bytes'] += uncompressed
+            stats['sent_bytes'] += sent
+            if encoding:
+                stats['compressed_responses'] += 1
+                stats['encodings'][encoding] = stats['encodings'].get(encoding, 0) + 1
+
+    def get_stats(self):
+        """Byte counters and saving per endpoint"""
+        with self._lock:
+            endpoints = {name: dict(stats, encodings=dict(stats['encodings']))
+                         for name, stats in self._endpoints.items()}
+        for stats in endpoints.values():
+            uncompressed = stats['uncompressed_bytes']
+            stats['saving'] = round(1 - stats['sent_bytes'] / uncompressed, 3) if uncompressed else 0.0
+        return endpoints
@@ -265,32 +265,30 @@ class DistanceResetHandler:
             last_good_time, last_good_distance = history[-2]  # Skip the problematic one
             
             # Get speed data between last good point and current time
-            df = car_data['data']
-            mask = (df['timeStamp'] > last_good_time) & (df['timeStamp'] <= current_time)
-            speed_data = df.loc[mask].copy()
+            telemetry = car_data.get('telemetry')
+            if telemetry is not None:
+                lo = int(np.searchsorted(telemetry.timestamps, pd.Timestamp(last_good_time).value, side='right'))
+                hi = int(np.searchsorted(telemetry.timestamps, pd.Timestamp(current_time).value, side='right'))
+                times = telemetry.timestamps[lo:hi]
+                speeds = telemetry.speed[lo:hi]
+            else:
+                df = car_data['data']
+                mask = (df['timeStamp'] > last_good_time) & (df['timeStamp'] <= current_time)
+                times = df.loc[mask, 'timeStamp'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+                speeds = df.loc[mask, 'speed'].to_numpy(dtype=np.float64, na_value=np.nan) \
+                    if 'speed' in df.columns else np.zeros(len(times))
             
-            if len(speed_data) == 0:
+            if len(times) == 0:
                 return RecoveryResult(False, 0, 'speed_integration', 0, "No speed data available")
             
-            # Integrate speed over time
-            recovered_distance = last_good_distance
+            # Integrate speed over time: each sample covers the time since the previous row
+            previous_times = np.concatenate(([pd.Timestamp(last_good_time).value], times[:-1]))
+            time_diffs = (times - previous_times) / 1e9
+            valid = ~np.isnan(speeds) & (speeds >= 0)
             
-            for i in range(len(speed_data)):
-                if i == 0:
-                    time_diff = (speed_data.iloc[i]['timeStamp'] - last_good_time).total_seconds()
-                else:
-                    time_diff = (speed_data.iloc[i]['timeStamp'] - speed_data.iloc[i-1]['timeStamp']).total_seconds()
-                
-                speed_kmh = speed_data.iloc[i].get('speed', 0)
-                if pd.isna(speed_kmh) or speed_kmh < 0:
-                    continue
-                    
-                # Apply realistic speed limits
-                speed_kmh = min(speed_kmh, self.speed_anomaly_threshold)
-                
-                speed_ms = speed_kmh * 1000 / 3600
-                distance_increment = speed_ms * time_diff
-                recovered_distance += distance_increment
+            # Apply realistic speed limits
+            speed_ms = np.minimum(speeds[valid], self.speed_anomaly_threshold) * 1000 / 3600
+            recovered_distance = last_good_distance + float(np.sum(speed_ms * time_diffs[valid]))
             
             # Validate result
             if recovered_distance > last_good_distance and recovered_distance < last_good_distance * 3:
@@ -301,7 +299,7 @@ class DistanceResetHandler:
                     0.9,
                     metadata={
                         'last_good_distance': last_good_distance,
-                        'integration_points': len(speed_data),
+                        'integration_points': len(times),
                         'time_span': (current_time - last_good_time).total_seconds()
                     }
                 )
@@ -423,6 +421,11 @@ class DistanceResetHandler:
     def _calculate_gps_distance_from_start(self, car_data: Dict[str, Any], target_time: datetime) -> float:
         """Calculate total distance traveled using GPS coordinates"""
         try:
+            # Precomputed cumulative haversine distance when the car is indexed
+            telemetry = car_data.get('telemetry')
+            if telemetry is not None:
+                return telemetry.gps_distance_at(pd.Timestamp(target_time).value)
+            
             df = car_data['data']
             mask = df['timeStamp'] <= target_time
             gps_data = df.loc[mask].copy()
@@ -488,6 +491,10 @@ class DistanceResetHandler:
     def _get_position_data_at_time(self, car_data: Dict[str, Any], target_time: datetime) -> Optional[Dict[str, Any]]:
         """Get position data at specific time"""
         try:
+            telemetry = car_data.get('telemetry')
+            if telemetry is not None:
+                return telemetry.position_at(pd.Timestamp(target_time).value)
+            
             df = car_data['data']
             time_diff = abs(df['timeStamp'] - target_time)
             if len(time_diff) == 0:
@@ -520,6 +527,11 @@ class DistanceResetHandler:
         if len(history) > max_history:
             history[:] = history[-max_history:]
     
+    def rebuild_history(self, checkpoints: Dict[int, List[Tuple[datetime, float]]]):
+        """Replace the distance history with precomputed readings (after a seek)"""
+        self.distance_history = {car_id: list(readings) for car_id, readings in checkpoints.items()}
+        self.last_good_positions.clear()
+    
     def get_monitoring_status(self) -> Dict[str, Any]:
         """Get comprehensive monitoring status for API endpoint"""
         total_events = len(self.reset_events)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Event Stream Module
+Server-Sent Events fanout of timing snapshots for read-only displays
+"""
+
+import threading
+
+
+def event_id(snapshot):
+    """SSE event id of a snapshot (its ETag without quotes: run prefix and sequence)"""
+    return snapshot.etag.strip('"')
+
+
+def sse_event(snapshot):
+    """timing_update SSE event of a snapshot, encoded once per snapshot"""
+    return snapshot.cached('sse', lambda: (
+        f"id: {event_id(snapshot)}\nevent: timing_update\ndata: {snapshot.json_text}\n\n"
+    ).encode('utf-8'))
+
+
+class SnapshotStream:
+    """Latest published timing snapshot, waited on by SSE connections.
+
+    Connections never queue: each waits for a snapshot newer than the one
+    it sent last, so a slow reader skips straight to the newest state.
+    Every timing_update is the full state, which makes resuming after a
+    reconnect a matter of sending the current snapshot unless the client's
+    Last-Event-ID already names it.
+    """
+
+    def __init__(self, max_clients):
+        self.max_clients = max_clients
+        self._condition = threading.Condition()
+        self.snapshot = None
+        self.clients = 0
+        self.published = 0
+        self.rejected = 0
+        self.resumed = 0
+
+    def publish(self, snapshot):
+        """Wake every connection waiting for a newer snapshot"""
+        with self._condition:
+            if self.snapshot is snapshot:
+                return
+            self.snapshot = snapshot
+            self.published += 1
+            self._condition.notify_all()
+
+    def wait_newer(self, seq, timeout):
+        """Published snapshot with a sequence above `seq`, or None after `timeout` seconds"""
+        with self._condition:
+            if self.snapshot is None or self.snapshot.seq <= seq:
+                self._condition.wait(timeout)
+            snapshot = self.snapshot
+        return snapshot if snapshot is not None and snapshot.seq > seq else None
+
+    def open(self, resumed=False):
+        """Count a new connection (`resumed`: it sent a Last-Event-ID); False when the limit is reached"""
+        with self._condition:
+            if self.clients >= self.max_clients:
+                self.rejected += 1
+                return False
+            self.clients += 1
+            if resumed:
+                self.resumed += 1
+            return True
+
+    def close(self):
+        with self._condition:
+            self.clients -= 1
+
+    def get_stats(self):
+        """Connection counters for monitoring"""
+        return {
+            'clients': self.clients,
+            'max_clients': self.max_clients,
+            'published': self.published,
+            'rejected': self.rejected,
+            'resumed': self.resumed
+        }
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Frame Codec Module
+Delta encoding of timing_update payloads (periodic full keyframes with
+per-car changed-field diffs in between) and the columnar MessagePack
+encoding offered to binary clients
+"""
+
+import threading
+
+try:
+    import msgpack
+except ImportError:  # Optional: binary encoding is only offered when installed
+    msgpack = None
+
+# Per-car fields that carry the same value for every car on a tick; delta
+# frames send them once instead of once per car
+SHARED_CAR_FIELDS = ('race_time', 'timestamp')
+
+
+class DeltaEncoder:
+    """Turns consecutive get_current_data() payloads into numbered frames.
+
+    Frame formats:
+
+    - keyframe: {'type': 'keyframe', 'seq': n, 'data': <full payload>}
+    - delta: {'type': 'delta', 'seq': n, 'meta': {changed top-level fields},
+      'shared': {field: value for every car}, 'cars': [{'car_id', changed
+      fields...}], 'removed': [car_id, ...]}
+
+    A delta applies to the state after frame n - 1; a client that sees a
+    sequence gap asks for a keyframe. Ranking order follows from the
+    'position' field. Float car fields are rounded to `precision` decimals
+    (per field, '*' for the rest) in both frame types, so movement below
+    the display precision sends nothing.
+    """
+
+    def __init__(self, keyframe_interval=10, precision=None):
+        self.keyframe_interval = max(1, int(keyframe_interval))
+        self.precision = precision or {}
+        self._default_precision = self.precision.get('*')
+        self._lock = threading.Lock()
+        self._reset_locked()
+
+    def reset(self):
+        """Drop the reference state; the next frame is a keyframe"""
+        with self._lock:
+            self._reset_locked()
+
+    def _reset_locked(self):
+        self.seq = 0
+        self._meta = None
+        self._cars = None
+        self.keyframes = 0
+        self.deltas = 0
+
+    def encode(self, payload):
+        """Frame for the next payload"""
+        payload = self._quantize(payload)
+        with self._lock:
+            self.seq += 1
+            if self._cars is None or self.seq % self.keyframe_interval == 0:
+                frame = self._keyframe_locked(payload)
+            else:
+                frame = self._delta_locked(payload)
+            self._remember(payload)
+            return frame
+
+    def keyframe(self, payload=None):
+        """Keyframe of the last encoded state (for a new or resyncing client).
+
+        Without a previous frame, `payload` becomes the reference state.
+        """
+        with self._lock:
+            if self._cars is None:
+                if payload is None:
+                    return None
+                self._remember(self._quantize(payload))
+            return {'type': 'keyframe', 'seq': self.seq, 'data': self._state()}
+
+    def _quantize(self, payload):
+        """Copy of the payload with float car fields rounded"""
+        if not self.precision:
+            return payload
+        rankings = []
+        for car in payload.get('rankings', []):
+            rounded = {}
+            for key, value in car.items():
+                decimals = self.precision.get(key, self._default_precision)
+                rounded[key] = round(value, decimals) if decimals is not None and isinstance(value, float) else value
+            rankings.append(rounded)
+        payload = dict(payload)
+        payload['rankings'] = rankings
+        return payload
+
+    def _keyframe_locked(self, payload):
+        self.keyframes += 1
+        return {'type': 'keyframe', 'seq': self.seq, 'data': payload}
+
+    def _delta_locked(self, payload):
+        self.deltas += 1
+        meta = {key: value for key, value in payload.items()
+                if key != 'rankings' and self._meta.get(key) != value}
+
+        rankings = payload.get('rankings', [])
+        shared = {}
+        for field in SHARED_CAR_FIELDS:
+            values = {car.get(field) for car in rankings}
+            if len(values) == 1:
+                shared[field] = values.pop()
+
+        cars = []
+        for car in rankings:
+            previous = self._cars.get(car['car_id'])
+            if previous is None:
+                cars.append(car)
+                continue
+            changed = {key: value for key, value in car.items()
+                       if key not in shared and previous.get(key) != value}
+            if changed:
+                changed['car_id'] = car['car_id']
+                cars.append(changed)
+
+        current_ids = {car['car_id'] for car in rankings}
+        removed = [car_id for car_id in self._cars if car_id not in current_ids]
+        return {'type': 'delta', 'seq': self.seq, 'meta': meta, 'shared': shared,
+                'cars': cars, 'removed': removed}
+
+    def _remember(self, payload):
+        self._meta = {key: value for key, value in payload.items() if key != 'rankings'}
+        self._cars = {car['car_id']: car for car in payload.get('rankings', [])}
+
+    def _state(self):
+        state = dict(self._meta)
+        state['rankings'] = sorted(self._cars.values(), key=lambda car: car.get('position', 0))
+        return state
+
+    def get_stats(self):
+        """Frame counters for monitoring"""
+        return {
+            'seq': self.seq,
+            'keyframe_interval': self.keyframe_interval,
+            'keyframes': self.keyframes,
+            'deltas': self.deltas
+        }
+
+
+def msgpack_available():
+    """Whether the binary encoding can be offered"""
+    return msgpack is not None
+
+
+def to_columnar(payload):
+    """timing_update payload with rankings as one list per field instead of one dict per car"""
+    rankings = payload.get('rankings', [])
+    fields = list(rankings[0].keys()) if rankings else []
+    columnar = {key: value for key, value in payload.items() if key != 'rankings'}
+    columnar['fields'] = fields
+    columnar['columns'] = {field: [car.get(field) for car in rankings] for field in fields}
+    return columnar
+
+
+def encode_msgpack(payload):
+    """Columnar timing_update payload as MessagePack bytes"""
+    return msgpack.packb(to_columnar(payload), use_bin_type=True)
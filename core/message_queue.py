@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Message Queue Module
+Socket.IO client managers for the multi-worker fanout tier: the engine
+process publishes timing updates through a message queue (Redis, or an
+in-process stand-in for tests) and every web worker delivers them to its
+own clients. All of them coalesce timing frames for slow clients
+"""
+
+import inspect
+import queue
+import threading
+
+import socketio
+
+from .backpressure import CoalescingManager
+
+
+class LatestTimingMixin:
+    """Client manager that remembers the last broadcast timing_update.
+
+    Web workers have no engine; they answer connects and request_data with
+    the payload the engine published last to `timing_room` (the default
+    session's room).
+    """
+
+    latest_timing = None
+    timing_room = None
+
+    def _handle_emit(self, message):
+        if message.get('event') == 'timing_update' and message.get('room') == self.timing_room \
+                and not message.get('binary') and len(message.get('data') or []) == 1:
+            self.latest_timing = message['data'][0]
+        super()._handle_emit(message)
+
+
+class InProcessQueueManager(LatestTimingMixin, socketio.PubSubManager, CoalescingManager):
+    """Pub/sub client manager whose queue lives in this process.
+
+    Stand-in for Redis in tests and load tests: several Socket.IO servers
+    in one process (each one a "worker") share a channel. Messages are
+    JSON-encoded on publish like they would be for Redis, so workers only
+    ever see what a real queue would deliver.
+    """
+
+    name = 'memory'
+    _subscribers = {}  # channel -> list of queue.Queue, one per listening manager
+    _subscribers_lock = threading.Lock()
+
+    def __init__(self, channel='socketio', write_only=False, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self._queue = None
+        if not write_only:
+            self._queue = queue.Queue()
+            with self._subscribers_lock:
+                self._subscribers.setdefault(channel, []).append(self._queue)
+
+    def _publish(self, data):
+        message = self.json.dumps(data)
+        for subscriber in list(self._subscribers.get(self.channel, [])):
+            subscriber.put(message)
+
+    def _listen(self):
+        while True:
+            yield self._queue.get()
+
+    def close(self):
+        """Stop receiving messages on the channel"""
+        with self._subscribers_lock:
+            subscribers = self._subscribers.get(self.channel, [])
+            if self._queue in subscribers:
+                subscribers.remove(self._queue)
+
+
+class TimingRedisManager(LatestTimingMixin, socketio.RedisManager, CoalescingManager):
+    """Redis client manager for web workers"""
+
+
+class TimingKombuManager(LatestTimingMixin, socketio.KombuManager, CoalescingManager):
+    """Kombu (RabbitMQ, ...) client manager for web workers"""
+
+
+def _require_json_queue_messages():
+    """Fail early on python-socketio releases that pickle queue messages (TimingSnapshot cannot be pickled)"""
+    if 'json' not in inspect.signature(socketio.PubSubManager.__init__).parameters:
+        raise RuntimeError("The installed python-socketio cannot JSON-encode message queue messages; "
+                           "install the version pinned in requirements.txt")
+
+
+def create_client_manager(url, channel, write_only=False, json=None):
+    """Client manager for a message queue URL ('memory://' is the in-process stand-in, None = no queue)"""
+    if not url:
+        return CoalescingManager()
+    _require_json_queue_messages()
+    if url.startswith('memory://'):
+        return InProcessQueueManager(channel=channel, write_only=write_only, json=json)
+    if url.startswith(('redis://', 'rediss://')):
+        return TimingRedisManager(url, channel=channel, write_only=write_only, json=json)
+    return TimingKombuManager(url, channel=channel, write_only=write_only, json=json)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Ranking History Module
+Fixed-capacity ring buffer of compact ranking snapshots for time-travel queries
+"""
+
+import numpy as np
+
+# Status strings stored as small integer codes
+STATUS_CODES = ('RUNNING', 'PIT', 'STOPPED', 'OUT')
+_STATUS_INDEX = {status: code for code, status in enumerate(STATUS_CODES)}
+
+
+class RankingHistory:
+    """Ring buffer of ranking snapshots stored as arrays.
+
+    Each snapshot holds the car order (fleet slots, leader first),
+    distances, gaps and status codes of one tick. Preallocated for
+    `capacity` snapshots of up to `fleet_size` cars; the oldest snapshot
+    is overwritten when full. Snapshots are kept in race-time order:
+    recording a time at or before the newest snapshot (reset, seek)
+    drops the snapshots from that time on.
+    """
+
+    def __init__(self, capacity, fleet_size):
+        self.capacity = max(int(capacity), 1)
+        self.fleet_size = int(fleet_size)
+
+        self.race_times = np.zeros(self.capacity)
+        self.sizes = np.zeros(self.capacity, dtype=np.int32)
+        self.order = np.full((self.capacity, self.fleet_size), -1, dtype=np.int32)
+        self.distances = np.zeros((self.capacity, self.fleet_size), dtype=np.float32)
+        self.gaps_to_leader = np.zeros((self.capacity, self.fleet_size), dtype=np.float32)
+        self.gaps_to_ahead = np.zeros((self.capacity, self.fleet_size), dtype=np.float32)
+        self.statuses = np.zeros((self.capacity, self.fleet_size), dtype=np.int8)
+
+        self.start = 0  # Ring index of the oldest snapshot
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """Drop every snapshot"""
+        self.start = 0
+        self.count = 0
+
+    def _ring(self, positions):
+        """Ring indices for chronological positions (0 = oldest)"""
+        return (self.start + np.asarray(positions)) % self.capacity
+
+    def _chronological_times(self):
+        """Race times of stored snapshots, oldest first"""
+        return self.race_times[self._ring(np.arange(self.count))]
+
+    def record(self, race_time, slots, distances, gaps_to_leader, gaps_to_ahead, statuses):
+        """Store one tick's ranking (arrays in position order, leader first)"""
+        if self.count:
+            # Time went backwards (reset/seek): forget the snapshots that are now in the future
+            keep = int(np.searchsorted(self._chronological_times(), race_time, side='left'))
+            self.count = keep
+
+        if self.count == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+            self.count -= 1
+
+        index = (self.start + self.count) % self.capacity
+        size = len(slots)
+        self.race_times[index] = race_time
+        self.sizes[index] = size
+        self.order[index, :size] = slots
+        self.distances[index, :size] = distances
+        self.gaps_to_leader[index, :size] = gaps_to_leader
+        self.gaps_to_ahead[index, :size] = gaps_to_ahead
+        self.statuses[index, :size] = [_STATUS_INDEX.get(status, _STATUS_INDEX['OUT']) for status in statuses]
+        self.count += 1
+
+    def range_indices(self, from_time=None, to_time=None):
+        """Ring indices of snapshots with from_time <= race time <= to_time, oldest first"""
+        times = self._chronological_times()
+        lo = 0 if from_time is None else int(np.searchsorted(times, from_time, side='left'))
+        hi = self.count if to_time is None else int(np.searchsorted(times, to_time, side='right'))
+        return self._ring(np.arange(lo, max(lo, hi)))
+
+    def index_at(self, race_time):
+        """Ring index of the newest snapshot at or before race_time (None if there is none)"""
+        position = int(np.searchsorted(self._chronological_times(), race_time, side='right')) - 1
+        if position < 0:
+            return None
+        return int(self._ring(position))
+
+    def latest_index(self):
+        """Ring index of the newest snapshot (None if empty)"""
+        return int(self._ring(self.count - 1)) if self.count else None
+
+    def oldest_index(self):
+        """Ring index of the oldest snapshot (None if empty)"""
+        return self.start if self.count else None
+
+    def positions_at(self, index):
+        """Position (1-based) of every fleet slot in a snapshot, 0 for cars not ranked"""
+        positions = np.zeros(self.fleet_size, dtype=np.int32)
+        size = self.sizes[index]
+        positions[self.order[index, :size]] = np.arange(1, size + 1)
+        return positions
+
+    def snapshot(self, index, car_ids):
+        """One snapshot as JSON-friendly columns (car_ids maps fleet slots to car ids)"""
+        size = self.sizes[index]
+        return {
+            'race_time': float(self.race_times[index]),
+            'car_ids': [car_ids[slot] for slot in self.order[index, :size]],
+            'distances': self.distances[index, :size].astype(float).round(1).tolist(),
+            'gaps_to_leader': self.gaps_to_leader[index, :size].astype(float).round(3).tolist(),
+            'gaps_to_ahead': self.gaps_to_ahead[index, :size].astype(float).round(3).tolist(),
+            'statuses': [STATUS_CODES[code] for code in self.statuses[index, :size]]
+        }
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Ranking Order Module
+Keeps cars ordered by distance across ticks with local swaps
+"""
+
+import numpy as np
+
+
+class IncrementalRanking:
+    """Car order by distance, maintained incrementally between ticks.
+
+    Between consecutive ticks the order is almost sorted, so it is repaired
+    with an insertion pass (local swaps) instead of a full sort. Cars that
+    are level keep their previous order. When many cars are out of place
+    (race reset, seek, first tick) a full stable sort is used instead.
+    """
+
+    def __init__(self, full_sort_fraction=0.25):
+        self.full_sort_fraction = full_sort_fraction
+        self.order = np.zeros(0, dtype=np.int64)  # Fleet slots, leader first
+        self.swaps = 0  # Local swaps made by the last update
+
+    def reset(self):
+        """Forget the previous order (next update sorts from scratch)"""
+        self.order = np.zeros(0, dtype=np.int64)
+        self.swaps = 0
+
+    def update(self, slots, distances):
+        """Reorder for this tick's distances.
+
+        `slots` are the active fleet slots and `distances` their distances.
+        Returns indices into `slots` in ranking order (leader first).
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        distances = np.asarray(distances, dtype=np.float64)
+        previous = self.order
+
+        size = int(max(slots.max(), previous.max() if len(previous) else 0)) + 1 if len(slots) else 0
+        index_of = np.full(size, -1, dtype=np.int64)
+        index_of[slots] = np.arange(len(slots))
+
+        # Keep the previous order of cars still running; newly active cars join at the back
+        kept = previous[index_of[previous] >= 0] if len(previous) else previous
+        seen = np.zeros(size, dtype=bool)
+        seen[kept] = True
+        order = np.concatenate((kept, slots[~seen[slots]]))
+        ranked = distances[index_of[order]]
+
+        inversions = np.flatnonzero(ranked[1:] > ranked[:-1])
+        self.swaps = 0
+        if len(inversions) > self.full_sort_fraction * len(order):
+            # Too far from sorted: stable sort keeps previous order for ties
+            order = order[np.argsort(-ranked, kind='stable')]
+        elif len(inversions):
+            order = self._insertion_pass(order, ranked, int(inversions[0]) + 1)
+
+        self.order = order
+        return index_of[order]
+
+    def _insertion_pass(self, order, ranked, start):
+        """Insertion sort from `start` on an almost-sorted order (descending distance)"""
+        order = order.tolist()
+        ranked = ranked.tolist()
+        for i in range(start, len(order)):
+            distance = ranked[i]
+            if distance <= ranked[i - 1]:
+                continue
+            slot = order[i]
+            j = i
+            while j > 0 and ranked[j - 1] < distance:
+                ranked[j] = ranked[j - 1]
+                order[j] = order[j - 1]
+                j -= 1
+            ranked[j] = distance
+            order[j] = slot
+            self.swaps += i - j
+        return np.array(order, dtype=np.int64)
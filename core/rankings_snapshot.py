@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Rankings Snapshot Module
+Immutable rankings of one tick, published by the timing thread with a
+single reference swap and read by request handlers without locking
+"""
+
+from types import MappingProxyType
+
+
+class RankingsSnapshot:
+    """Rankings of one tick, never modified after it is published.
+
+    The engine builds a new snapshot every tick and replaces the previous
+    one by assigning a single attribute, so a reader holding a reference
+    always sees one complete tick, however long it takes. Rankings are a
+    tuple and each car a read-only mapping: readers that need to change a
+    car take a copy (dict(car)).
+    """
+
+    __slots__ = ('version', 'rankings', 'by_car')
+
+    def __init__(self, version=0, rankings=()):
+        rankings = tuple(MappingProxyType(car) for car in rankings)
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'rankings', rankings)
+        object.__setattr__(self, 'by_car', MappingProxyType({car['car_id']: car for car in rankings}))
+
+    def __setattr__(self, name, value):
+        raise AttributeError('RankingsSnapshot is immutable')
+
+    def car(self, car_id):
+        """Ranking entry of a car (None when it is not ranked)"""
+        return self.by_car.get(car_id)
+
+    def __len__(self):
+        return len(self.rankings)
+
+    def __bool__(self):
+        return bool(self.rankings)
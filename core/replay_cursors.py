@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Replay Cursors Module
+Per-client replay time cursors served from a shared rankings timeline
+"""
+
+import contextlib
+import io
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from config import config
+from .replay_timeline import ReplayTimeline
+from .tick_scheduler import DeadlineScheduler
+
+
+class ReplayCursor:
+    """One client's own replay position and playback speed"""
+
+    def __init__(self, race_time, speed):
+        self.race_time = race_time
+        self.speed = speed
+        self.playing = True
+
+    def to_dict(self):
+        return {'race_time': self.race_time, 'speed': self.speed, 'playing': self.playing}
+
+
+class ReplayCursorPool:
+    """Replay cursors of every detached client, advanced by one shared loop.
+
+    Frames are read from a precomputed timeline (the engine's own in
+    replay mode, or one built for the pool) once it is ready; until then
+    ticks are computed once by a single headless engine. Either way
+    frames are kept in an LRU frame cache. Race times are quantized to the
+    timeline step, so viewers watching the same moment share one frame
+    and a viewer costs a lookup and an emit, not an engine.
+    """
+
+    def __init__(self, engine, socketio):
+        self.engine = engine
+        self.socketio = socketio
+        self.step_seconds = config.Replay.TIMELINE_STEP_SECONDS
+        self.cursors = {}
+        self._lock = threading.Lock()
+        self._frame_lock = threading.Lock()
+        self._frames = OrderedDict()  # tick -> payload
+        self._headless = None
+        self._replay = None
+        self._thread = None
+        self.frame_hits = 0
+        self.frame_misses = 0
+
+    # ---------- cursor management ----------
+
+    def open(self, sid, race_time=None, speed=None):
+        """Detach a client from the live broadcast and give it its own cursor"""
+        if race_time is None:
+            race_time = self._engine_race_time()
+        cursor = ReplayCursor(self._clamp(race_time), self._validate_speed(
+            speed if speed is not None else self.engine.simulation_speed))
+
+        if self.engine.replay is None and self._replay is None and config.Replay.BUILD_TIMELINE_FOR_CURSORS:
+            self._replay = ReplayTimeline(self.engine)
+            self._replay.load_or_build(background=True)
+
+        with self._lock:
+            self.cursors[sid] = cursor
+            self.engine.detached_clients = frozenset(self.cursors)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run)
+                self._thread.daemon = True
+                self._thread.start()
+        return cursor
+
+    def close(self, sid):
+        """Drop a client's cursor and return it to the live broadcast"""
+        with self._lock:
+            cursor = self.cursors.pop(sid, None)
+            self.engine.detached_clients = frozenset(self.cursors)
+        return cursor is not None
+
+    def get(self, sid):
+        return self.cursors.get(sid)
+
+    def seek(self, sid, race_time):
+        cursor = self._require(sid)
+        cursor.race_time = self._clamp(race_time)
+        return cursor
+
+    def set_speed(self, sid, speed):
+        cursor = self._require(sid)
+        cursor.speed = self._validate_speed(speed)
+        return cursor
+
+    def set_playing(self, sid, playing):
+        cursor = self._require(sid)
+        cursor.playing = bool(playing)
+        return cursor
+
+    def _require(self, sid):
+        cursor = self.cursors.get(sid)
+        if cursor is None:
+            raise ValueError("No replay cursor open for this client")
+        return cursor
+
+    def _validate_speed(self, speed):
+        speed = float(speed)
+        min_speed = config.Simulation.MIN_SPEED
+        max_speed = config.Simulation.MAX_SPEED
+        if not min_speed <= speed <= max_speed:
+            raise ValueError(f"Speed must be between {min_speed}x and {max_speed}x")
+        return speed
+
+    def _session_seconds(self):
+        return (self.engine.get_session_end_time() - self.engine.race_start_time).total_seconds()
+
+    def _clamp(self, race_time):
+        return min(max(float(race_time), 0.0), self._session_seconds())
+
+    def _engine_race_time(self):
+        engine = self.engine
+        if engine.current_time is None or engine.race_start_time is None:
+            return 0.0
+        return (engine.current_time - engine.race_start_time).total_seconds()
+
+    # ---------- frames ----------
+
+    def frame_for(self, cursor):
+        """timing_update payload for a cursor (the shared frame plus the cursor state)"""
+        payload = dict(self.frame_at(cursor.race_time))
+        payload['cursor'] = cursor.to_dict()
+        return payload
+
+    def frame_at(self, race_time):
+        """Shared timing_update payload for the timeline tick at race_time"""
+        replay = self._timeline_source()
+        if replay is not None:
+            tick = replay.tick_at(race_time)
+            if tick is not None:
+                return self._cached(('timeline', tick), lambda: self._timeline_frame(replay.timeline, tick))
+
+        tick = int(race_time / self.step_seconds + 1e-9)
+        return self._cached(('computed', tick), lambda: self._computed_frame(tick * self.step_seconds))
+
+    def _cached(self, key, build):
+        with self._frame_lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                self.frame_hits += 1
+                return frame
+
+            self.frame_misses += 1
+            frame = build()
+            self._frames[key] = frame
+            while len(self._frames) > config.Replay.CURSOR_FRAME_CACHE_SIZE:
+                self._frames.popitem(last=False)
+            return frame
+
+    def _timeline_source(self):
+        """Ready precomputed timeline, or None"""
+        for replay in (self.engine.replay, self._replay):
+            if replay is not None and replay.timeline is not None:
+                return replay
+        return None
+
+    def _timeline_frame(self, timeline, tick):
+        rankings, _ = self.engine.timeline_rankings(timeline, tick)
+        race_time = float(timeline.race_times[tick])
+        return self._payload(race_time, rankings)
+
+    def _computed_frame(self, race_time):
+        """Compute a tick with the shared headless engine (caller holds the frame lock)"""
+        if self._headless is None:
+            self._headless = self.engine.headless_copy()
+        headless = self._headless
+
+        target_time = headless.race_start_time + timedelta(seconds=race_time)
+        # Stepping forward by one timeline step keeps reset history valid; any other jump seeks
+        with contextlib.redirect_stdout(io.StringIO()):
+            previous = headless.current_time
+            if previous is not None and timedelta(0) < target_time - previous <= timedelta(seconds=self.step_seconds):
+                headless.current_time = target_time
+                headless.calculate_live_rankings()
+            else:
+                headless.seek(race_time)
+        return self._payload(race_time, headless.current_rankings)
+
+    def _payload(self, race_time, rankings):
+        current_time = self.engine.race_start_time + timedelta(seconds=race_time)
+        clean_rankings = []
+        for car in rankings:
+            clean_car = car.copy()
+            clean_car.pop('sync_timestamp', None)
+            clean_rankings.append(clean_car)
+        return {
+            'session_id': self.engine.session_id,
+            'current_time': current_time.strftime('%H:%M:%S.%f')[:-3],
+            'race_time': race_time,
+            'rankings': clean_rankings,
+            'is_running': True,
+            'total_cars': len(self.engine.car_data)
+        }
+
+    # ---------- playback loop ----------
+
+    def _run(self):
+        """Advance every playing cursor once per interval and emit its frame"""
+        interval = self.engine.update_interval
+        scheduler = DeadlineScheduler(interval, config.Performance.TICK_OVERRUN_POLICY,
+                                      config.Performance.MAX_CATCH_UP_TICKS)
+        scheduler.start()
+        session_seconds = self._session_seconds()
+
+        while True:
+            # A cursor's first frame is sent when it is opened, so wait first
+            intervals = scheduler.wait()
+            with self._lock:
+                if not self.cursors:
+                    self._thread = None
+                    return
+                cursors = list(self.cursors.items())
+
+            for sid, cursor in cursors:
+                if cursor.playing:
+                    cursor.race_time = min(cursor.race_time + interval * cursor.speed * intervals, session_seconds)
+                    if cursor.race_time >= session_seconds:
+                        cursor.playing = False
+                try:
+                    self.socketio.emit('timing_update', self.frame_for(cursor), to=sid)
+                except Exception as e:
+                    print(f"❌ Replay cursor frame failed: {str(e)}")
+
+    def get_stats(self):
+        """Cursor and frame cache counters for monitoring"""
+        return {
+            'cursors': len(self.cursors),
+            'cached_frames': len(self._frames),
+            'frame_hits': self.frame_hits,
+            'frame_misses': self.frame_misses,
+            'source': 'timeline' if self._timeline_source() is not None else 'computed'
+        }
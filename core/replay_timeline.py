@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Replay Timeline Module
+Precomputes the rankings of every tick of a recorded session once and
+serves them from a memory-mapped timeline
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from config import config
+from .timeline_store import Timeline, TimelineWriter, read_timeline_meta, rankings_to_columns
+
+# Bump when the columns or the meaning of a stored value change
+TIMELINE_FORMAT_VERSION = 1
+
+# Config sections whose values change the computed rankings
+_FINGERPRINT_SECTIONS = ('StatusDetection', 'DistanceReset', 'Ranking', 'HighFrequency')
+
+# Timeline directories memory-mapped by this process; never removed as stale
+_open_paths = set()
+_open_paths_lock = threading.Lock()
+
+
+def _section_values(section):
+    """Public settings of a config section"""
+    return {name: getattr(section, name) for name in dir(section) if name.isupper()}
+
+
+def timeline_fingerprint(data_directory, step_seconds):
+    """Hash of the session files, the tick step and the ranking-relevant config"""
+    files = []
+    for file_name in sorted(os.listdir(data_directory)):
+        if file_name.endswith('.csv'):
+            stat = os.stat(os.path.join(data_directory, file_name))
+            files.append([file_name, stat.st_size, stat.st_mtime_ns])
+
+    payload = {
+        'version': TIMELINE_FORMAT_VERSION,
+        'step_seconds': step_seconds,
+        'files': files,
+        'config': {name: _section_values(getattr(config, name)) for name in _FINGERPRINT_SECTIONS}
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=repr).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+
+def timeline_directory(cache_dir, data_directory):
+    """Cache subdirectory holding the timelines of one data directory"""
+    key = hashlib.sha1(os.path.abspath(data_directory).encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, key)
+
+
+class ReplayTimeline:
+    """Precomputed rankings timeline for one session.
+
+    Timelines are stored under `cache_dir/<data directory hash>/<fingerprint>`,
+    so changing the data files, the tick step or the ranking config selects
+    a new directory. A build removes the other fingerprints of the same data
+    directory only, and never one this process has open: sessions on other
+    data directories keep theirs.
+    """
+
+    def __init__(self, engine, cache_dir=None, step_seconds=None):
+        self.engine = engine
+        self.cache_dir = cache_dir or config.Replay.TIMELINE_DIR
+        self.step_seconds = step_seconds or config.Replay.TIMELINE_STEP_SECONDS
+        self.fingerprint = timeline_fingerprint(engine.data_directory, self.step_seconds)
+        self.data_cache_dir = timeline_directory(self.cache_dir, engine.data_directory)
+        self.path = os.path.join(self.data_cache_dir, self.fingerprint)
+
+        self.timeline = None
+        self.state = 'idle'  # idle, building, ready, failed
+        self.progress = 0.0
+        self.build_seconds = None
+        self.error = None
+        self._thread = None
+
+    def load_or_build(self, background=True):
+        """Open a previous run's timeline, or precompute it (in a thread when background)"""
+        if read_timeline_meta(self.path) is not None:
+            self._open()
+            self.state = 'ready'
+            print(f"📼 Replay timeline loaded from {self.path} ({len(self.timeline)} ticks)")
+            return self.timeline
+
+        if background:
+            self._thread = threading.Thread(target=self._build_safely)
+            self._thread.daemon = True
+            self._thread.start()
+            return None
+
+        self._build_safely()
+        return self.timeline
+
+    def _build_safely(self):
+        try:
+            self.build()
+        except Exception as e:
+            self.state = 'failed'
+            self.error = str(e)
+            print(f"❌ Replay timeline precompute failed: {str(e)}")
+
+    def build(self):
+        """Run a headless engine over the session and write the timeline"""
+        self.state = 'building'
+        self._remove_stale_timelines()
+
+        worker = self.engine.headless_copy()
+        session_seconds = (worker.get_session_end_time() - worker.race_start_time).total_seconds()
+        offsets = np.arange(0.0, session_seconds + 1e-9, self.step_seconds)
+        metadata = {
+            'fingerprint': self.fingerprint,
+            'data_directory': os.path.abspath(self.engine.data_directory),
+            'race_start_time': worker.race_start_time.isoformat(),
+            'step_seconds': self.step_seconds
+        }
+
+        start = time.perf_counter()
+        with TimelineWriter(self.path, metadata) as writer:
+            # The engine prints a line per tick; discard it
+            with contextlib.redirect_stdout(io.StringIO()):
+                for i, offset in enumerate(offsets):
+                    worker.current_time = worker.race_start_time + timedelta(seconds=float(offset))
+                    rankings = worker.calculate_live_rankings()
+                    writer.append([offset], [len(rankings)], rankings_to_columns(rankings))
+                    self.progress = (i + 1) / len(offsets)
+
+        self.build_seconds = time.perf_counter() - start
+        self._open()
+        self.state = 'ready'
+        print(f"📼 Replay timeline precomputed: {len(offsets)} ticks in {self.build_seconds:.1f}s")
+
+    def _open(self):
+        """Memory-map the timeline and keep its directory from being removed as stale"""
+        with _open_paths_lock:
+            _open_paths.add(os.path.abspath(self.path))
+        self.timeline = Timeline(self.path)
+
+    def _remove_stale_timelines(self):
+        """Delete this data directory's timelines of other fingerprints (old data or config)"""
+        if not os.path.isdir(self.data_cache_dir):
+            return
+        with _open_paths_lock:
+            open_paths = set(_open_paths)
+        for name in os.listdir(self.data_cache_dir):
+            path = os.path.join(self.data_cache_dir, name)
+            if name == self.fingerprint or os.path.abspath(path) in open_paths:
+                continue
+            if os.path.isdir(path) and os.path.exists(os.path.join(path, 'tick_race_time.bin')):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def tick_at(self, race_seconds):
+        """Timeline tick for a race time (None if not ready or outside the timeline)"""
+        if self.timeline is None or not len(self.timeline):
+            return None
+        tick = self.timeline.tick_at(race_seconds + 1e-6)
+        if tick < 0 or race_seconds - self.timeline.race_times[tick] > self.step_seconds:
+            return None
+        return tick
+
+    def get_status(self):
+        """Precompute state for monitoring"""
+        return {
+            'state': self.state,
+            'progress': self.progress,
+            'fingerprint': self.fingerprint,
+            'path': self.path,
+            'step_seconds': self.step_seconds,
+            'ticks': len(self.timeline) if self.timeline is not None else 0,
+            'build_seconds': self.build_seconds,
+            'error': self.error
+        }
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Session Manager Module
+Hosts several named F1LiveTiming sessions in one server process
+"""
+
+import os
+import threading
+
+from config import config
+from .timing_engine import F1LiveTiming
+
+
+def session_room(session_id):
+    """Socket.IO room name of a session"""
+    return f"session:{session_id}"
+
+
+class SessionManager:
+    """Named F1LiveTiming instances, each with its own clock, speed and room.
+
+    Sessions replaying the same data directory share the loaded telemetry
+    (car data and numpy arrays are read-only after loading). Every session,
+    the default one included, broadcasts to its own room only; clients start
+    in the default session's room so single-session pages keep working.
+    """
+
+    def __init__(self, socketio, default_session_id=None):
+        self.socketio = socketio
+        self.default_session_id = default_session_id or config.Sessions.DEFAULT_SESSION_ID
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def create_session(self, session_id, data_directory):
+        """Create and load a session; raises ValueError when it cannot be created"""
+        data_directory = os.path.abspath(data_directory)
+        if not os.path.isdir(data_directory):
+            raise ValueError(f"Data directory does not exist: {data_directory}")
+
+        with self._lock:
+            if session_id in self.sessions:
+                raise ValueError(f"Session '{session_id}' already exists")
+            if len(self.sessions) >= config.Sessions.MAX_SESSIONS:
+                raise ValueError(f"Maximum {config.Sessions.MAX_SESSIONS} sessions reached")
+
+            engine = F1LiveTiming(data_directory, self.socketio, room=session_room(session_id),
+                                  session_id=session_id)
+
+            loaded = self._find_loaded(data_directory)
+            if loaded is not None:
+                engine.share_telemetry_from(loaded)
+                # The precomputed timeline is read-only too
+                engine.replay = loaded.replay
+                print(f"🔗 Session '{session_id}' shares telemetry with an existing session")
+            else:
+                engine.load_car_data()
+
+            self.sessions[session_id] = engine
+            return engine
+
+    def _find_loaded(self, data_directory):
+        """A session already holding this data directory's telemetry"""
+        for engine in self.sessions.values():
+            if os.path.abspath(engine.data_directory) == data_directory and engine.fleet_telemetry is not None:
+                return engine
+        return None
+
+    def add_session(self, session_id, engine):
+        """Register an engine that was created elsewhere (e.g. the default session)"""
+        if engine.session_id is None:
+            engine.session_id = session_id
+        with self._lock:
+            self.sessions[session_id] = engine
+        return engine
+
+    def get_session(self, session_id):
+        """Session engine or None"""
+        return self.sessions.get(session_id)
+
+    def session_of_rooms(self, rooms):
+        """Session whose room is among a client's rooms (None when it follows no session)"""
+        for engine in list(self.sessions.values()):
+            if engine.room is not None and engine.room in rooms:
+                return engine
+        return None
+
+    def remove_session(self, session_id):
+        """Stop and drop a session (the default session cannot be removed)"""
+        if session_id == self.default_session_id:
+            raise ValueError("The default session cannot be removed")
+        with self._lock:
+            engine = self.sessions.pop(session_id, None)
+        if engine is None:
+            return False
+        engine.stop_live_timing()
+        return True
+
+    def list_sessions(self):
+        """Summary of every session"""
+        summaries = []
+        for session_id, engine in self.sessions.items():
+            summaries.append({
+                'session_id': session_id,
+                'room': engine.room,
+                'data_directory': engine.data_directory,
+                'is_running': engine.is_running,
+                'simulation_speed': engine.simulation_speed,
+                'race_time': (engine.current_time - engine.race_start_time).total_seconds()
+                             if engine.current_time and engine.race_start_time else 0,
+                'total_cars': len(engine.car_data)
+            })
+        return summaries
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Subscriptions Module
+Per-client subscriptions to a subset of the field (chosen cars or a
+position range), grouped so each distinct subset is built once per tick
+"""
+
+import threading
+
+
+def cars_key(car_ids):
+    """Subscription key for a set of cars"""
+    return ('cars', tuple(sorted({int(car_id) for car_id in car_ids})))
+
+
+def positions_key(start, count):
+    """Subscription key for positions start..start+count-1 (1-based)"""
+    start, count = int(start), int(count)
+    if start < 1 or count < 1:
+        raise ValueError("start and count must be at least 1")
+    return ('positions', start, count)
+
+
+def filter_payload(payload, key):
+    """Copy of a timing payload holding only the subscribed cars"""
+    rankings = payload.get('rankings', [])
+    if key[0] == 'cars':
+        wanted = set(key[1])
+        rankings = [car for car in rankings if car['car_id'] in wanted]
+        subscription = {'cars': list(key[1])}
+    else:
+        _, start, count = key
+        rankings = rankings[start - 1:start - 1 + count]
+        subscription = {'positions': {'start': start, 'count': count}}
+
+    filtered = dict(payload)
+    filtered['rankings'] = rankings
+    filtered['subscription'] = subscription
+    return filtered
+
+
+class SubscriptionRegistry:
+    """Which client follows which subset, and the Socket.IO room of each subset.
+
+    Clients with the same subscription share a room, so the broadcast
+    builds one payload per distinct subscription and fans it out.
+    """
+
+    def __init__(self, room_prefix):
+        self.room_prefix = room_prefix
+        self._lock = threading.Lock()
+        self._by_sid = {}
+        self.groups = {}  # key -> frozenset of sids, replaced on every change
+        self.clients = frozenset()
+
+    def room(self, key):
+        """Room name of a subscription"""
+        if key[0] == 'cars':
+            return f"{self.room_prefix}:cars:{','.join(str(car_id) for car_id in key[1])}"
+        return f"{self.room_prefix}:positions:{key[1]}-{key[2]}"
+
+    def subscribe(self, sid, key):
+        """Set a client's subscription; returns the room it left (or None)"""
+        with self._lock:
+            previous = self._by_sid.get(sid)
+            self._by_sid[sid] = key
+            self._rebuild()
+        return self.room(previous) if previous is not None and previous != key else None
+
+    def unsubscribe(self, sid):
+        """Drop a client's subscription; returns the room it left (or None)"""
+        with self._lock:
+            previous = self._by_sid.pop(sid, None)
+            self._rebuild()
+        return self.room(previous) if previous is not None else None
+
+    def get(self, sid):
+        return self._by_sid.get(sid)
+
+    def _rebuild(self):
+        groups = {}
+        for sid, key in self._by_sid.items():
+            groups.setdefault(key, set()).add(sid)
+        self.groups = {key: frozenset(sids) for key, sids in groups.items()}
+        self.clients = frozenset(self._by_sid)
+
+    def get_stats(self):
+        """Subscription counts for monitoring"""
+        groups = self.groups
+        return {
+            'clients': sum(len(sids) for sids in groups.values()),
+            'distinct_subscriptions': len(groups)
+        }
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Telemetry Index Module
+Sorted numpy arrays built once at load time for O(log n) telemetry lookups
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def to_nanoseconds(timestamp):
+    """Convert a datetime/Timestamp to integer nanoseconds"""
+    return pd.Timestamp(timestamp).value
+
+
+def _column(df, name):
+    """Float array for a column, NaN-filled when the column is missing"""
+    if name in df.columns:
+        return df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.full(len(df), np.nan)
+
+
+def _cumulative_at_rows(valid, segments):
+    """Running sum of per-row segments, carried forward over invalid rows"""
+    totals = np.zeros(len(valid))
+    totals[valid] = np.cumsum(segments)
+    # Rows that are not valid keep the total of the last valid row before them
+    last_valid = np.maximum.accumulate(np.where(valid, np.arange(len(valid)), -1))
+    return np.where(last_valid >= 0, totals[np.maximum(last_valid, 0)], 0.0)
+
+
+def _speed_prefix_sums(speed):
+    """Cumulative sum and count of non-NaN speed samples, with a leading zero"""
+    valid = ~np.isnan(speed)
+    speed_sum = np.concatenate(([0.0], np.cumsum(np.where(valid, speed, 0.0))))
+    speed_count = np.concatenate(([0], np.cumsum(valid)))
+    return speed_sum, speed_count
+
+
+class CarTelemetry:
+    """Lookup arrays for one car, in the same row order as its sorted DataFrame"""
+
+    def __init__(self, df):
+        self.timestamps = df['timeStamp'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+        self.speed = _column(df, 'speed')
+        self.lat = _column(df, 'lat')
+        self.lon = _column(df, 'lon')
+        self.x = _column(df, 'x')
+        self.y = _column(df, 'y')
+
+        self.distance, self.xy_fallback_rows = self._build_distance()
+        self.gps_distance = self._build_gps_distance()
+
+        # Non-decreasing distance-time curve for inverse (distance -> time) lookups
+        self.distance_envelope = np.maximum.accumulate(self.distance) if len(self.distance) else self.distance
+
+        # Prefix sums of valid speed samples: window mean = two searchsorted + a division
+        self.speed_sum, self.speed_count = _speed_prefix_sums(self.speed)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def _build_distance(self):
+        """Preliminary distance at every row, using the best method available up to that row.
+
+        Mirrors the engine's GPS -> speed integration -> x,y preference: GPS needs at
+        least two valid fixes, speed integration at least two valid speed samples.
+        """
+        n = len(self.timestamps)
+        if n == 0:
+            return np.zeros(0), 0
+
+        # Method 1: equirectangular GPS distance between consecutive valid fixes
+        valid_gps = (self.lat != 0.0) & (self.lon != 0.0) & ~np.isnan(self.lat) & ~np.isnan(self.lon)
+        lat, lon = self.lat[valid_gps], self.lon[valid_gps]
+        gps_segments = np.zeros(len(lat))
+        if len(lat) >= 2:
+            lat_diff = np.diff(lat) * 111000
+            lon_diff = np.diff(lon) * 111000 * np.cos(np.radians(lat[1:]))
+            gps_segments[1:] = np.sqrt(lat_diff ** 2 + lon_diff ** 2)
+        gps_total = _cumulative_at_rows(valid_gps, gps_segments)
+        gps_count = np.cumsum(valid_gps)
+
+        # Method 2: speed integration between consecutive valid speed samples
+        valid_speed = ~np.isnan(self.speed) & (self.speed >= 0)
+        speeds = self.speed[valid_speed]
+        times = self.timestamps[valid_speed]
+        speed_segments = np.zeros(len(speeds))
+        if len(speeds) >= 2:
+            time_diff = np.diff(times) / 1e9
+            speed_segments[1:] = speeds[1:] * 1000 / 3600 * time_diff
+            speed_segments[speed_segments < 0] = 0.0
+        speed_total = _cumulative_at_rows(valid_speed, speed_segments)
+        speed_count = np.cumsum(valid_speed)
+
+        # Method 3: x,y coordinates (least accurate)
+        xy_segments = np.zeros(n)
+        xy_segments[1:] = np.sqrt(np.diff(self.x) ** 2 + np.diff(self.y) ** 2)
+        xy_total = np.cumsum(np.nan_to_num(xy_segments))
+
+        use_gps = gps_count >= 2
+        use_speed = ~use_gps & (speed_count >= 2)
+        distance = np.where(use_gps, gps_total, np.where(use_speed, speed_total, xy_total))
+
+        # Row 0 alone never yields a distance, so it is not an x,y fallback row
+        xy_rows = int(np.count_nonzero(~use_gps[1:] & ~use_speed[1:]))
+        return distance, xy_rows
+
+    def _build_gps_distance(self):
+        """Cumulative haversine distance over valid GPS fixes (used by reset validation)"""
+        n = len(self.timestamps)
+        valid = (self.lat != 0.0) & (self.lon != 0.0) & ~np.isnan(self.lat) & ~np.isnan(self.lon)
+        lat, lon = self.lat[valid], self.lon[valid]
+        segments = np.zeros(len(lat))
+        if len(lat) >= 2:
+            in_range = (lat >= -90) & (lat <= 90) & (lon >= -180) & (lon <= 180)
+            lat1, lat2 = np.radians(lat[:-1]), np.radians(lat[1:])
+            delta_lat = lat2 - lat1
+            delta_lon = np.radians(lon[1:] - lon[:-1])
+            a = np.sin(delta_lat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(delta_lon / 2) ** 2
+            haversine = 6371000 * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+            segments[1:] = np.where(in_range[:-1] & in_range[1:], haversine, 0.0)
+        return _cumulative_at_rows(valid, segments) if n else np.zeros(0)
+
+    # ----- Scalar lookups -----
+
+    def index_at(self, t_ns):
+        """Index of the last row at or before t_ns (-1 if none)"""
+        return int(np.searchsorted(self.timestamps, t_ns, side='right')) - 1
+
+    def nearest_index(self, t_ns):
+        """Index of the row closest to t_ns (earliest row on ties), -1 if empty"""
+        n = len(self.timestamps)
+        if n == 0:
+            return -1
+        after = int(np.searchsorted(self.timestamps, t_ns, side='left'))
+        if after >= n:
+            before = n - 1
+        elif after == 0:
+            return 0
+        else:
+            before = after - 1
+            if t_ns - self.timestamps[before] > self.timestamps[after] - t_ns:
+                return after
+        # First of any rows sharing the same timestamp
+        return int(np.searchsorted(self.timestamps, self.timestamps[before], side='left'))
+
+    def distance_at(self, t_ns):
+        """Preliminary distance traveled up to t_ns (0 with fewer than two rows)"""
+        index = self.index_at(t_ns)
+        return float(self.distance[index]) if index >= 1 else 0.0
+
+    def gps_distance_at(self, t_ns):
+        """Cumulative haversine GPS distance up to t_ns"""
+        index = self.index_at(t_ns)
+        return float(self.gps_distance[index]) if index >= 1 else 0.0
+
+    def position_at(self, t_ns):
+        """Row values closest to t_ns as a dict (None if no data)"""
+        index = self.nearest_index(t_ns)
+        if index < 0:
+            return None
+        return {
+            'timestamp': pd.Timestamp(int(self.timestamps[index])),
+            'lat': self.lat[index],
+            'lon': self.lon[index],
+            'speed': self.speed[index],
+            'x': self.x[index],
+            'y': self.y[index]
+        }
+
+    def window(self, start_ns, end_ns):
+        """Row slice bounds [lo, hi) for timestamps within [start_ns, end_ns]"""
+        lo = int(np.searchsorted(self.timestamps, start_ns, side='left'))
+        hi = int(np.searchsorted(self.timestamps, end_ns, side='right'))
+        return lo, max(lo, hi)
+
+    def window_mean_speed(self, start_ns, end_ns):
+        """Mean of valid speed samples in [start_ns, end_ns] from the prefix sums.
+
+        Returns (mean, rows, samples, lo, hi); mean is NaN when there are no samples.
+        """
+        lo, hi = self.window(start_ns, end_ns)
+        samples = int(self.speed_count[hi] - self.speed_count[lo])
+        mean = (self.speed_sum[hi] - self.speed_sum[lo]) / samples if samples else np.nan
+        return mean, hi - lo, samples, lo, hi
+
+
+class FleetTelemetry:
+    """Concatenated telemetry of all cars for batched lookups at one timestamp.
+
+    Each car's timestamps are shifted into a disjoint key range
+    (slot * stride + relative time), so a single searchsorted over the
+    concatenated keys finds the row of every car at once. Query times are
+    clamped to the session span, so a query before a car's first row
+    resolves to the start of its own slot.
+    """
+
+    def __init__(self, car_telemetry):
+        self.car_ids = list(car_telemetry.keys())
+        self.slots = {car_id: slot for slot, car_id in enumerate(self.car_ids)}
+        cars = [car_telemetry[car_id] for car_id in self.car_ids]
+        lengths = np.array([len(car) for car in cars], dtype=np.int64)
+
+        self.offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64) \
+            if len(cars) else np.zeros(0, dtype=np.int64)
+        self.ends = self.offsets + lengths
+
+        timestamps = np.concatenate([car.timestamps for car in cars]) if cars else np.zeros(0, dtype=np.int64)
+        self.origin = int(timestamps.min()) if len(timestamps) else 0
+        self.span = int(timestamps.max() - self.origin) if len(timestamps) else 0
+        # One spare key between slots so out-of-range queries never land in a neighbour
+        self.stride = self.span + 2
+        self.slot_base = np.arange(len(cars), dtype=np.int64) * self.stride
+
+        slots = np.repeat(np.arange(len(cars), dtype=np.int64), lengths)
+        self.keys = (timestamps - self.origin) + slots * self.stride
+        self.timestamps = timestamps
+
+        def concat(name):
+            return np.concatenate([getattr(car, name) for car in cars]) if cars else np.zeros(0)
+
+        self.speed = concat('speed')
+        self.lat = concat('lat')
+        self.lon = concat('lon')
+        self.x = concat('x')
+        self.y = concat('y')
+        self.distance = concat('distance')
+        self.distance_envelope = concat('distance_envelope')
+
+        # Envelopes shifted into disjoint ranges so one searchsorted inverts every car's curve
+        self.distance_stride = float(self.distance_envelope.max()) + 1.0 if len(self.distance_envelope) else 1.0
+        self.distance_keys = self.distance_envelope + \
+            np.repeat(np.arange(len(cars), dtype=np.float64), lengths) * self.distance_stride
+
+        # Fleet-wide prefix sums; a window never crosses a car boundary, so
+        # differences between two global indices stay within one car
+        self.speed_sum, self.speed_count = _speed_prefix_sums(self.speed)
+
+        self.first_timestamps = np.array([car.timestamps[0] if len(car) else np.iinfo(np.int64).max
+                                          for car in cars], dtype=np.int64)
+        self.last_timestamps = np.array([car.timestamps[-1] if len(car) else np.iinfo(np.int64).min
+                                         for car in cars], dtype=np.int64)
+
+    def _keys_for(self, t_ns):
+        """Search keys for time t_ns in every car's slot (t_ns scalar or per-car array)"""
+        relative = np.clip(np.asarray(t_ns, dtype=np.int64) - self.origin, -1, self.span)
+        return relative + self.slot_base
+
+    def index_at(self, t_ns):
+        """Global index of each car's last row at or before t_ns (clipped to the car start)"""
+        index = np.searchsorted(self.keys, self._keys_for(t_ns), side='right') - 1
+        return np.maximum(index, self.offsets)
+
+    def nearest_index(self, t_ns):
+        """Global index of each car's row closest to t_ns (earliest row on ties)"""
+        keys = self._keys_for(t_ns)
+        after = np.searchsorted(self.keys, keys, side='left')
+        last = np.maximum(self.ends - 1, self.offsets)
+        after_clipped = np.minimum(after, last)
+        before = np.maximum(after - 1, self.offsets)
+
+        pick_after = (after < self.ends) & (
+            (after == self.offsets) |
+            (keys - self.keys[before] > self.keys[after_clipped] - keys)
+        )
+        # First of any rows sharing the chosen "before" timestamp
+        before_first = np.searchsorted(self.keys, self.keys[before], side='left')
+        return np.where(pick_after, after_clipped, before_first)
+
+    def window(self, start_ns, end_ns):
+        """Global row bounds [lo, hi) per car for timestamps within [start_ns, end_ns]"""
+        lo = np.searchsorted(self.keys, self._keys_for(start_ns), side='left')
+        hi = np.maximum(np.searchsorted(self.keys, self._keys_for(end_ns), side='right'), lo)
+        return lo, hi
+
+    def active(self, t_ns):
+        """Cars whose data covers t_ns"""
+        return (self.first_timestamps <= t_ns) & (t_ns <= self.last_timestamps)
+
+    def distance_at(self, t_ns):
+        """Preliminary distance of every car up to t_ns"""
+        index = self.index_at(t_ns)
+        has_two_rows = (index - self.offsets) >= 1
+        return np.where(has_two_rows, self.distance[index], 0.0)
+
+    def interpolation_at(self, t_ns):
+        """Rows around t_ns per car as (index, next_index, fraction) for interpolate()"""
+        index = self.index_at(t_ns)
+        following = np.minimum(index + 1, np.maximum(self.ends - 1, self.offsets))
+        span = (self.timestamps[following] - self.timestamps[index]).astype(np.float64)
+        elapsed = (np.asarray(t_ns, dtype=np.int64) - self.timestamps[index]).astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fraction = np.where(span > 0, np.clip(elapsed / span, 0.0, 1.0), 0.0)
+        return index, following, fraction
+
+    def interpolate(self, column, interpolation):
+        """Column values linearly interpolated between the rows around a time.
+
+        A missing (NaN) next value holds the previous row's value.
+        """
+        index, following, fraction = interpolation
+        before = column[index]
+        after = column[following]
+        return np.where(np.isnan(after), before, before + (after - before) * fraction)
+
+    def interpolated_distance_at(self, t_ns, interpolation=None):
+        """distance_at() interpolated between samples; a drop (reset) between them holds the earlier value"""
+        index, following, fraction = interpolation or self.interpolation_at(t_ns)
+        before = self.distance[index]
+        after = self.distance[following]
+        has_two_rows = (index - self.offsets) >= 1
+        distance = np.where(after >= before, before + (after - before) * fraction, before)
+        return np.where(has_two_rows, distance, 0.0)
+
+    def window_mean_speed(self, start_ns, end_ns):
+        """Mean of valid speed samples in [start_ns, end_ns] per car, with row and sample counts.
+
+        Returns (mean, rows, samples, lo, hi) where lo/hi are global row bounds.
+        """
+        lo, hi = self.window(start_ns, end_ns)
+        rows = hi - lo
+
+        sums = self.speed_sum[hi] - self.speed_sum[lo]
+        samples = self.speed_count[hi] - self.speed_count[lo]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(samples > 0, sums / np.maximum(samples, 1), np.nan)
+        return mean, rows, samples, lo, hi
+
+    def envelope_at(self, t_ns):
+        """Envelope (running max) distance of every car up to t_ns"""
+        index = self.index_at(t_ns)
+        has_two_rows = (index - self.offsets) >= 1
+        return np.where(has_two_rows, self.distance_envelope[index], 0.0)
+
+    def time_at_distance(self, slots, distances):
+        """Time (ns, float) at which each car in `slots` first reached the matching distance.
+
+        Inverse lookup on the distance-time curve with linear interpolation
+        between samples; distances at or below a car's first sample map to
+        its first timestamp.
+        """
+        slots = np.asarray(slots, dtype=np.int64)
+        targets = np.clip(np.asarray(distances, dtype=np.float64), 0.0, self.distance_stride - 1.0)
+        keys = targets + slots * self.distance_stride
+
+        index = np.searchsorted(self.distance_keys, keys, side='left')
+        index = np.clip(index, self.offsets[slots], self.ends[slots] - 1)
+        previous = np.maximum(index - 1, self.offsets[slots])
+
+        d0, d1 = self.distance_keys[previous], self.distance_keys[index]
+        t0 = self.timestamps[previous].astype(np.float64)
+        t1 = self.timestamps[index].astype(np.float64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fraction = np.where(d1 > d0, (keys - d0) / (d1 - d0), 1.0)
+        return t0 + np.clip(fraction, 0.0, 1.0) * (t1 - t0)
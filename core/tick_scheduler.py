@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Tick Scheduler Module
+Drift-free fixed-rate scheduling for the timing loop using monotonic deadlines
+"""
+
+import math
+import time
+
+OVERRUN_POLICIES = ('skip', 'catch_up', 'stretch')
+
+
+class DeadlineScheduler:
+    """Fixed-rate tick scheduler based on time.monotonic() deadlines.
+
+    Deadlines are spaced exactly `interval` apart, so the time spent in a
+    tick is absorbed by a shorter sleep instead of adding to the period.
+    When a tick overruns its deadline the policy decides what happens:
+
+    - skip: drop the missed ticks; wait() reports them so race time can
+      still advance by the real time that passed
+    - catch_up: run the missed ticks back to back without sleeping
+      (at most max_catch_up ticks behind, the rest are skipped)
+    - stretch: restart the schedule from now (the old sleep-after-work
+      behaviour, race time falls behind real time)
+    """
+
+    def __init__(self, interval, policy='skip', max_catch_up=10):
+        if policy not in OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy '{policy}', expected one of {OVERRUN_POLICIES}")
+        self.interval = interval
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+        self.next_deadline = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zero the overrun and lag counters"""
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def start(self):
+        """Set the first deadline one interval from now"""
+        self.next_deadline = time.monotonic() + self.interval
+
+    def set_interval(self, interval):
+        """Change the tick period, moving the pending deadline to match"""
+        if self.next_deadline is not None:
+            self.next_deadline += interval - self.interval
+        self.interval = interval
+
+    def wait(self):
+        """Sleep until the next deadline after a tick's work.
+
+        Returns the number of intervals the simulation should advance
+        (more than 1 when the skip policy dropped ticks).
+        """
+        if self.next_deadline is None:
+            self.start()
+
+        self.ticks += 1
+        now = time.monotonic()
+        lag = now - self.next_deadline
+
+        if lag <= 0:
+            self.last_lag = 0.0
+            time.sleep(-lag)
+            self.next_deadline += self.interval
+            return 1
+
+        # Tick finished after its deadline
+        self.overruns += 1
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.total_lag += lag
+        missed = int(math.floor(lag / self.interval))
+
+        if self.policy == 'stretch':
+            self.next_deadline = now + self.interval
+            return 1
+
+        if self.policy == 'catch_up' and missed <= self.max_catch_up:
+            # Next tick starts immediately; deadlines stay on the original grid
+            self.next_deadline += self.interval
+            return 1
+
+        # Skip: drop the intervals that passed entirely and start the next tick now
+        self.skipped_ticks += missed
+        self.next_deadline += self.interval * (missed + 1)
+        return missed + 1
+
+    def get_stats(self):
+        """Counters for monitoring"""
+        return {
+            'policy': self.policy,
+            'interval': self.interval,
+            'ticks': self.ticks,
+            'overruns': self.overruns,
+            'skipped_ticks': self.skipped_ticks,
+            'last_lag_ms': self.last_lag * 1000,
+            'max_lag_ms': self.max_lag * 1000,
+            'avg_lag_ms': (self.total_lag / self.overruns * 1000) if self.overruns else 0.0
+        }
+
+
+class AdaptiveTickRate:
+    """Chooses the tick interval from race activity.
+
+    Ticks run at the active interval while any car is within gap_threshold
+    metres of the car ahead or a car's status has just changed (changes
+    come in bursts while the status window settles, e.g. RUNNING -> PIT
+    -> STOPPED), and for hold_seconds of race time afterwards so the rate
+    does not flap. Otherwise ticks fall back to the idle interval. When disabled
+    the fixed interval is always used.
+    """
+
+    def __init__(self, idle_interval, active_interval, gap_threshold, hold_seconds=0.0,
+                 enabled=True, fixed_interval=None):
+        self.idle_interval = idle_interval
+        self.active_interval = min(active_interval, idle_interval)
+        self.gap_threshold = gap_threshold
+        self.hold_seconds = hold_seconds
+        self.enabled = enabled
+        self.fixed_interval = fixed_interval or idle_interval
+        self.reset()
+
+    def reset(self):
+        """Forget the previous tick (after a seek or restart)"""
+        self.interval = self.idle_interval if self.enabled else self.fixed_interval
+        self.reason = 'idle' if self.enabled else 'fixed'
+        self._last_active_time = None
+        self._last_statuses = {}
+        self.active_ticks = 0
+        self.idle_ticks = 0
+
+    def update(self, rankings, race_time):
+        """Interval for the next tick after the tick with these rankings, and why"""
+        if not self.enabled:
+            return self.interval, self.reason
+
+        reason = self._activity(rankings)
+        if reason is not None:
+            self._last_active_time = race_time
+        elif self._last_active_time is not None and 0 <= race_time - self._last_active_time < self.hold_seconds:
+            reason = 'hold'
+
+        if reason is None:
+            self.interval, self.reason = self.idle_interval, 'idle'
+            self.idle_ticks += 1
+        else:
+            self.interval, self.reason = self.active_interval, reason
+            self.active_ticks += 1
+        return self.interval, self.reason
+
+    def _activity(self, rankings):
+        """'close_gap', 'status_change' or None for one tick's rankings"""
+        statuses = {car['car_id']: car['status'] for car in rankings}
+        status_changed = any(self._last_statuses.get(car_id, status) != status
+                             for car_id, status in statuses.items())
+        self._last_statuses = statuses
+
+        racing = [car for car in rankings if car['status'] != 'OUT']
+        for ahead, car in zip(racing, racing[1:]):
+            if car['distance_traveled'] > 0 and ahead['distance_traveled'] - car['distance_traveled'] < self.gap_threshold:
+                return 'close_gap'
+
+        if status_changed:
+            return 'status_change'
+        return None
+
+    def get_stats(self):
+        """Current rate and how often each rate was chosen"""
+        return {
+            'enabled': self.enabled,
+            'interval': self.interval,
+            'rate_hz': 1.0 / self.interval if self.interval else None,
+            'reason': self.reason,
+            'active_ticks': self.active_ticks,
+            'idle_ticks': self.idle_ticks
+        }
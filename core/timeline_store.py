@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Timeline Store Module
+Columnar on-disk rankings timeline: one raw binary file per column plus
+meta.json, appended tick by tick and read back as memory-mapped arrays
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .ranking_history import STATUS_CODES
+
+# Per-row columns (one row per ranked car per tick, in position order)
+TIMELINE_COLUMNS = {
+    'car_id': np.int32,
+    'position': np.int16,
+    'distance_traveled': np.float64,
+    'current_speed': np.float64,
+    'lat': np.float64,
+    'lon': np.float64,
+    'status': np.int8,
+    'gap_to_leader': np.float64,
+    'gap_to_ahead': np.float64,
+    'distance_gap_to_leader': np.float64,
+    'distance_gap_to_ahead': np.float64
+}
+
+# Per-tick columns
+TICK_COLUMNS = {
+    'race_time': np.float64,
+    'row_count': np.int32
+}
+
+META_FILE = 'meta.json'
+_STATUS_INDEX = {status: code for code, status in enumerate(STATUS_CODES)}
+
+
+def rankings_to_columns(rankings):
+    """Column arrays for one tick's rankings list (as built by calculate_live_rankings)"""
+    columns = {}
+    for name, dtype in TIMELINE_COLUMNS.items():
+        if name == 'status':
+            values = [_STATUS_INDEX.get(car['status'], _STATUS_INDEX['OUT']) for car in rankings]
+        else:
+            values = [car[name] for car in rankings]
+        columns[name] = np.asarray(values, dtype=dtype)
+    return columns
+
+
+def concat_columns(blocks):
+    """Concatenate a list of column dicts"""
+    return {name: np.concatenate([block[name] for block in blocks]) if blocks else np.zeros(0, dtype=dtype)
+            for name, dtype in TIMELINE_COLUMNS.items()}
+
+
+class TimelineWriter:
+    """Appends ticks to a columnar timeline directory.
+
+    meta.json is written on close(); a directory without a complete
+    meta.json is an unfinished run and is not opened by Timeline.
+    """
+
+    def __init__(self, path, metadata=None):
+        self.path = path
+        self.metadata = metadata or {}
+        self.rows = 0
+        self.ticks = 0
+        os.makedirs(path, exist_ok=True)
+
+        # Drop a stale meta.json first so a crash mid-write never looks complete
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+
+        self._files = {}
+        for name in list(TIMELINE_COLUMNS) + [f'tick_{name}' for name in TICK_COLUMNS]:
+            self._files[name] = open(os.path.join(path, f'{name}.bin'), 'wb')
+
+    def append(self, race_times, row_counts, columns):
+        """Append a block of ticks: per-tick race times and row counts, and their rows"""
+        race_times = np.asarray(race_times, dtype=TICK_COLUMNS['race_time'])
+        row_counts = np.asarray(row_counts, dtype=TICK_COLUMNS['row_count'])
+        self._files['tick_race_time'].write(race_times.tobytes())
+        self._files['tick_row_count'].write(row_counts.tobytes())
+
+        for name, dtype in TIMELINE_COLUMNS.items():
+            self._files[name].write(np.asarray(columns[name], dtype=dtype).tobytes())
+
+        self.ticks += len(race_times)
+        self.rows += int(row_counts.sum())
+
+    def close(self):
+        """Flush the column files and write meta.json"""
+        for f in self._files.values():
+            f.close()
+
+        meta = {
+            'complete': True,
+            'rows': self.rows,
+            'ticks': self.ticks,
+            'columns': {name: np.dtype(dtype).str for name, dtype in TIMELINE_COLUMNS.items()},
+            'tick_columns': {name: np.dtype(dtype).str for name, dtype in TICK_COLUMNS.items()},
+            'status_codes': list(STATUS_CODES),
+            'metadata': self.metadata
+        }
+        with open(os.path.join(self.path, META_FILE), 'w') as f:
+            json.dump(meta, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            for f in self._files.values():
+                f.close()
+
+
+def read_timeline_meta(path):
+    """meta.json of a complete timeline, or None"""
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('complete') else None
+
+
+class Timeline:
+    """Read-only, memory-mapped view of a timeline directory"""
+
+    def __init__(self, path):
+        meta = read_timeline_meta(path)
+        if meta is None:
+            raise ValueError(f"No complete timeline in {path}")
+        self.path = path
+        self.meta = meta
+        self.metadata = meta.get('metadata', {})
+        self.status_codes = meta.get('status_codes', list(STATUS_CODES))
+
+        self.columns = {name: self._map(f'{name}.bin', dtype, meta['rows'])
+                        for name, dtype in meta['columns'].items()}
+        self.race_times = self._map('tick_race_time.bin', meta['tick_columns']['race_time'], meta['ticks'])
+        row_counts = self._map('tick_row_count.bin', meta['tick_columns']['row_count'], meta['ticks'])
+        self.row_starts = np.concatenate(([0], np.cumsum(row_counts, dtype=np.int64)))
+
+    def _map(self, file_name, dtype, length):
+        """Memory-map one column file (plain empty array when there are no rows)"""
+        if length == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, file_name), dtype=dtype, mode='r', shape=(length,))
+
+    def __len__(self):
+        return len(self.race_times)
+
+    def tick_at(self, race_seconds):
+        """Index of the last tick at or before race_seconds (-1 if before the first)"""
+        return int(np.searchsorted(self.race_times, race_seconds, side='right')) - 1
+
+    def rows(self, tick):
+        """Row slice of one tick"""
+        return slice(int(self.row_starts[tick]), int(self.row_starts[tick + 1]))
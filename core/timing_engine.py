@@ -7,6 +7,7 @@ Core timing and ranking calculation engine
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import math
 import os
 import threading
 import time
@@ -16,36 +17,108 @@ from .performance_monitor import monitor_performance
 from .car_status import CarStatusDetector
 from .forecasting import OvertakingForecaster
 from .distance_reset_handler import DistanceResetHandler
+from .telemetry_index import CarTelemetry, FleetTelemetry, to_nanoseconds
+from .ranking_order import IncrementalRanking
+from .ranking_history import RankingHistory
+from .tick_scheduler import DeadlineScheduler, AdaptiveTickRate
+from .broadcast_pipeline import BroadcastStage
+from .replay_timeline import ReplayTimeline
+from .frame_codec import DeltaEncoder, encode_msgpack
+from .subscriptions import SubscriptionRegistry, filter_payload
+from .timing_snapshot import TimingSnapshot
+from .event_stream import SnapshotStream
+from .rankings_snapshot import RankingsSnapshot
 
 
 class F1LiveTiming:
     """Main F1 Live Timing System"""
     
-    def __init__(self, data_directory, socketio_instance):
+    def __init__(self, data_directory, socketio_instance, room=None, session_id=None):
         self.data_directory = data_directory
         self.socketio = socketio_instance
+        self.room = room  # Socket.IO room for broadcasts (None = all clients)
+        self.session_id = session_id  # Hosted session, carried in every timing payload and frame
+        self.detached_clients = frozenset()  # Client sids watching their own replay cursor
+        self.delta_clients = frozenset()  # Client sids receiving delta-encoded timing_frame events
+        self.delta_room = f"{room}:delta" if room else "timing_delta"
+        self.subscriptions = SubscriptionRegistry(room or "timing")  # Clients following a subset of cars
+        self.binary_clients = frozenset()  # Client sids receiving MessagePack timing_update_bin events
+        self.binary_room = f"{room}:msgpack" if room else "timing_msgpack"
+        self.timing_stream = SnapshotStream(config.Streaming.MAX_SSE_CLIENTS)  # Server-Sent Events readers
+        self.frame_encoder = DeltaEncoder(config.Protocol.KEYFRAME_INTERVAL, config.Protocol.DELTA_PRECISION)
+        self._delta_lock = threading.Lock()
         self.car_data = {}
+        self.fleet_telemetry = None  # Batched lookup arrays, built after loading
         self.current_time = None
         self.race_start_time = None
-        self.current_rankings = []
+        self.rankings_snapshot = RankingsSnapshot()  # Published rankings of the last tick (swapped, never modified)
+        self.ranking_order = IncrementalRanking()  # Order kept across ticks with local swaps
+        self.rankings_history = RankingHistory(config.Performance.MAX_RANKINGS_HISTORY, 0)
+        self.replay = None  # Precomputed replay timeline, when enabled
         self.is_running = False
+        self._timing_thread = None
+        self._loop_exiting = False  # The timing thread decided to stop and is only finishing up
+        self._start_lock = threading.Lock()
+        self._state_lock = threading.RLock()  # Serializes ticks with seeks
+        self._snapshot = None  # Serialize-once payload of the current state
+        self._snapshot_seq = 0
+        self._snapshot_rankings = None
+        self._snapshot_state = None
+        self._snapshot_lock = threading.Lock()
+        self._etag_prefix = os.urandom(4).hex()  # ETags of an earlier run never match
+        self.data_version = 0  # Bumped whenever the loaded cars change
         
         # Load configuration settings
         self.update_interval = config.Performance.UPDATE_INTERVAL
         self.broadcast_interval = config.Performance.BROADCAST_INTERVAL
+        self.scheduler = DeadlineScheduler(
+            self.update_interval,
+            config.Performance.TICK_OVERRUN_POLICY,
+            config.Performance.MAX_CATCH_UP_TICKS
+        )
+        self.tick_rate = AdaptiveTickRate(
+            config.Performance.IDLE_TICK_INTERVAL,
+            config.Performance.ACTIVE_TICK_INTERVAL,
+            config.Performance.CLOSE_GAP_METERS,
+            hold_seconds=config.Performance.ACTIVE_HOLD_SECONDS,
+            enabled=config.Performance.ADAPTIVE_TICK_RATE,
+            fixed_interval=self.update_interval
+        )
+        self.broadcast_stage = BroadcastStage(self._emit)  # Emits off the compute thread
         self.distance_cache = {}  # Cache for distance calculations
         self.position_cache = {}  # Cache for position data
         
         # Simulation speed control
         self.simulation_speed = config.Simulation.DEFAULT_SPEED
+        self.high_frequency = config.HighFrequency.ENABLED  # Sub-second steps, interpolated telemetry
+        self.substeps_computed = 0
+        self.pending_overtakes = []  # Overtakes seen since the last broadcast, substeps included
+        self.reported_overtakes = ()  # Overtakes carried by the current timing payload
+        self.substeps_skipped = 0
         
         # Initialize sub-modules
         self.status_detector = CarStatusDetector()
         self.forecaster = OvertakingForecaster()
         self.distance_reset_handler = DistanceResetHandler()
         
+    @property
+    def current_rankings(self):
+        """Rankings of the last published tick: a tuple of read-only car mappings"""
+        return self.rankings_snapshot.rankings
+    
+    @current_rankings.setter
+    def current_rankings(self, rankings):
+        self.publish_rankings(rankings)
+    
+    def publish_rankings(self, rankings):
+        """Swap in a new RankingsSnapshot (one assignment: readers see the old or the new tick whole)"""
+        snapshot = RankingsSnapshot(self.rankings_snapshot.version + 1, rankings)
+        self.rankings_snapshot = snapshot
+        return snapshot.rankings
+    
     def load_car_data(self):
         """Load all car data from CSV files"""
+        car_data = {}
         csv_files = [f for f in os.listdir(self.data_directory) if f.endswith('.csv')]
         print(f"Found {len(csv_files)} CSV files.")
 
@@ -72,7 +145,7 @@ class F1LiveTiming:
                     car_id = int(float(car_id))
                 
                 # Store both the dataframe and truck name
-                self.car_data[car_id] = {
+                car_data[car_id] = {
                     'data': df.sort_values('timeStamp'),
                     'truck_name': truck_name,
                     'file_name': csv_file
@@ -82,7 +155,9 @@ class F1LiveTiming:
             except Exception as e:
                 print(f"Error loading {csv_file}: {str(e)}")
         
-        if self.car_data:
+        if car_data:
+            self.build_telemetry_index(car_data)
+            
             # Find the latest start time among all cars (for synchronized lab race start)
             all_start_times = [car['data']['timeStamp'].min() for car in self.car_data.values()]
             self.race_start_time = max(all_start_times)  # Use latest start to sync all cars
@@ -100,6 +175,31 @@ class F1LiveTiming:
                 
                 print(f"{car_info['truck_name']}: {len(df)} records, {valid_gps_count} with valid GPS")
     
+    def build_telemetry_index(self, car_data=None):
+        """Build numpy lookup arrays for every car and the batched fleet view.
+        
+        The cars (default: the loaded ones) are published as a new car_data
+        dict once every entry has its telemetry; request handlers never see
+        a partly indexed one.
+        """
+        indexed = {}
+        for car_id, car_info in (self.car_data if car_data is None else car_data).items():
+            telemetry = CarTelemetry(car_info['data'])
+            indexed[car_id] = dict(car_info, telemetry=telemetry)
+            
+            if telemetry.xy_fallback_rows:
+                print(f"Warning: Car {car_id} using x,y coordinates (least accurate method) "
+                      f"for {telemetry.xy_fallback_rows} records")
+        
+        self.car_data = indexed
+        self.fleet_telemetry = FleetTelemetry(
+            {car_id: car_info['telemetry'] for car_id, car_info in indexed.items()}
+        )
+        self.data_version += 1
+        self.ranking_order.reset()
+        self.rankings_history = RankingHistory(config.Performance.MAX_RANKINGS_HISTORY,
+                                               len(self.fleet_telemetry.car_ids))
+    
     @monitor_performance
     def calculate_distance_traveled(self, car_id, up_to_time):
         """Calculate total distance traveled with reset detection and recovery"""
@@ -108,16 +208,17 @@ class F1LiveTiming:
         if cache_key in self.distance_cache:
             return self.distance_cache[cache_key]
         
-        df = self.car_data[car_id]['data']
-        mask = df['timeStamp'] <= up_to_time
-        car_positions = df.loc[mask].copy()
-        
-        if len(car_positions) < 2:
+        telemetry = self.car_data[car_id]['telemetry']
+        if telemetry.index_at(to_nanoseconds(up_to_time)) < 1:
             return 0.0
         
         # Calculate preliminary distance using best available method
-        preliminary_distance = self._calculate_preliminary_distance(car_id, car_positions)
+        preliminary_distance = self._calculate_preliminary_distance(car_id, up_to_time)
         
+        return self._finalize_distance(car_id, up_to_time, preliminary_distance, cache_key)
+    
+    def _finalize_distance(self, car_id, up_to_time, preliminary_distance, cache_key):
+        """Run reset detection/recovery on a preliminary distance and cache the result"""
         # Check for distance reset issues
         reset_event = self.distance_reset_handler.detect_distance_reset(
             car_id, up_to_time, preliminary_distance, self.car_data[car_id]
@@ -150,65 +251,23 @@ class F1LiveTiming:
         
         return final_distance
     
-    def _calculate_preliminary_distance(self, car_id, car_positions):
-        """Calculate distance using best available method (before reset detection)"""
-        # Method 1: Try GPS-based calculation for cars with valid coordinates
-        if 'lat' in car_positions.columns and 'lon' in car_positions.columns:
-            valid_gps = (car_positions['lat'] != 0.0) & (car_positions['lon'] != 0.0) & \
-                       (~car_positions['lat'].isna()) & (~car_positions['lon'].isna())
-            
-            if valid_gps.any():
-                car_positions_gps = car_positions[valid_gps].copy()
-                if len(car_positions_gps) >= 2:
-                    # Calculate distance using lat/lon (more accurate for lab races)
-                    lat_diff = car_positions_gps['lat'].diff() * 111000  # ~111km per degree
-                    lon_diff = car_positions_gps['lon'].diff() * 111000 * np.cos(np.radians(car_positions_gps['lat']))
-                    distances = np.sqrt(lat_diff**2 + lon_diff**2)
-                    total_distance = distances.sum()
-                    return total_distance
-        
-        # Method 2: Speed integration method (more accurate for lab data)
-        if 'speed' in car_positions.columns and not car_positions['speed'].isna().all():
-            # Remove invalid speed data
-            valid_speed = car_positions['speed'].notna() & (car_positions['speed'] >= 0)
-            if valid_speed.any():
-                speed_data = car_positions[valid_speed].copy()
-                if len(speed_data) >= 2:
-                    # Calculate time differences in seconds
-                    speed_data['time_diff'] = speed_data['timeStamp'].diff().dt.total_seconds()
-                    
-                    # Convert speed from km/h to m/s and integrate over time
-                    speed_data['speed_ms'] = speed_data['speed'] * 1000 / 3600
-                    speed_data['distance_segment'] = speed_data['speed_ms'] * speed_data['time_diff']
-                    
-                    # Remove invalid segments
-                    valid_segments = speed_data['distance_segment'].notna() & (speed_data['distance_segment'] >= 0)
-                    total_distance = speed_data.loc[valid_segments, 'distance_segment'].sum()
-                    return total_distance
-        
-        # Method 3: Fallback to x,y coordinates (least accurate)
-        print(f"Warning: Car {car_id} using x,y coordinates (least accurate method)")
-        x_diff = car_positions['x'].diff()
-        y_diff = car_positions['y'].diff()
-        distances = np.sqrt(x_diff**2 + y_diff**2)
-        total_distance = distances.sum()
+    def _calculate_preliminary_distance(self, car_id, up_to_time):
+        """Calculate distance using best available method (before reset detection).
         
-        return total_distance
+        GPS is preferred, then speed integration, then x,y coordinates; the
+        cumulative distances for each row are precomputed in CarTelemetry.
+        """
+        return self.car_data[car_id]['telemetry'].distance_at(to_nanoseconds(up_to_time))
     
     def get_car_position_at_time(self, car_id, target_time):
         """Get car's position data at a specific time"""
-        df = self.car_data[car_id]['data']
-        
-        # Find the closest timestamp
-        time_diff = abs(df['timeStamp'] - target_time)
-        if len(time_diff) == 0:
+        # Closest timestamp via binary search on the telemetry index
+        row = self.car_data[car_id]['telemetry'].position_at(to_nanoseconds(target_time))
+        if row is None:
             return None
-            
-        closest_idx = time_diff.idxmin()
-        row = df.loc[closest_idx]
         
         return {
-            'timestamp': row['timeStamp'],
+            'timestamp': row['timestamp'],
             'lat': row['lat'] if not pd.isna(row['lat']) else 0,
             'lon': row['lon'] if not pd.isna(row['lon']) else 0,
             'speed': row['speed'] if not pd.isna(row['speed']) else 0,
@@ -301,156 +360,236 @@ class F1LiveTiming:
             }
     
     @monitor_performance
-    def calculate_live_rankings(self):
-        """Calculate current rankings and intervals with synchronized timestamps"""
-        rankings = []
+    def calculate_live_rankings(self, record_history=True):
+        """Calculate current rankings and intervals with synchronized timestamps.
+        
+        record_history=False leaves the ranking history alone (high-frequency
+        substeps), so its fixed number of entries keeps covering the same
+        race time whatever the substep count.
+        """
         # Ensure all calculations use the exact same timestamp
         synchronized_time = self.current_time
+        if not self.car_data or synchronized_time is None:
+            self.current_rankings = []
+            return []
         
-        for car_id in self.car_data.keys():
-            # Check if car has data at synchronized time
-            df = self.car_data[car_id]['data']
-            if synchronized_time < df['timeStamp'].min() or synchronized_time > df['timeStamp'].max():
-                continue
-            
-            # Calculate distance at the synchronized timestamp
-            distance = self.calculate_distance_traveled(car_id, synchronized_time)
-            position_data = self.get_car_position_at_time(car_id, synchronized_time)
-            
-            # Determine car status at synchronized time
-            status = self.determine_car_status(car_id, synchronized_time)
-            
-            if position_data:
-                race_time = (synchronized_time - self.race_start_time).total_seconds()
-                
-                rankings.append({
-                    'car_id': car_id,
-                    'truck_name': self.car_data[car_id]['truck_name'],
-                    'distance_traveled': distance,
-                    'current_speed': position_data['speed'],
-                    'race_time': race_time,
-                    'lat': position_data['lat'],
-                    'lon': position_data['lon'],
-                    'timestamp': synchronized_time.isoformat(),
-                    'status': status,
-                    'sync_timestamp': synchronized_time  # Store for gap calculations
-                })
-        
-        # Sort by distance traveled (descending)
-        rankings.sort(key=lambda x: x['distance_traveled'], reverse=True)
-        
-        # Add position numbers and calculate intervals
-        for i, car in enumerate(rankings):
-            car['position'] = i + 1
-        
-        # Calculate intervals with enhanced accuracy for lab races
-        if rankings:
-            # Leader has no gap
-            rankings[0]['gap_to_leader'] = 0.0
-            rankings[0]['gap_to_ahead'] = 0.0
-            rankings[0]['distance_gap_to_leader'] = 0.0
-            rankings[0]['distance_gap_to_ahead'] = 0.0
-            
-            leader_distance = rankings[0]['distance_traveled']
+        fleet = self.fleet_telemetry
+        t_ns = to_nanoseconds(synchronized_time)
+        
+        # Replay mode: read the precomputed row instead of computing the tick
+        if self.replay is not None:
+            rankings = self._replay_rankings(synchronized_time, record_history)
+            if rankings is not None:
+                return rankings
+        
+        # Cars with data at the synchronized time
+        active = np.flatnonzero(fleet.active(t_ns))
+        if len(active) == 0:
+            self.current_rankings = []
+            self.ranking_order.reset()
+            return []
+        
+        # One batched lookup for distance and position of every car
+        if self.high_frequency:
+            # Between samples: interpolate instead of holding the last row
+            interpolation = fleet.interpolation_at(t_ns)
+            preliminary = fleet.interpolated_distance_at(t_ns, interpolation)[active]
+            speeds = np.nan_to_num(fleet.interpolate(fleet.speed, interpolation)[active])
+            lats = np.nan_to_num(fleet.interpolate(fleet.lat, interpolation)[active])
+            lons = np.nan_to_num(fleet.interpolate(fleet.lon, interpolation)[active])
+        else:
+            preliminary = fleet.distance_at(t_ns)[active]
+            nearest = fleet.nearest_index(t_ns)[active]
+            speeds = np.nan_to_num(fleet.speed[nearest])
+            lats = np.nan_to_num(fleet.lat[nearest])
+            lons = np.nan_to_num(fleet.lon[nearest])
+        
+        car_ids = [fleet.car_ids[i] for i in active]
+        distances = np.array([
+            self._resolve_tick_distance(car_id, synchronized_time, preliminary[k])
+            for k, car_id in enumerate(car_ids)
+        ])
+        
+        # Order by distance traveled (descending): local swaps from the last tick's order
+        order = self.ranking_order.update(active, distances)
+        distances = distances[order]
+        slots = active[order]
+        statuses = self.status_detector.determine_fleet_status(fleet, slots, synchronized_time)
+        
+        (distance_gap_to_leader, distance_gap_to_ahead,
+         time_gap_to_leader, time_gap_to_ahead) = self._ranking_gaps(t_ns, slots, distances)
+        
+        race_time = (synchronized_time - self.race_start_time).total_seconds()
+        timestamp = synchronized_time.isoformat()
+        if record_history:
+            self.rankings_history.record(race_time, slots, distances, time_gap_to_leader,
+                                         time_gap_to_ahead, statuses)
+        
+        rankings = []
+        for position, k in enumerate(order):
+            car_id = car_ids[k]
             
-            for i in range(1, len(rankings)):
-                car = rankings[i]
-                car_ahead = rankings[i-1]
-                
-                # Distance gaps (calculated at same synchronized timestamp)
-                distance_gap_to_leader = leader_distance - car['distance_traveled']
-                distance_gap_to_ahead = car_ahead['distance_traveled'] - car['distance_traveled']
-                
-                # Store distance gaps in the car data
-                car['distance_gap_to_leader'] = distance_gap_to_leader
-                car['distance_gap_to_ahead'] = distance_gap_to_ahead
-                
-                # Enhanced time gap calculation using synchronized timestamp
-                time_gap_to_leader = self._calculate_enhanced_time_gap(
-                    rankings[0], car, distance_gap_to_leader, synchronized_time)
-                time_gap_to_ahead = self._calculate_enhanced_time_gap(
-                    car_ahead, car, distance_gap_to_ahead, synchronized_time)
-                
-                # Apply realistic limits for lab races (max 300 seconds gap)
-                MAX_REALISTIC_GAP = 300.0  # seconds
-                
-                if time_gap_to_leader > MAX_REALISTIC_GAP:
-                    print(f"Warning: Large gap for {car['truck_name']}: {time_gap_to_leader:.1f}s")
-                    time_gap_to_leader = min(time_gap_to_leader, MAX_REALISTIC_GAP)
-                    
-                if time_gap_to_ahead > MAX_REALISTIC_GAP:
-                    time_gap_to_ahead = min(time_gap_to_ahead, MAX_REALISTIC_GAP)
-                
-                car['gap_to_leader'] = time_gap_to_leader
-                car['gap_to_ahead'] = time_gap_to_ahead
+            rankings.append({
+                'car_id': car_id,
+                'truck_name': self.car_data[car_id]['truck_name'],
+                'distance_traveled': float(distances[position]),
+                'current_speed': float(speeds[k]),
+                'race_time': race_time,
+                'lat': float(lats[k]),
+                'lon': float(lons[k]),
+                'timestamp': timestamp,
+                'status': statuses[position],
+                'sync_timestamp': synchronized_time,  # Store for gap calculations
+                'position': position + 1,
+                'gap_to_leader': float(time_gap_to_leader[position]),
+                'gap_to_ahead': float(time_gap_to_ahead[position]),
+                'distance_gap_to_leader': float(distance_gap_to_leader[position]),
+                'distance_gap_to_ahead': float(distance_gap_to_ahead[position])
+            })
         
         # Validate timestamp synchronization for debugging
         self.validate_timestamp_synchronization(rankings)
         
-        self.current_rankings = rankings
-        return rankings
+        self._note_overtakes([car['car_id'] for car in rankings], race_time)
+        return self.publish_rankings(rankings)
     
-    def _calculate_enhanced_time_gap(self, leading_car, following_car, distance_gap, synchronized_time):
-        """Calculate more accurate time gap using average speeds and race progression at synchronized timestamp"""
-        if distance_gap <= 0:
-            return 0.0
+    def _replay_rankings(self, synchronized_time, record_history=True):
+        """Rankings from the precomputed timeline (None when the tick is not available)"""
+        race_time = (synchronized_time - self.race_start_time).total_seconds()
+        tick = self.replay.tick_at(race_time)
+        if tick is None:
+            return None
         
-        # Method 1: Use average pace instead of current speed for stability
-        # Both cars calculated using the same synchronized timestamp
-        leading_pace = self.get_average_pace_at_time(leading_car['car_id'], synchronized_time, 30)
-        following_pace = self.get_average_pace_at_time(following_car['car_id'], synchronized_time, 30)
+        rankings, columns = self.timeline_rankings(self.replay.timeline, tick, synchronized_time)
+        car_ids = [car['car_id'] for car in rankings]
+        if record_history:
+            self.rankings_history.record(
+                race_time, [self.fleet_telemetry.slots[car_id] for car_id in car_ids],
+                columns['distance_traveled'], columns['gap_to_leader'], columns['gap_to_ahead'],
+                [car['status'] for car in rankings])
         
-        # Convert to m/s
-        leading_speed_ms = max(leading_pace * 1000 / 3600, 1)
-        following_speed_ms = max(following_pace * 1000 / 3600, 1)
+        self._note_overtakes(car_ids, race_time)
+        return self.publish_rankings(rankings)
+    
+    def _note_overtakes(self, car_ids, race_time):
+        """Queue the overtakes between the published order and `car_ids` for the next broadcast.
         
-        # Enhanced gap calculation considering both cars' paces
-        # Use harmonic mean for more realistic race gap calculation
-        if leading_speed_ms > 0 and following_speed_ms > 0:
-            harmonic_mean_speed = 2 / ((1/leading_speed_ms) + (1/following_speed_ms))
-            time_gap = distance_gap / harmonic_mean_speed
-        else:
-            # Fallback to simple calculation
-            effective_speed = (following_speed_ms + leading_speed_ms) / 2
-            time_gap = distance_gap / max(effective_speed, 1)
+        Substeps publish their order too, so an overtake that happens and
+        reverses within one tick's span is still reported.
+        """
+        previous_ids = [car['car_id'] for car in self.current_rankings]
+        if not previous_ids or previous_ids == car_ids:
+            return
+        previous_position = {car_id: position for position, car_id in enumerate(previous_ids)}
+        overtakes = []
+        for position, car_id in enumerate(car_ids):
+            before = previous_position.get(car_id)
+            if before is None:
+                continue
+            for passed_id in car_ids[position + 1:]:
+                passed_before = previous_position.get(passed_id)
+                if passed_before is not None and passed_before < before:
+                    overtakes.append({'car_id': car_id, 'overtaken_car_id': passed_id,
+                                      'position': position + 1, 'race_time': race_time})
+        if overtakes:
+            limit = config.HighFrequency.MAX_REPORTED_OVERTAKES
+            self.pending_overtakes = (self.pending_overtakes + overtakes)[-limit:]
+    
+    def timeline_rankings(self, timeline, tick, synchronized_time=None):
+        """Rankings dicts of one precomputed timeline tick, and its column slices (no engine state touched)"""
+        rows = timeline.rows(tick)
+        columns = {name: column[rows] for name, column in timeline.columns.items()}
+        if synchronized_time is None:
+            synchronized_time = self.race_start_time + timedelta(seconds=float(timeline.race_times[tick]))
+        race_time = (synchronized_time - self.race_start_time).total_seconds()
+        car_ids = columns['car_id'].tolist()
+        statuses = [timeline.status_codes[code] for code in columns['status']]
+        timestamp = synchronized_time.isoformat()
+        
+        rankings = []
+        for position, car_id in enumerate(car_ids):
+            rankings.append({
+                'car_id': car_id,
+                'truck_name': self.car_data[car_id]['truck_name'],
+                'distance_traveled': float(columns['distance_traveled'][position]),
+                'current_speed': float(columns['current_speed'][position]),
+                'race_time': race_time,
+                'lat': float(columns['lat'][position]),
+                'lon': float(columns['lon'][position]),
+                'timestamp': timestamp,
+                'status': statuses[position],
+                'sync_timestamp': synchronized_time,
+                'position': position + 1,
+                'gap_to_leader': float(columns['gap_to_leader'][position]),
+                'gap_to_ahead': float(columns['gap_to_ahead'][position]),
+                'distance_gap_to_leader': float(columns['distance_gap_to_leader'][position]),
+                'distance_gap_to_ahead': float(columns['distance_gap_to_ahead'][position])
+            })
+        return rankings, columns
+    
+    def _resolve_tick_distance(self, car_id, synchronized_time, preliminary_distance):
+        """Final distance for a car from a batched preliminary distance (reset handling + cache)"""
+        cache_key = f"{car_id}_{synchronized_time.timestamp()}"
+        if cache_key in self.distance_cache:
+            return self.distance_cache[cache_key]
         
-        # Method 2: Apply pace differential adjustment
-        pace_differential = following_pace - leading_pace
+        telemetry = self.car_data[car_id]['telemetry']
+        if telemetry.index_at(to_nanoseconds(synchronized_time)) < 1:
+            return 0.0
+        
+        return self._finalize_distance(car_id, synchronized_time, float(preliminary_distance), cache_key)
+    
+    def _ranking_gaps(self, t_ns, slots, distances):
+        """Distance and time gaps to the leader and the car ahead (arrays in position order)"""
+        # Distance gaps (calculated at same synchronized timestamp)
+        distance_gap_to_leader = distances[0] - distances
+        distance_gap_to_ahead = np.zeros(len(distances))
+        distance_gap_to_ahead[1:] = distances[:-1] - distances[1:]
         
-        if abs(pace_differential) > 2:  # Significant pace difference (> 2 km/h)
-            # If following car is consistently faster, they'll close the gap faster
-            # If leading car is consistently faster, the gap is more stable
-            adjustment_factor = 1.0 - (pace_differential * 0.05)  # 5% per km/h difference
-            adjustment_factor = max(0.6, min(1.5, adjustment_factor))  # Limit adjustment
-            time_gap *= adjustment_factor
+        # Time gaps: how long ago the car ahead was at this car's distance.
+        # Reset recovery can move a final distance off the raw curve, so each
+        # curve is shifted to pass through the car's final distance now.
+        corrections = distances - self.fleet_telemetry.envelope_at(t_ns)[slots]
+        time_gap_to_leader = self._calculate_time_gaps(
+            np.full(len(slots), slots[0]), np.full(len(slots), corrections[0]),
+            distances, distance_gap_to_leader, t_ns)
+        ahead = np.concatenate(([0], np.arange(len(slots) - 1)))
+        time_gap_to_ahead = self._calculate_time_gaps(
+            slots[ahead], corrections[ahead], distances, distance_gap_to_ahead, t_ns)
+        
+        return distance_gap_to_leader, distance_gap_to_ahead, time_gap_to_leader, time_gap_to_ahead
+    
+    def _calculate_time_gaps(self, ahead_slots, ahead_corrections, distances, distance_gaps, t_ns):
+        """Seconds since each car ahead was at the following car's current distance.
         
-        return time_gap
+        Inverse lookup (searchsorted) on the ahead car's distance-time curve,
+        O(log n) per car; cars level with or ahead of their reference get 0.
+        """
+        reached_ns = self.fleet_telemetry.time_at_distance(ahead_slots, distances - ahead_corrections)
+        time_gaps = np.maximum((t_ns - reached_ns) / 1e9, 0.0)
+        return np.where(distance_gaps <= 0, 0.0, time_gaps)
     
     def get_average_pace_at_time(self, car_id, reference_time, time_window_seconds=60):
         """Calculate average pace over a time window at a specific synchronized timestamp"""
         try:
-            df = self.car_data[car_id]['data']
+            telemetry = self.car_data[car_id]['telemetry']
             
-            # Get data from the time window ending at reference_time
-            start_time = reference_time - pd.Timedelta(seconds=time_window_seconds)
-            mask = (df['timeStamp'] >= start_time) & (df['timeStamp'] <= reference_time)
-            recent_data = df.loc[mask].copy()
+            # Window mean from the speed prefix sums (any window length)
+            end_ns = to_nanoseconds(reference_time)
+            start_ns = end_ns - int(time_window_seconds * 1e9)
+            mean_speed, rows, samples, lo, hi = telemetry.window_mean_speed(start_ns, end_ns)
             
-            if len(recent_data) < 2:
+            if rows < 2:
                 return self._get_current_speed_from_data_at_time(car_id, reference_time)
             
-            # Calculate average speed from distance and time
-            if 'speed' in recent_data.columns and not recent_data['speed'].isna().all():
-                valid_speeds = recent_data['speed'].dropna()
-                if len(valid_speeds) > 0:
-                    return valid_speeds.mean()
+            if samples > 0:
+                return mean_speed
             
-            # Fallback: calculate from position changes
-            time_span = (recent_data['timeStamp'].max() - recent_data['timeStamp'].min()).total_seconds()
+            # Fallback: distance covered between the first and last rows of the window
+            first_ns, last_ns = telemetry.timestamps[lo], telemetry.timestamps[hi - 1]
+            time_span = (last_ns - first_ns) / 1e9
             if time_span > 0:
-                distance_start = self.calculate_distance_traveled(car_id, recent_data['timeStamp'].min())
-                distance_end = self.calculate_distance_traveled(car_id, recent_data['timeStamp'].max())
-                distance_covered = distance_end - distance_start
+                distance_covered = telemetry.distance_at(last_ns) - telemetry.distance_at(first_ns)
                 
                 if distance_covered > 0:
                     avg_speed_ms = distance_covered / time_span
@@ -490,48 +629,7 @@ class F1LiveTiming:
     
     def get_average_pace(self, car_id, time_window_seconds=60):
         """Calculate average pace over a time window for more stable gap calculations"""
-        try:
-            df = self.car_data[car_id]['data']
-            
-            # Get data from the last time window
-            start_time = self.current_time - pd.Timedelta(seconds=time_window_seconds)
-            mask = (df['timeStamp'] >= start_time) & (df['timeStamp'] <= self.current_time)
-            recent_data = df.loc[mask].copy()
-            
-            if len(recent_data) < 2:
-                return self._get_current_speed_from_data(car_id)
-            
-            # Calculate average speed from distance and time
-            if 'speed' in recent_data.columns and not recent_data['speed'].isna().all():
-                valid_speeds = recent_data['speed'].dropna()
-                if len(valid_speeds) > 0:
-                    return valid_speeds.mean()
-            
-            # Fallback: calculate from position changes
-            time_span = (recent_data['timeStamp'].max() - recent_data['timeStamp'].min()).total_seconds()
-            if time_span > 0:
-                distance_start = self.calculate_distance_traveled(car_id, recent_data['timeStamp'].min())
-                distance_end = self.calculate_distance_traveled(car_id, recent_data['timeStamp'].max())
-                distance_covered = distance_end - distance_start
-                
-                if distance_covered > 0:
-                    avg_speed_ms = distance_covered / time_span
-                    return avg_speed_ms * 3600 / 1000  # Convert to km/h
-            
-            return self._get_current_speed_from_data(car_id)
-            
-        except Exception as e:
-            return self._get_current_speed_from_data(car_id)
-    
-    def _get_current_speed_from_data(self, car_id):
-        """Helper method to get current speed from car data"""
-        try:
-            position_data = self.get_current_data(car_id, self.current_time)
-            if position_data and 'speed' in position_data:
-                return position_data['speed']
-            return 0.0
-        except:
-            return 0.0
+        return self.get_average_pace_at_time(car_id, self.current_time, time_window_seconds)
     
     def _rankings_changed_significantly(self, old_rankings, new_rankings):
         """Check if rankings have changed significantly"""
@@ -553,89 +651,434 @@ class F1LiveTiming:
         return False
 
     def start_live_timing(self):
-        """Start the live timing simulation with optimized performance"""
-        self.is_running = True
+        """Start the live timing simulation with optimized performance.
         
+        Returns False when a timing thread is already running (it is kept,
+        and resumes if it was stopping). A thread that has already left its
+        loop and is only flushing the last broadcast is joined and replaced.
+        """
+        with self._start_lock:
+            with self._state_lock:
+                self.is_running = True
+                thread = self._timing_thread
+                if thread is not None and thread.is_alive() and not self._loop_exiting:
+                    return False
+            if thread is not None:
+                thread.join()
+            self._loop_exiting = False
+            self._start_timing_thread()
+            return True
+    
+    def _start_timing_thread(self):
+        """Run a new timing loop in a daemon thread"""
         # Get the time range
-        all_times = []
-        for car_data in self.car_data.values():
-            all_times.extend(car_data['data']['timeStamp'].tolist())
-        
-        end_time = max(all_times)
+        end_time = self.get_session_end_time()
         
         def timing_loop():
             last_rankings = None
             update_counter = 0
+            self.tick_rate.reset()
+            self.scheduler.interval = self.tick_rate.interval
+            self.scheduler.reset_stats()
+            self.scheduler.start()
+            self.broadcast_stage.start()
             
-            while self.is_running and self.current_time <= end_time:
-                rankings = self.calculate_live_rankings()
-                
-                # Only emit if data has changed significantly or every nth update
-                update_counter += 1
-                should_broadcast = (
-                    update_counter % self.broadcast_interval == 0 or  # Every nth update
-                    self._rankings_changed_significantly(last_rankings, rankings)
-                )
+            while True:
+                with self._state_lock:
+                    if not self.is_running or self.current_time > end_time:
+                        # Decided under the lock, so start_live_timing knows this loop will not tick again
+                        self._loop_exiting = True
+                        break
+                    rankings = self.calculate_live_rankings()
+                    race_seconds = (self.current_time - self.race_start_time).total_seconds()
+                    tick_interval, _ = self.tick_rate.update(rankings, race_seconds)
+                    
+                    # Only emit if data has changed significantly or every nth update
+                    update_counter += 1
+                    should_broadcast = (
+                        update_counter % self.broadcast_interval == 0 or  # Every nth update
+                        self._rankings_changed_significantly(last_rankings, rankings) or
+                        bool(self.pending_overtakes)  # Including ones seen only in substeps
+                    )
+                    
+                    if should_broadcast:
+                        self.reported_overtakes, self.pending_overtakes = tuple(self.pending_overtakes), []
+                        # Hand off to the broadcast stage; a snapshot still unsent is replaced
+                        self.broadcast_stage.publish('timing_update', self.get_snapshot())
+                        last_rankings = rankings or None  # Published tuple: never modified
                 
-                if should_broadcast:
-                    timing_data = self.get_current_data()
-                    self.socketio.emit('timing_update', timing_data)
-                    last_rankings = rankings.copy() if rankings else None
+                # Wait for the next deadline (real time); skipped ticks still advance race time
+                self.scheduler.set_interval(tick_interval)
+                intervals = self.scheduler.wait()
                 
                 # Advance simulation time based on speed setting
-                race_time_advance_seconds = self.update_interval * self.simulation_speed
-                race_time_advance = timedelta(seconds=race_time_advance_seconds)
-                self.current_time += race_time_advance
-                
-                # Always sleep for the update interval (real time)
-                time.sleep(self.update_interval)
+                race_time_advance_seconds = tick_interval * self.simulation_speed * intervals
+                with self._state_lock:
+                    if not self.is_running:
+                        self._loop_exiting = True
+                        break  # Stopped or reset during the wait: leave the clock where it was set
+                    self._advance_race_time(race_time_advance_seconds, tick_interval)
+            
+            # Flush the last snapshot before any finish notification
+            self.broadcast_stage.stop()
             
             # Reset to start when finished and notify clients
-            if self.current_time > end_time:
-                self.current_time = self.race_start_time
-                self.socketio.emit('race_finished', {'message': 'Race completed, resetting to start'})
+            with self._state_lock:
+                finished = self.current_time > end_time
+                if finished:
+                    self.current_time = self.race_start_time
+            if finished:
+                self._emit('race_finished', {'message': 'Race completed, resetting to start'})
         
-        timing_thread = threading.Thread(target=timing_loop)
-        timing_thread.daemon = True
-        timing_thread.start()
+        self._timing_thread = threading.Thread(target=timing_loop)
+        self._timing_thread.daemon = True
+        self._timing_thread.start()
+    
+    def _advance_race_time(self, seconds, tick_interval):
+        """Move the clock forward by `seconds` of race time.
+        
+        In high-frequency mode the span is not jumped over: the steps in
+        between (at most SUBSTEP_SECONDS apart) are computed so overtakes
+        inside it reach the ranking order and reset detection. The ranking
+        history is only recorded at tick cadence, so it spans the same race
+        time as without substeps. Intermediate steps stop once they use
+        CPU_BUDGET_FRACTION of the tick interval.
+        """
+        start_time = self.current_time
+        target_time = start_time + timedelta(seconds=seconds)
+        
+        if self.high_frequency:
+            hf = config.HighFrequency
+            steps = min(int(math.ceil(seconds / hf.SUBSTEP_SECONDS - 1e-9)), hf.MAX_SUBSTEPS_PER_TICK)
+            budget_end = time.perf_counter() + tick_interval * hf.CPU_BUDGET_FRACTION
+            
+            for step in range(1, steps):
+                if time.perf_counter() > budget_end:
+                    self.substeps_skipped += steps - step
+                    break
+                self.current_time = start_time + timedelta(seconds=seconds * step / steps)
+                self.calculate_live_rankings(record_history=False)
+                self.substeps_computed += 1
+        
+        self.current_time = target_time
     
     def stop_live_timing(self):
         """Stop the live timing simulation"""
         self.is_running = False
     
+    def reset_race(self):
+        """Stop and seek to race start (serialized with ticks: the loop never advances a reset clock)"""
+        with self._state_lock:
+            self.stop_live_timing()
+            if self.fleet_telemetry is None:
+                self.current_rankings = []  # Nothing loaded: nothing to seek in
+                return
+            self.seek(0)  # Also clears the distance cache, reset history, ranking order and history
+    
+    def share_telemetry_from(self, other):
+        """Use another engine's loaded session data instead of loading it again.
+        
+        Car data and telemetry arrays are never modified after loading, so
+        they are shared as-is; clock, caches and reset history stay per engine.
+        """
+        self.car_data = other.car_data
+        self.fleet_telemetry = other.fleet_telemetry
+        self.data_version += 1
+        self.ranking_order.reset()
+        self.rankings_history = RankingHistory(config.Performance.MAX_RANKINGS_HISTORY,
+                                               len(other.fleet_telemetry.car_ids))
+        self.race_start_time = other.race_start_time
+        self.current_time = other.race_start_time
+    
+    def headless_copy(self):
+        """Engine without SocketIO sharing this engine's loaded telemetry (read-only)"""
+        engine = F1LiveTiming(self.data_directory, None)
+        engine.share_telemetry_from(self)
+        return engine
+    
+    def enable_replay_timeline(self, background=True):
+        """Serve ticks from a precomputed timeline (loaded from a previous run or built now)"""
+        self.replay = ReplayTimeline(self)
+        self.replay.load_or_build(background)
+        return self.replay
+    
+    def get_replay_status(self):
+        """Precomputed timeline state"""
+        if self.replay is None:
+            return {'state': 'disabled'}
+        return self.replay.get_status()
+    
+    def get_session_end_time(self):
+        """Timestamp of the last telemetry row of any car"""
+        return pd.Timestamp(int(self.fleet_telemetry.last_timestamps.max()))
+    
+    def seek(self, race_seconds):
+        """Move the replay to any race time (seconds from start) without replaying.
+        
+        Odometers and window aggregates are lookups on the precomputed
+        telemetry arrays; the reset handler history, ranking order and the
+        recent ranking history are rebuilt from those checkpoints.
+        Returns the race time actually used (clamped to the session).
+        """
+        session_seconds = (self.get_session_end_time() - self.race_start_time).total_seconds()
+        race_seconds = min(max(float(race_seconds), 0.0), session_seconds)
+        target_time = self.race_start_time + timedelta(seconds=race_seconds)
+        
+        with self._state_lock:
+            self.current_time = target_time
+            self.distance_cache.clear()
+            self.ranking_order.reset()
+            self.tick_rate.reset()
+            self._rebuild_reset_history(target_time)
+            self._rebuild_rankings_history(target_time)
+            self.calculate_live_rankings()
+            # Order changes across the jump are not overtakes
+            self.pending_overtakes = []
+            self.reported_overtakes = ()
+        
+        return race_seconds
+    
+    def _rebuild_reset_history(self, target_time):
+        """Seed the reset handler with odometer readings for the ticks just before target_time"""
+        fleet = self.fleet_telemetry
+        tick = timedelta(seconds=self.tick_rate.interval * self.simulation_speed)  # The rate ticks resume at
+        checkpoints = {car_id: [] for car_id in fleet.car_ids}
+        
+        for ticks_back in (3, 2, 1):
+            reading_time = target_time - tick * ticks_back
+            if reading_time < self.race_start_time:
+                continue
+            t_ns = to_nanoseconds(reading_time)
+            distances = fleet.distance_at(t_ns)
+            for slot in np.flatnonzero(fleet.active(t_ns)):
+                checkpoints[fleet.car_ids[slot]].append((reading_time, float(distances[slot])))
+        
+        self.distance_reset_handler.rebuild_history(checkpoints)
+    
+    def _rebuild_rankings_history(self, target_time):
+        """Refill the ranking history window before target_time from the telemetry odometers"""
+        fleet = self.fleet_telemetry
+        self.rankings_history.clear()
+        
+        step = self.tick_rate.interval * self.simulation_speed
+        window = config.Ranking.POSITION_CHANGE_WINDOW_SECONDS
+        race_seconds = (target_time - self.race_start_time).total_seconds()
+        
+        for snapshot_seconds in np.arange(max(race_seconds - window, 0.0), race_seconds, step):
+            snapshot_time = self.race_start_time + timedelta(seconds=float(snapshot_seconds))
+            t_ns = to_nanoseconds(snapshot_time)
+            active = np.flatnonzero(fleet.active(t_ns))
+            if len(active) == 0:
+                continue
+            
+            distances = fleet.distance_at(t_ns)[active]
+            order = np.argsort(-distances, kind='stable')
+            slots, distances = active[order], distances[order]
+            _, _, gap_to_leader, gap_to_ahead = self._ranking_gaps(t_ns, slots, distances)
+            statuses = self.status_detector.determine_fleet_status(fleet, slots, snapshot_time)
+            self.rankings_history.record(float(snapshot_seconds), slots, distances,
+                                         gap_to_leader, gap_to_ahead, statuses)
+    
+    def _emit(self, event, payload):
+        """Emit an event to this engine's room, or all clients (broadcast stage callback).
+        
+        Clients watching their own replay cursor are skipped. For
+        timing_update, each client gets one format, in this order:
+        subscribers get their subset of cars (one payload per distinct
+        subscription), delta subscribers a delta-encoded timing_frame,
+        binary clients columnar MessagePack timing_update_bin, and the
+        rest the full payload.
+        """
+        skipped = self.detached_clients
+        if isinstance(payload, TimingSnapshot):
+            # The full emit reuses the snapshot's cached JSON; the other formats need the dict
+            snapshot, payload = payload, payload.payload
+            if event == 'timing_update':
+                self.timing_stream.publish(snapshot)
+        else:
+            snapshot = None
+        
+        if event == 'timing_update':
+            for key in self.subscriptions.groups:
+                self.socketio.emit(event, filter_payload(payload, key), to=self.subscriptions.room(key),
+                                   skip_sid=list(skipped) or None)
+            skipped = skipped | self.subscriptions.clients
+            
+            if self.delta_clients:
+                frame = self._session_frame(self.frame_encoder.encode(payload))
+                self.socketio.emit('timing_frame', frame, to=self.delta_room, skip_sid=list(skipped) or None)
+                skipped = skipped | self.delta_clients
+            
+            if self.binary_clients:
+                binary = snapshot.cached('msgpack', lambda: encode_msgpack(payload)) if snapshot \
+                    else encode_msgpack(payload)
+                self.socketio.emit('timing_update_bin', binary, to=self.binary_room,
+                                   skip_sid=list(skipped) or None)
+                skipped = skipped | self.binary_clients
+        
+        skip_sid = list(skipped) or None
+        full = snapshot or payload
+        if self.room is None:
+            self.socketio.emit(event, full, skip_sid=skip_sid)
+        else:
+            self.socketio.emit(event, full, to=self.room, skip_sid=skip_sid)
+    
+    def broadcast_current_data(self):
+        """Send the current timing data to every client now, in each client's format"""
+        self._emit('timing_update', self.get_snapshot())
+    
+    def subscribe_delta(self, sid):
+        """Switch a client to delta frames; returns the keyframe it starts from"""
+        with self._delta_lock:
+            self.delta_clients = self.delta_clients | {sid}
+        return self._session_frame(self.frame_encoder.keyframe(self.get_current_data()))
+    
+    def unsubscribe_delta(self, sid):
+        """Return a client to full timing_update payloads"""
+        with self._delta_lock:
+            self.delta_clients = self.delta_clients - {sid}
+            if not self.delta_clients:
+                # Nobody holds the reference state any more
+                self.frame_encoder.reset()
+    
+    def set_binary_encoding(self, sid, enabled):
+        """Send this client timing_update as MessagePack (True) or JSON (False)"""
+        with self._delta_lock:
+            if enabled:
+                self.binary_clients = self.binary_clients | {sid}
+            else:
+                self.binary_clients = self.binary_clients - {sid}
+    
+    def delta_keyframe(self):
+        """Keyframe for a delta client that detected a sequence gap"""
+        return self._session_frame(self.frame_encoder.keyframe(self.get_current_data()))
+    
+    def _session_frame(self, frame):
+        """timing_frame tagged with this engine's session (deltas carry no payload fields of their own)"""
+        frame['session_id'] = self.session_id
+        return frame
+    
+    def release_client(self, sid):
+        """Drop a client's delta, binary and subscription state (disconnected or moved to another session)"""
+        self.unsubscribe_delta(sid)
+        self.set_binary_encoding(sid, False)
+        self.subscriptions.unsubscribe(sid)
+    
+    def get_scheduler_stats(self):
+        """Tick scheduler overrun and lag counters"""
+        stats = self.scheduler.get_stats()
+        stats['broadcast'] = self.broadcast_stage.get_stats()
+        stats['tick_rate'] = self.tick_rate.get_stats()
+        stats['subscriptions'] = self.subscriptions.get_stats()
+        stats['delta_frames'] = dict(self.frame_encoder.get_stats(), clients=len(self.delta_clients))
+        stats['high_frequency'] = {
+            'enabled': self.high_frequency,
+            'substeps_computed': self.substeps_computed,
+            'substeps_skipped': self.substeps_skipped
+        }
+        stats['is_running'] = self.is_running
+        stats['simulation_speed'] = self.simulation_speed
+        return stats
+    
+    def version_etag(self, *parts):
+        """ETag of data versioned outside the tick snapshots, e.g. ('trucks', data_version)"""
+        return '"' + '-'.join([self._etag_prefix, *(str(part) for part in parts)]) + '"'
+    
     def get_current_data(self):
-        """Get current timing data for API"""
+        """Get current timing data for API (shared with the tick's snapshot: do not modify)"""
+        return self.get_snapshot().payload
+    
+    def get_snapshot(self):
+        """Immutable TimingSnapshot of the current state, rebuilt only when the state changed"""
+        state = (self.current_time, self.is_running, self.tick_rate.interval, self.tick_rate.reason,
+                 len(self.car_data))
+        rankings = self.rankings_snapshot  # Read once: the timing thread may publish the next tick meanwhile
+        with self._snapshot_lock:
+            snapshot = self._snapshot
+            if snapshot is not None and self._snapshot_rankings is rankings \
+                    and self._snapshot_state == state:
+                return snapshot
+            
+            self._snapshot_seq += 1
+            self._snapshot_rankings = rankings
+            self._snapshot_state = state
+            self._snapshot = TimingSnapshot(self._snapshot_seq, self._build_current_data(rankings),
+                                            f'"{self._etag_prefix}-{self._snapshot_seq}"')
+            return self._snapshot
+    
+    def _build_current_data(self, rankings):
+        """Timing payload of the current state with a published RankingsSnapshot"""
         # Clean rankings data for JSON serialization (remove sync_timestamp)
         clean_rankings = []
-        if self.current_rankings:
-            for car in self.current_rankings:
+        if rankings:
+            for car in rankings.rankings:
                 clean_car = car.copy()
                 # Remove non-serializable fields
                 clean_car.pop('sync_timestamp', None)
                 clean_rankings.append(clean_car)
         
         return {
+            'session_id': self.session_id,
             'current_time': self.current_time.strftime('%H:%M:%S.%f')[:-3] if self.current_time else '',
             'race_time': (self.current_time - self.race_start_time).total_seconds() if self.current_time and self.race_start_time else 0,
             'rankings': clean_rankings,
+            'overtakes': list(self.reported_overtakes),
             'is_running': self.is_running,
-            'total_cars': len(self.car_data)
+            'total_cars': len(self.car_data),
+            'tick_rate': {
+                'interval': self.tick_rate.interval,
+                'rate_hz': 1.0 / self.tick_rate.interval,
+                'reason': self.tick_rate.reason
+            }
         }
     
+    def ensure_rankings(self):
+        """Published rankings, computing the current tick first (serialized with ticks) when there are none"""
+        rankings = self.current_rankings
+        if rankings:
+            return rankings
+        with self._state_lock:
+            if not self.current_rankings:
+                self.calculate_live_rankings()
+            return self.current_rankings
+    
     def get_comparison_data(self, start_pos=1, count=5):
-        """Get comparison data for specific position range"""
-        if not self.current_rankings:
+        """Get comparison data for specific position range (copies: the published rankings stay untouched)"""
+        rankings = self.current_rankings
+        if not rankings:
             return []
         
         # Get the requested range of cars
-        end_pos = min(start_pos + count - 1, len(self.current_rankings))
-        comparison_cars = self.current_rankings[start_pos-1:end_pos]
+        end_pos = min(start_pos + count - 1, len(rankings))
+        comparison_cars = rankings[start_pos-1:end_pos]
         
         # Add additional comparison metrics
-        for i, car in enumerate(comparison_cars):
-            car['relative_position'] = start_pos + i
-            
-        return comparison_cars
+        return [dict(car, relative_position=start_pos + i) for i, car in enumerate(comparison_cars)]
+    
+    def get_rankings_history(self, from_time=None, to_time=None):
+        """Recorded ranking snapshots between two race times (seconds), oldest first"""
+        car_ids = self.fleet_telemetry.car_ids if self.fleet_telemetry else []
+        return [self.rankings_history.snapshot(index, car_ids)
+                for index in self.rankings_history.range_indices(from_time, to_time)]
+    
+    def get_position_changes(self, window_seconds=None):
+        """Positions gained (positive) or lost per car over the last window_seconds of history"""
+        history = self.rankings_history
+        if window_seconds is None:
+            window_seconds = config.Ranking.POSITION_CHANGE_WINDOW_SECONDS
+        if not len(history):
+            return {}
+        
+        latest = history.latest_index()
+        # Compare with the snapshot at the start of the window, or the oldest one kept
+        earlier = history.index_at(history.race_times[latest] - window_seconds)
+        if earlier is None:
+            earlier = history.oldest_index()
+        
+        current, previous = history.positions_at(latest), history.positions_at(earlier)
+        changes = np.where((current > 0) & (previous > 0), previous - current, 0)
+        car_ids = self.fleet_telemetry.car_ids
+        return {car_ids[slot]: int(changes[slot]) for slot in np.flatnonzero(current)}
     
     def get_truck_list(self):
         """Get list of all trucks with their names"""
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Timing Snapshot Module
+Immutable per-tick timing payload serialized once and shared by the
+Socket.IO emits, the socket request handlers and the HTTP routes
+"""
+
+import json
+import threading
+
+
+class TimingSnapshot:
+    """The get_current_data() payload of one tick, with its encodings cached.
+
+    The payload must be treated as read-only: it is shared by every
+    consumer of the tick. Encodings (JSON text, JSON bytes and any derived
+    payload registered with cached()) are computed on first use and reused
+    until the engine builds the next snapshot.
+    """
+
+    def __init__(self, seq, payload, etag):
+        self.seq = seq
+        self.payload = payload
+        self.etag = etag
+        self._lock = threading.RLock()  # json_bytes builds json_text inside cached()
+        self._cache = {}
+
+    def cached(self, name, build):
+        """Value of build() computed once per snapshot under `name`"""
+        value = self._cache.get(name)
+        if value is None:
+            with self._lock:
+                value = self._cache.get(name)
+                if value is None:
+                    value = build()
+                    self._cache[name] = value
+        return value
+
+    @property
+    def json_text(self):
+        """Compact JSON of the payload"""
+        return self.cached('json_text', lambda: json.dumps(self.payload, separators=(',', ':')))
+
+    @property
+    def json_bytes(self):
+        """UTF-8 JSON of the payload (HTTP response body)"""
+        return self.cached('json_bytes', lambda: self.json_text.encode('utf-8'))
+
+
+class SnapshotJSON:
+    """json module for Socket.IO packets that splices in cached snapshot JSON.
+
+    Socket.IO encodes an event as the JSON list [event, *args]; arguments
+    that are TimingSnapshot objects are written from their cached text
+    instead of being serialized again. Message queue publishes wrap the
+    arguments in a {'method': 'emit', 'data': [...]} message, whose data
+    list is spliced the same way. Everything else goes through json.
+    """
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        if isinstance(obj, list) and any(isinstance(item, TimingSnapshot) for item in obj):
+            separators = kwargs.get('separators') or (',', ':')
+            parts = [item.json_text if isinstance(item, TimingSnapshot) else json.dumps(item, **kwargs)
+                     for item in obj]
+            return '[' + separators[0].join(parts) + ']'
+        if isinstance(obj, dict) and isinstance(obj.get('data'), list) and len(obj) > 1 \
+                and any(isinstance(item, TimingSnapshot) for item in obj['data']):
+            separators = kwargs.get('separators') or (',', ':')
+            rest = json.dumps({key: value for key, value in obj.items() if key != 'data'}, **kwargs)
+            return (rest[:-1] + separators[0] + json.dumps('data') + separators[1]
+                    + SnapshotJSON.dumps(obj['data'], **kwargs) + '}')
+        return json.dumps(obj, **kwargs)
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return json.loads(s, **kwargs)
@@ -10,8 +10,14 @@ The application is now modularized for better maintainability:
 - web_routes.py: Flask route handlers and API endpoints  
 - websocket_handlers.py: SocketIO event handlers
 - config.py: Centralized configuration
+
+With a message queue (config.Scaling.MESSAGE_QUEUE or --message-queue),
+one process runs the engine (--role engine) and any number of web workers
+(--role web --port ...) relay its broadcasts to their own clients.
 """
 
+import argparse
+
 from flask import Flask
 from flask_socketio import SocketIO
 
@@ -19,11 +25,16 @@ from flask_socketio import SocketIO
 from config import config
 
 # Import core modules
-from core import F1LiveTiming
+from core import F1LiveTiming, SessionManager
+from core.session_manager import session_room
+from core.timing_snapshot import SnapshotJSON
+from core.message_queue import create_client_manager
 
 # Import modular components
-from web_routes import register_routes
-from websocket_handlers import register_socketio_handlers
+from web_routes import (register_routes, register_session_routes, register_admission_routes,
+                        register_backpressure_routes, register_compression)
+from websocket_handlers import (register_socketio_handlers, register_session_socketio_handlers,
+                                register_worker_socketio_handlers, create_client_admission)
 
 
 def create_app():
@@ -36,9 +47,19 @@ def create_app():
 
 def create_socketio(app):
     """Create SocketIO instance with configuration"""
+    # With a message queue, emits go through it to every worker sharing the channel;
+    # either way slow clients get coalesced timing frames
+    client_manager = create_client_manager(
+        config.Scaling.MESSAGE_QUEUE, config.Scaling.CHANNEL, json=SnapshotJSON)
+    
     socketio = SocketIO(
         app, 
-        cors_allowed_origins=config.Server.CORS_ALLOWED_ORIGINS
+        cors_allowed_origins=config.Server.CORS_ALLOWED_ORIGINS,
+        json=SnapshotJSON,  # Timing snapshots are sent from their cached JSON
+        client_manager=client_manager,
+        # Long-polling responses; WebSocket frames use permessage-deflate when the browser offers it
+        http_compression=config.Compression.ENABLED,
+        compression_threshold=config.Compression.MIN_SIZE
     )
     return socketio
 
@@ -46,26 +67,71 @@ def create_socketio(app):
 def initialize_timing_system(socketio):
     """Initialize the F1 timing system"""
     data_dir = config.get_data_directory()
-    f1_timing = F1LiveTiming(data_dir, socketio)
+    session_id = config.Sessions.DEFAULT_SESSION_ID
+    f1_timing = F1LiveTiming(data_dir, socketio, room=session_room(session_id), session_id=session_id)
     f1_timing.load_car_data()
+    
+    if config.Replay.USE_PRECOMPUTED_TIMELINE and f1_timing.car_data:
+        f1_timing.enable_replay_timeline(config.Replay.PRECOMPUTE_IN_BACKGROUND)
     return f1_timing
 
 
+def initialize_sessions(socketio, f1_timing):
+    """Session manager holding the default session plus configured extra sessions"""
+    session_manager = SessionManager(socketio)
+    session_manager.add_session(session_manager.default_session_id, f1_timing)
+    
+    for session_id, data_dir in config.Sessions.EXTRA_SESSIONS.items():
+        try:
+            session_manager.create_session(session_id, data_dir)
+        except ValueError as e:
+            print(f"⚠️ Session '{session_id}' not created: {str(e)}")
+    return session_manager
+
+
+def parse_args():
+    """Command line overrides of the server and scaling settings"""
+    parser = argparse.ArgumentParser(description="F1 Live Timing web server")
+    parser.add_argument('--role', choices=['engine', 'web'], help="Engine process or web worker")
+    parser.add_argument('--port', type=int, help="Port to listen on")
+    parser.add_argument('--message-queue', help="Message queue URL shared by the engine and the web workers")
+    return parser.parse_args()
+
+
 def main():
     """Main application entry point"""
+    args = parse_args()
+    if args.role:
+        config.Scaling.ROLE = args.role
+    if args.port:
+        config.Server.PORT = args.port
+    if args.message_queue:
+        config.Scaling.MESSAGE_QUEUE = args.message_queue
+    
     # Print configuration summary
     config.print_config_summary()
     
     # Create Flask app and SocketIO
     app = create_app()
+    register_compression(app)
     socketio = create_socketio(app)
+    admission = create_client_admission(socketio)
+    register_admission_routes(app, admission)
+    register_backpressure_routes(app, socketio)
     
-    # Initialize timing system
-    f1_timing = initialize_timing_system(socketio)
-    
-    # Register routes and handlers
-    register_routes(app, f1_timing)
-    register_socketio_handlers(socketio, f1_timing)
+    if config.Scaling.MESSAGE_QUEUE and config.Scaling.ROLE == 'web':
+        # Web worker: relays the engine's broadcasts, no timing system of its own
+        register_worker_socketio_handlers(socketio, admission)
+    else:
+        # Initialize timing system
+        f1_timing = initialize_timing_system(socketio)
+        session_manager = initialize_sessions(socketio, f1_timing)
+        
+        # Register routes and handlers
+        register_routes(app, f1_timing)
+        register_session_routes(app, session_manager)
+        handlers = register_socketio_handlers(socketio, f1_timing, admission, session_manager)
+        register_session_socketio_handlers(socketio, session_manager, handlers['cursor_pool'])
     
     print("Starting F1 Live Timing Web Server with WebSocket support...")
     print(f"Open your browser and go to: http://localhost:{config.Server.PORT}")
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+F1 Live Timing - Forecast Backtesting Harness
+Replays a recorded session faster than real time and scores
+OvertakingForecaster.forecast_overtake_time against the overtakes that
+actually happened.
+
+Usage:
+    python forecast_backtest.py --data-dir Truck_Cal/cropped_data --step 5 --workers 4
+
+The tick range is split into contiguous time chunks, one per worker process.
+Every worker loads its own F1LiveTiming engine (no SocketIO, no sleeping),
+so distance reset history restarts at each chunk boundary.
+"""
+
+import argparse
+import json
+import os
+import time
+from bisect import bisect_right
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from config import config
+from core import F1LiveTiming
+
+
+# Predicted-time buckets (seconds) used for the calibration table
+CALIBRATION_BUCKETS = [0, 30, 60, 120, 300, 600]
+
+# Worker-local engine, created once per process by _init_worker
+_engine = None
+
+
+def _init_worker(data_dir):
+    """Load the session once per worker process"""
+    global _engine
+    _engine = F1LiveTiming(data_dir, None)
+    _engine.load_car_data()
+
+
+def _run_chunk(tick_offsets):
+    """Issue forecasts for every chasing/target pair at each tick of one chunk"""
+    records = []
+    latencies = []
+    distances = {}
+
+    for offset in tick_offsets:
+        tick_time = _engine.race_start_time + pd.Timedelta(seconds=offset)
+
+        # Distances of every car that has data at this tick
+        tick_distances = {}
+        for car_id, car_info in _engine.car_data.items():
+            df = car_info['data']
+            if tick_time < df['timeStamp'].min() or tick_time > df['timeStamp'].max():
+                continue
+            tick_distances[car_id] = _engine.calculate_distance_traveled(car_id, tick_time)
+        distances[offset] = tick_distances
+
+        # Every car behind chases every car ahead, like /api/forecast/bulk
+        order = sorted(tick_distances, key=tick_distances.get, reverse=True)
+        for i in range(len(order)):
+            for j in range(i):
+                chasing_car_id, target_car_id = order[i], order[j]
+
+                start = time.perf_counter()
+                forecast = _engine.forecast_overtake_time(chasing_car_id, target_car_id, tick_time)
+                latencies.append(time.perf_counter() - start)
+
+                records.append((
+                    offset,
+                    chasing_car_id,
+                    target_car_id,
+                    bool(forecast.get('can_overtake', False)) and not forecast.get('already_ahead', False),
+                    float(forecast.get('forecast_seconds', -1)),
+                    bool(forecast.get('error', False))
+                ))
+
+    return records, latencies, distances
+
+
+def _split_ticks(tick_offsets, chunks):
+    """Split tick offsets into contiguous time ranges"""
+    chunks = max(1, min(chunks, len(tick_offsets)))
+    return [list(part) for part in np.array_split(np.asarray(tick_offsets), chunks) if len(part)]
+
+
+def _actual_overtake_seconds(records, distances, tick_offsets):
+    """Seconds until each forecast's chaser actually passed its target (None if never)"""
+    offsets = np.asarray(tick_offsets, dtype=float)
+    position = {offset: i for i, offset in enumerate(tick_offsets)}
+
+    # Distance series per car over the tick grid (NaN when the car has no data)
+    car_ids = {car_id for tick in distances.values() for car_id in tick}
+    series = {}
+    for car_id in car_ids:
+        series[car_id] = np.array([distances[offset].get(car_id, np.nan) for offset in tick_offsets])
+
+    # Tick indices at which chaser >= target, computed once per pair
+    crossings = {}
+    actual = []
+    for offset, chasing_car_id, target_car_id, *_ in records:
+        pair = (chasing_car_id, target_car_id)
+        if pair not in crossings:
+            with np.errstate(invalid='ignore'):
+                crossings[pair] = np.flatnonzero(series[chasing_car_id] >= series[target_car_id])
+
+        indices = crossings[pair]
+        k = np.searchsorted(indices, position[offset] + 1)
+        actual.append(offsets[indices[k]] - offset if k < len(indices) else None)
+
+    return actual
+
+
+def score_forecasts(records, actual, horizon, tolerance):
+    """Accuracy and calibration of the forecasts against actual overtakes"""
+    true_pos = false_pos = true_neg = false_neg = errors = 0
+    abs_errors = []
+    buckets = [{'count': 0, 'happened': 0, 'before_forecast': 0, 'within_tolerance': 0}
+               for _ in CALIBRATION_BUCKETS[:-1]]
+
+    for (offset, chasing, target, predicted, forecast_seconds, error), actual_seconds in zip(records, actual):
+        if error:
+            errors += 1
+            continue
+
+        predicted = predicted and 0 <= forecast_seconds <= horizon
+        happened = actual_seconds is not None and actual_seconds <= horizon
+
+        if predicted and happened:
+            true_pos += 1
+            abs_errors.append(abs(forecast_seconds - actual_seconds))
+        elif predicted:
+            false_pos += 1
+        elif happened:
+            false_neg += 1
+        else:
+            true_neg += 1
+
+        if predicted:
+            # Forecasts beyond the last edge are counted in the last bucket
+            i = min(bisect_right(CALIBRATION_BUCKETS, forecast_seconds) - 1, len(buckets) - 1)
+            bucket = buckets[i]
+            bucket['count'] += 1
+            if happened:
+                bucket['happened'] += 1
+                if actual_seconds <= forecast_seconds:
+                    bucket['before_forecast'] += 1
+                if abs(actual_seconds - forecast_seconds) <= tolerance:
+                    bucket['within_tolerance'] += 1
+
+    scored = true_pos + false_pos + true_neg + false_neg
+    calibration = []
+    for i, bucket in enumerate(buckets):
+        count = bucket['count']
+        calibration.append({
+            'predicted_range_seconds': [CALIBRATION_BUCKETS[i], CALIBRATION_BUCKETS[i + 1]],
+            'forecasts': count,
+            'overtake_rate': bucket['happened'] / count if count else None,
+            'before_forecast_rate': bucket['before_forecast'] / count if count else None,
+            'within_tolerance_rate': bucket['within_tolerance'] / count if count else None
+        })
+
+    return {
+        'forecasts_scored': scored,
+        'forecast_errors': errors,
+        'confusion': {
+            'true_positive': true_pos,
+            'false_positive': false_pos,
+            'true_negative': true_neg,
+            'false_negative': false_neg
+        },
+        'accuracy': (true_pos + true_neg) / scored if scored else None,
+        'precision': true_pos / (true_pos + false_pos) if true_pos + false_pos else None,
+        'recall': true_pos / (true_pos + false_neg) if true_pos + false_neg else None,
+        'timing_mae_seconds': float(np.mean(abs_errors)) if abs_errors else None,
+        'timing_median_abs_error_seconds': float(np.median(abs_errors)) if abs_errors else None,
+        'calibration': calibration
+    }
+
+
+def run_backtest(data_dir, step=1.0, workers=None, start=0.0, end=None,
+                 horizon=None, tolerance=30.0):
+    """Replay the session, forecast at every tick and score the results"""
+    if horizon is None:
+        horizon = config.Forecasting.FORECAST_TIME_WINDOW
+    workers = workers or os.cpu_count() or 1
+
+    # Session length is taken from the same synchronized start the engine uses
+    probe = F1LiveTiming(data_dir, None)
+    probe.load_car_data()
+    if not probe.car_data:
+        raise ValueError(f"No car data found in {data_dir}")
+    session_end = max(car['data']['timeStamp'].max() for car in probe.car_data.values())
+    session_seconds = (session_end - probe.race_start_time).total_seconds()
+    end = session_seconds if end is None else min(end, session_seconds)
+
+    tick_offsets = [float(offset) for offset in np.arange(start, end + 1e-9, step)]
+    chunks = _split_ticks(tick_offsets, workers)
+    print(f"Backtesting {len(tick_offsets)} ticks ({start:.0f}s-{end:.0f}s, step {step}s) "
+          f"on {len(chunks)} worker(s)")
+
+    wall_start = time.perf_counter()
+    with Pool(len(chunks), initializer=_init_worker, initargs=(data_dir,)) as pool:
+        results = pool.map(_run_chunk, chunks)
+    wall_seconds = time.perf_counter() - wall_start
+
+    records, latencies, distances = [], [], {}
+    for chunk_records, chunk_latencies, chunk_distances in results:
+        records.extend(chunk_records)
+        latencies.extend(chunk_latencies)
+        distances.update(chunk_distances)
+
+    actual = _actual_overtake_seconds(records, distances, tick_offsets)
+    report = score_forecasts(records, actual, horizon, tolerance)
+
+    latencies_ms = np.asarray(latencies) * 1000
+    report.update({
+        'ticks': len(tick_offsets),
+        'step_seconds': step,
+        'workers': len(chunks),
+        'horizon_seconds': horizon,
+        'tolerance_seconds': tolerance,
+        'wall_seconds': wall_seconds,
+        'race_seconds_per_wall_second': (end - start) / wall_seconds if wall_seconds > 0 else None,
+        'forecasts_per_second': len(records) / wall_seconds if wall_seconds > 0 else None,
+        'latency_ms': {
+            'p50': float(np.percentile(latencies_ms, 50)) if len(latencies_ms) else None,
+            'p90': float(np.percentile(latencies_ms, 90)) if len(latencies_ms) else None,
+            'p99': float(np.percentile(latencies_ms, 99)) if len(latencies_ms) else None,
+            'max': float(latencies_ms.max()) if len(latencies_ms) else None
+        }
+    })
+    return report
+
+
+def print_report(report):
+    """Print a human-readable backtest summary"""
+    def fmt(value, pattern='{:.3f}'):
+        return 'n/a' if value is None else pattern.format(value)
+
+    print("=" * 55)
+    print("🏁 Forecast Backtest Report")
+    print("=" * 55)
+    print(f"Ticks: {report['ticks']} (step {report['step_seconds']}s), workers: {report['workers']}")
+    print(f"Forecasts scored: {report['forecasts_scored']} (errors: {report['forecast_errors']})")
+    print(f"Wall time: {report['wall_seconds']:.2f}s "
+          f"({fmt(report['race_seconds_per_wall_second'], '{:.1f}')}x real time)")
+
+    print("\n🎯 Accuracy (overtake within "
+          f"{report['horizon_seconds']}s horizon)")
+    confusion = report['confusion']
+    print(f"  TP={confusion['true_positive']} FP={confusion['false_positive']} "
+          f"TN={confusion['true_negative']} FN={confusion['false_negative']}")
+    print(f"  accuracy={fmt(report['accuracy'])} precision={fmt(report['precision'])} "
+          f"recall={fmt(report['recall'])}")
+    print(f"  timing MAE={fmt(report['timing_mae_seconds'], '{:.1f}s')} "
+          f"median={fmt(report['timing_median_abs_error_seconds'], '{:.1f}s')}")
+
+    print(f"\n📊 Calibration (tolerance ±{report['tolerance_seconds']}s)")
+    print(f"  {'predicted':>12} {'n':>7} {'happened':>9} {'<=pred':>7} {'±tol':>7}")
+    for bucket in report['calibration']:
+        low, high = bucket['predicted_range_seconds']
+        print(f"  {f'{low}-{high}s':>12} {bucket['forecasts']:>7} "
+              f"{fmt(bucket['overtake_rate'], '{:.2f}'):>9} "
+              f"{fmt(bucket['before_forecast_rate'], '{:.2f}'):>7} "
+              f"{fmt(bucket['within_tolerance_rate'], '{:.2f}'):>7}")
+
+    latency = report['latency_ms']
+    print("\n⚡ Throughput")
+    print(f"  forecasts/s={fmt(report['forecasts_per_second'], '{:.1f}')}")
+    print(f"  latency p50={fmt(latency['p50'], '{:.2f}ms')} p90={fmt(latency['p90'], '{:.2f}ms')} "
+          f"p99={fmt(latency['p99'], '{:.2f}ms')} max={fmt(latency['max'], '{:.2f}ms')}")
+    print("=" * 55)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest overtaking forecasts against a recorded session')
+    parser.add_argument('--data-dir', default=config.Data.BASE_DIR, help='Directory with session CSV files')
+    parser.add_argument('--step', type=float, default=config.Performance.UPDATE_INTERVAL,
+                        help='Race seconds between forecast ticks')
+    parser.add_argument('--start', type=float, default=0.0, help='Race time (s) of the first tick')
+    parser.add_argument('--end', type=float, default=None, help='Race time (s) of the last tick')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--horizon', type=float, default=None,
+                        help='Forecast horizon in seconds (default: Forecasting.FORECAST_TIME_WINDOW)')
+    parser.add_argument('--tolerance', type=float, default=30.0,
+                        help='Timing tolerance (s) for the calibration table')
+    parser.add_argument('--json', dest='json_path', default=None, help='Also write the report as JSON')
+    args = parser.parse_args()
+
+    report = run_backtest(args.data_dir, step=args.step, workers=args.workers, start=args.start,
+                          end=args.end, horizon=args.horizon, tolerance=args.tolerance)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
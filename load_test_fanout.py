@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+F1 Live Timing - Fanout Load Test
+Connects many dashboards to web workers that share a message queue with
+one engine process and measures how many timing updates each receives.
+
+Usage:
+    python load_test_fanout.py --data-dir Truck_Cal/cropped_data --clients 600 --workers 4 --duration 30
+
+By default everything runs in this process: the engine and the web
+workers are separate Socket.IO servers connected by the in-process queue
+stand-in ('memory://'), and the dashboards are connected to the workers
+below the Engine.IO transport, so the numbers cover admission, the queue
+hop, packet encoding and per-worker fanout but not the network.
+With --url, real clients connect to running web workers instead (needs the
+python-socketio client transports: websocket-client or requests).
+"""
+
+import argparse
+import contextlib
+import io
+import math
+import time
+import uuid
+
+import numpy as np
+from werkzeug.test import EnvironBuilder
+
+from config import config
+
+
+def start_in_process(args):
+    """Engine app plus web worker apps sharing an in-process queue; returns (engine, workers)"""
+    from f1_live_ui_modular import create_app, create_socketio, initialize_timing_system
+    from websocket_handlers import (register_socketio_handlers, register_worker_socketio_handlers,
+                                    create_client_admission)
+
+    config.Data.BASE_DIR = args.data_dir
+    config.Scaling.MESSAGE_QUEUE = 'memory://'
+    config.Scaling.CHANNEL = f'load-test-{time.time_ns()}'
+    config.Scaling.MAX_CLIENTS_TOTAL = args.clients
+    config.Scaling.MAX_CLIENTS_PER_WORKER = math.ceil(args.clients / args.workers)
+    config.Performance.UPDATE_INTERVAL = args.interval
+    config.Performance.BROADCAST_INTERVAL = 1  # Every tick reaches the dashboards
+    config.Performance.ADAPTIVE_TICK_RATE = False
+    config.Logging.SHOW_CLIENT_CONNECTIONS = False
+
+    engine_app = create_app()
+    engine_socketio = create_socketio(engine_app)
+    with contextlib.redirect_stdout(io.StringIO()):
+        f1_timing = initialize_timing_system(engine_socketio)
+    # The engine process takes no dashboards itself in this test
+    register_socketio_handlers(engine_socketio, f1_timing, create_client_admission(engine_socketio))
+
+    workers = []
+    for _ in range(args.workers):
+        app = create_app()
+        socketio = create_socketio(app)
+        admission = create_client_admission(socketio)
+        register_worker_socketio_handlers(socketio, admission)
+        workers.append((app, socketio, admission))
+    return f1_timing, workers
+
+
+class VirtualDashboards:
+    """Dashboards connected to one web worker below the Engine.IO transport.
+
+    Admission, rooms, the queue hop and packet encoding are the real
+    server; the packets a dashboard would receive are timestamped instead
+    of written to a socket. (The Flask-SocketIO test client refuses servers
+    that use a message queue.)
+    """
+
+    def __init__(self, app, socketio):
+        self.app = app
+        self.server = socketio.server
+        self.server.async_handlers = False  # connect handlers run before connect() returns
+        self.server.eio.send_packet = self._receive
+        self.arrivals = {}  # eio_sid -> perf_counter() of each timing_update
+        self.connected = set()
+
+    def _receive(self, eio_sid, pkt):
+        data = pkt.data
+        if not isinstance(data, str):
+            return
+        if data.startswith('2["timing_update"'):
+            self.arrivals[eio_sid].append(time.perf_counter())
+        elif data.startswith('0'):
+            self.connected.add(eio_sid)
+
+    def connect(self):
+        """Open one dashboard connection; False when the worker rejects it"""
+        eio_sid = uuid.uuid4().hex
+        environ = EnvironBuilder(path='/socket.io').get_environ()
+        environ['flask.app'] = self.app
+        self.arrivals[eio_sid] = []
+        self.server._handle_eio_connect(eio_sid, environ)
+        self.server._handle_eio_message(eio_sid, '0')
+        if eio_sid not in self.connected:
+            del self.arrivals[eio_sid]
+            return False
+        return True
+
+    def clear(self):
+        for arrivals in self.arrivals.values():
+            arrivals.clear()
+
+
+def connect_in_process(dashboards, count):
+    """Connections spread round-robin over the workers; returns (connected, rejected)"""
+    connected = 0
+    for i in range(count):
+        if dashboards[i % len(dashboards)].connect():
+            connected += 1
+    return connected, count - connected
+
+
+def run_in_process(args):
+    f1_timing, workers = start_in_process(args)
+    dashboards = [VirtualDashboards(app, socketio) for app, socketio, _ in workers]
+    connected, _ = connect_in_process(dashboards, args.clients)
+    # Over the limit: every one of these must be turned away by some worker
+    _, rejected = connect_in_process(dashboards, args.extra)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        f1_timing.start_live_timing()
+        time.sleep(args.interval)  # skip the first, partial interval
+        for group in dashboards:
+            group.clear()
+        started = time.perf_counter()
+        time.sleep(args.duration)
+        f1_timing.stop_live_timing()
+    time.sleep(0.5)  # let the queue drain
+    elapsed = time.perf_counter() - started
+
+    arrivals = [times for group in dashboards for times in group.arrivals.values()]
+    counts = np.array([len(times) for times in arrivals])
+    stats = [admission.get_stats() for _, _, admission in workers]
+    report(args, connected, counts, elapsed, rejected, stats)
+
+    # Fanout span: first to last dashboard receiving the same update
+    ticks = min(counts) if len(counts) else 0
+    spans = [max(times[k] for times in arrivals) - min(times[k] for times in arrivals) for k in range(ticks)]
+    gaps = np.concatenate([np.diff(times) for times in arrivals if len(times) > 1] or [np.array([])])
+    if spans:
+        print(f"Fanout span per update: median {np.median(spans) * 1000:.1f} ms, "
+              f"max {max(spans) * 1000:.1f} ms")
+    if len(gaps):
+        print(f"Interval between updates: median {np.median(gaps):.3f} s, "
+              f"p95 {np.percentile(gaps, 95):.3f} s")
+
+
+def run_against_url(args):
+    import socketio
+
+    counts = [0] * args.clients
+    connected = 0
+    clients = []
+    for i in range(args.clients):
+        client = socketio.Client(reconnection=False)
+
+        def on_update(data, index=i):
+            counts[index] += 1
+
+        client.on('timing_update', on_update)
+        try:
+            client.connect(args.url, transports=['websocket'])
+            connected += 1
+        except socketio.exceptions.ConnectionError:
+            pass
+        clients.append(client)
+
+    started = time.perf_counter()
+    time.sleep(args.duration)
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        if client.connected:
+            client.disconnect()
+
+    report(args, connected, np.array(counts[:connected] if connected else [0]), elapsed,
+           args.clients - connected, [])
+
+
+def report(args, connected, counts, elapsed, rejected, worker_stats):
+    expected = elapsed / args.interval
+    print("=" * 60)
+    print(f"📡 Fanout load test: {connected} dashboards, {args.interval:g} s updates, {elapsed:.1f} s")
+    print("=" * 60)
+    print(f"Updates per client: min {counts.min()}, median {np.median(counts):.0f}, "
+          f"max {counts.max()} (~{expected:.0f} expected)")
+    print(f"Clients with at least {int(0.9 * expected)} updates: "
+          f"{int((counts >= int(0.9 * expected)).sum())}/{connected}")
+    print(f"Messages delivered: {int(counts.sum())} ({counts.sum() / elapsed:.0f}/s)")
+    print(f"Connections rejected: {rejected}")
+    for stats in worker_stats:
+        print(f"  worker {stats['worker_id']}: {stats['worker_clients']} clients "
+              f"(tier total {stats['total_clients']}/{stats['max_clients']}, rejected {stats['rejected']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the multi-worker timing fanout')
+    parser.add_argument('--data-dir', default=config.Data.BASE_DIR, help='Directory with session CSV files')
+    parser.add_argument('--clients', type=int, default=600, help='Dashboards to connect')
+    parser.add_argument('--workers', type=int, default=4, help='In-process web workers')
+    parser.add_argument('--extra', type=int, default=20,
+                        help='Connections attempted beyond the admission limit (in-process only)')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to receive updates')
+    parser.add_argument('--interval', type=float, default=1.0, help='Engine update interval (s)')
+    parser.add_argument('--url', help='Connect real clients to this web worker URL instead')
+    args = parser.parse_args()
+
+    if args.url:
+        run_against_url(args)
+    else:
+        run_in_process(args)
+
+
+if __name__ == '__main__':
+    main()
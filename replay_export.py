@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+F1 Live Timing - Headless Replay Export
+Runs the timing engine over a whole recorded session without sleeping and
+writes the rankings/gaps/status timeline to a columnar directory.
+
+Usage:
+    python replay_export.py --data-dir Truck_Cal/cropped_data --out timeline --step 1 --workers 4
+
+The tick range is split into contiguous time chunks handed to a process
+pool. Each worker seeks its engine to the chunk start (rebuilding reset
+history from the telemetry checkpoints) and steps through the chunk;
+finished chunks are streamed to disk in time order. Read the output with
+core.timeline_store.Timeline (one memory-mapped array per column).
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import os
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from config import config
+from core import F1LiveTiming
+from core.timeline_store import TimelineWriter, rankings_to_columns, concat_columns
+
+# Worker-local engine, created once per process by _init_worker
+_engine = None
+
+
+def _init_worker(data_dir):
+    """Load the session once per worker process"""
+    global _engine
+    # Reset recovery logs an INFO line per event; keep worker output readable
+    logging.disable(logging.INFO)
+    with contextlib.redirect_stdout(io.StringIO()):
+        _engine = F1LiveTiming(data_dir, None)
+        _engine.load_car_data()
+
+
+def _run_chunk(tick_offsets):
+    """Rankings of every tick in one chunk as (race_times, row_counts, columns)"""
+    blocks = []
+    row_counts = []
+
+    # The engine prints a line per tick; discard it
+    with contextlib.redirect_stdout(io.StringIO()):
+        _engine.seek(tick_offsets[0])
+        for offset in tick_offsets:
+            _engine.current_time = _engine.race_start_time + pd.Timedelta(seconds=offset)
+            rankings = _engine.calculate_live_rankings()
+            blocks.append(rankings_to_columns(rankings))
+            row_counts.append(len(rankings))
+
+    return np.asarray(tick_offsets), np.asarray(row_counts), concat_columns(blocks)
+
+
+def _split_chunks(tick_offsets, chunk_ticks):
+    """Contiguous chunks of at most chunk_ticks ticks"""
+    return [tick_offsets[i:i + chunk_ticks] for i in range(0, len(tick_offsets), chunk_ticks)]
+
+
+def run_export(data_dir, out_path, step=1.0, workers=None, start=0.0, end=None, chunk_seconds=120.0):
+    """Replay the session headless and stream the timeline to out_path"""
+    workers = workers or os.cpu_count() or 1
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        probe = F1LiveTiming(data_dir, None)
+        probe.load_car_data()
+    if not probe.car_data:
+        raise ValueError(f"No car data found in {data_dir}")
+    session_seconds = (probe.get_session_end_time() - probe.race_start_time).total_seconds()
+    end = session_seconds if end is None else min(end, session_seconds)
+
+    tick_offsets = [float(offset) for offset in np.arange(start, end + 1e-9, step)]
+    chunks = _split_chunks(tick_offsets, max(1, int(round(chunk_seconds / step))))
+    print(f"Exporting {len(tick_offsets)} ticks ({start:.0f}s-{end:.0f}s, step {step}s) "
+          f"in {len(chunks)} chunk(s) on {min(workers, len(chunks))} worker(s)")
+
+    metadata = {
+        'data_dir': os.path.abspath(data_dir),
+        'race_start_time': probe.race_start_time.isoformat(),
+        'step_seconds': step,
+        'car_names': {str(car_id): car['truck_name'] for car_id, car in probe.car_data.items()}
+    }
+
+    wall_start = time.perf_counter()
+    with TimelineWriter(out_path, metadata) as writer:
+        with Pool(min(workers, len(chunks)), initializer=_init_worker, initargs=(data_dir,)) as pool:
+            # imap keeps chunk order, so each result is appended as soon as it is next in line
+            for i, (race_times, row_counts, columns) in enumerate(pool.imap(_run_chunk, chunks), 1):
+                writer.append(race_times, row_counts, columns)
+                elapsed = time.perf_counter() - wall_start
+                print(f"  chunk {i}/{len(chunks)}: {writer.ticks} ticks, "
+                      f"{writer.ticks / elapsed:.1f} ticks/s")
+    wall_seconds = time.perf_counter() - wall_start
+
+    return {
+        'ticks': writer.ticks,
+        'rows': writer.rows,
+        'chunks': len(chunks),
+        'wall_seconds': wall_seconds,
+        'ticks_per_second': writer.ticks / wall_seconds if wall_seconds > 0 else None,
+        'race_seconds_per_wall_second': (end - start) / wall_seconds if wall_seconds > 0 else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the full rankings timeline of a recorded session')
+    parser.add_argument('--data-dir', default=config.Data.BASE_DIR, help='Directory with session CSV files')
+    parser.add_argument('--out', default='timeline', help='Output directory (one file per column)')
+    parser.add_argument('--step', type=float, default=config.Performance.UPDATE_INTERVAL,
+                        help='Race seconds between ticks')
+    parser.add_argument('--start', type=float, default=0.0, help='Race time (s) of the first tick')
+    parser.add_argument('--end', type=float, default=None, help='Race time (s) of the last tick')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--chunk-seconds', type=float, default=120.0,
+                        help='Race seconds per work chunk handed to a worker')
+    args = parser.parse_args()
+
+    summary = run_export(args.data_dir, args.out, step=args.step, workers=args.workers,
+                         start=args.start, end=args.end, chunk_seconds=args.chunk_seconds)
+
+    print("=" * 55)
+    print(f"🏁 Timeline written to {args.out}")
+    print(f"Ticks: {summary['ticks']}, rows: {summary['rows']}, chunks: {summary['chunks']}")
+    print(f"Wall time: {summary['wall_seconds']:.2f}s, {summary['ticks_per_second']:.1f} ticks/s "
+          f"({summary['race_seconds_per_wall_second']:.1f}x real time)")
+    print("=" * 55)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,8 +4,92 @@ Web Routes Module
 Contains all Flask routes and API endpoints
 """
 
-from flask import render_template, jsonify, request
+import json
+
+from flask import render_template, jsonify, request, Response
 from config import config
+from core.compression import CompressionStats, compress, negotiate_encoding
+from core.event_stream import event_id, sse_event
+
+
+def matching_etag(etag):
+    """Tag of the client's If-None-Match that matches `etag` in any content encoding, or None"""
+    if not request.if_none_match:
+        return None
+    if request.if_none_match.star_tag:
+        return etag.strip('"')
+    base = etag.strip('"')
+    for tag in request.if_none_match.as_set():
+        # Compressed responses carry the ETag with an encoding suffix
+        if tag == base or (tag.startswith(base + '-') and tag[len(base) + 1:] in ('gzip', 'br')):
+            return tag
+    return None
+
+
+def not_modified(tag):
+    """304 response for the representation the client already has"""
+    response = Response(status=304)
+    response.headers['ETag'] = f'"{tag}"'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def conditional_json(etag, build):
+    """jsonify(build()) with an ETag, or 304 without building it when the client's copy is current"""
+    tag = matching_etag(etag)
+    if tag is not None:
+        return not_modified(tag)
+    response = jsonify(build())
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'  # Always revalidate with If-None-Match
+    return response
+
+
+def snapshot_response(snapshot, name='json', build=None):
+    """JSON response from a body serialized once per snapshot ('json' or cached under `name`)"""
+    tag = matching_etag(snapshot.etag)
+    if tag is not None:
+        return not_modified(tag)
+    body = snapshot.json_bytes if name == 'json' else snapshot.cached(name, build)
+    response = Response(body, mimetype='application/json')
+    response.headers['ETag'] = snapshot.etag
+    response.headers['Cache-Control'] = 'no-cache'  # Always revalidate with If-None-Match
+    # Compressed variants are cached with the snapshot too
+    response.compressed_body = lambda encoding, level: snapshot.cached(
+        f'{name}.{encoding}.{level}', lambda: compress(body, encoding, level))
+    return response
+
+
+def sse_response(engine):
+    """text/event-stream of an engine's timing snapshots, resuming from Last-Event-ID"""
+    stream = engine.timing_stream
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    if not stream.open(resumed=bool(last_event_id)):
+        return jsonify({'error': True, 'message': f'Maximum {stream.max_clients} stream clients reached'}), 503
+    
+    def generate():
+        try:
+            yield f"retry: {config.Streaming.RETRY_MILLISECONDS}\n\n".encode('utf-8')
+            # Every event is the full state: a resuming client only misses the current one
+            snapshot = engine.get_snapshot()
+            if event_id(snapshot) != last_event_id:
+                yield sse_event(snapshot)
+            seq = snapshot.seq
+            while True:
+                snapshot = stream.wait_newer(seq, config.Streaming.KEEPALIVE_SECONDS)
+                if snapshot is None:
+                    yield b": keepalive\n\n"
+                    continue
+                seq = snapshot.seq
+                yield sse_event(snapshot)
+        finally:
+            stream.close()
+    
+    response = Response(generate(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Do not let nginx buffer the stream
+    return response
 
 
 def register_routes(app, f1_timing):
@@ -46,13 +130,23 @@ def register_routes(app, f1_timing):
     @app.route('/api/timing')
     def get_timing_data():
         """API endpoint for live timing data"""
-        return jsonify(f1_timing.get_current_data())
+        return snapshot_response(f1_timing.get_snapshot())
+
+    @app.route('/stream/timing')
+    def stream_timing():
+        """Server-Sent Events stream of timing_update events (read-only displays)"""
+        return sse_response(f1_timing)
+
+    @app.route('/api/stream')
+    def get_stream_stats():
+        """Server-Sent Events connection counters"""
+        return jsonify(f1_timing.timing_stream.get_stats())
 
     @app.route('/api/start')
     def start_race():
         """Start the live timing"""
-        f1_timing.start_live_timing()
-        return jsonify({'status': 'started'})
+        started = f1_timing.start_live_timing()
+        return jsonify({'status': 'started', 'already_running': not started})
 
     @app.route('/api/stop')
     def stop_race():
@@ -63,11 +157,29 @@ def register_routes(app, f1_timing):
     @app.route('/api/reset')
     def reset_race():
         """Reset to race start"""
-        f1_timing.stop_live_timing()
-        f1_timing.current_time = f1_timing.race_start_time
-        f1_timing.current_rankings = []
+        f1_timing.reset_race()
         return jsonify({'status': 'reset'})
 
+    @app.route('/api/seek')
+    def seek_race():
+        """Jump to a race time (seconds from start) without replaying"""
+        race_seconds = request.args.get('t', type=float)
+        if race_seconds is None:
+            return jsonify({'error': True, 'message': 'Query parameter t (race seconds) is required'})
+        
+        try:
+            race_seconds = f1_timing.seek(race_seconds)
+            return jsonify({
+                'status': 'seeked',
+                'race_time': race_seconds,
+                'current_time': f1_timing.current_time.strftime('%H:%M:%S.%f')[:-3]
+            })
+        except Exception as e:
+            return jsonify({
+                'error': True,
+                'message': f'Error seeking: {str(e)}'
+            })
+
     @app.route('/api/speed/<float:speed>')
     def set_simulation_speed(speed):
         """Set simulation speed"""
@@ -90,12 +202,23 @@ def register_routes(app, f1_timing):
     @app.route('/api/speed')
     def get_simulation_speed():
         """Get current simulation speed"""
-        return jsonify({
-            'simulation_speed': f1_timing.simulation_speed,
-            'update_interval': f1_timing.update_interval,
-            'description': f'Simulation running at {f1_timing.simulation_speed}x speed'
+        speed, interval = f1_timing.simulation_speed, f1_timing.update_interval
+        return conditional_json(f1_timing.version_etag('speed', speed, interval), lambda: {
+            'simulation_speed': speed,
+            'update_interval': interval,
+            'description': f'Simulation running at {speed}x speed'
         })
 
+    @app.route('/api/scheduler')
+    def get_scheduler_stats():
+        """Timing loop overrun and lag counters"""
+        return jsonify(f1_timing.get_scheduler_stats())
+
+    @app.route('/api/replay-timeline')
+    def get_replay_timeline_status():
+        """Precomputed replay timeline state and build progress"""
+        return jsonify(f1_timing.get_replay_status())
+
     @app.route('/api/comparison/<int:start_pos>/<int:count>')
     def get_comparison(start_pos, count):
         """Get comparison data for specific position range"""
@@ -110,7 +233,8 @@ def register_routes(app, f1_timing):
     @app.route('/api/trucks')
     def get_trucks():
         """Get list of all trucks"""
-        return jsonify({'trucks': f1_timing.get_truck_list()})
+        return conditional_json(f1_timing.version_etag('trucks', f1_timing.data_version),
+                                lambda: {'trucks': f1_timing.get_truck_list()})
 
     @app.route('/api/available-targets/<int:chasing_car_id>')
     def get_available_targets(chasing_car_id):
@@ -119,11 +243,8 @@ def register_routes(app, f1_timing):
             if chasing_car_id not in f1_timing.car_data:
                 return jsonify({'error': True, 'message': 'Chasing car not found'})
             
-            # Get current rankings
-            current_rankings = f1_timing.current_rankings
-            if not current_rankings:
-                # If no current rankings, calculate them
-                current_rankings = f1_timing.calculate_live_rankings()
+            # Get current rankings (calculated first when none are published yet)
+            current_rankings = f1_timing.ensure_rankings()
             
             # Find chasing car position
             chasing_car_position = None
@@ -166,14 +287,44 @@ def register_routes(app, f1_timing):
     @app.route('/api/live-update')
     def live_update():
         """Enhanced live update endpoint with more data"""
-        current_data = f1_timing.get_current_data()
+        snapshot = f1_timing.get_snapshot()
         
-        # Add position changes (simplified)
-        for i, car in enumerate(current_data['rankings']):
-            car['position_change'] = 0  # Could track actual changes
-            car['trend'] = 'stable'  # up, down, stable
+        def build():
+            # Add position changes from the ranking history (copies: the snapshot is shared)
+            current_data = dict(snapshot.payload)
+            position_changes = f1_timing.get_position_changes()
+            rankings = []
+            for car in current_data['rankings']:
+                change = position_changes.get(car['car_id'], 0)
+                car = dict(car)
+                car['position_change'] = change  # Positions gained (+) or lost (-)
+                car['trend'] = 'up' if change > 0 else 'down' if change < 0 else 'stable'
+                rankings.append(car)
+            current_data['rankings'] = rankings
+            return json.dumps(current_data, separators=(',', ':')).encode('utf-8')
+        
+        return snapshot_response(snapshot, 'live_update', build)
+
+    @app.route('/api/rankings/history')
+    def rankings_history():
+        """Recorded ranking snapshots between two race times (seconds)"""
+        try:
+            from_time = request.args.get('from', type=float)
+            to_time = request.args.get('to', type=float)
+            snapshots = f1_timing.get_rankings_history(from_time, to_time)
             
-        return jsonify(current_data)
+            return jsonify({
+                'snapshots': snapshots,
+                'count': len(snapshots),
+                'from': from_time,
+                'to': to_time,
+                'capacity': f1_timing.rankings_history.capacity
+            })
+        except Exception as e:
+            return jsonify({
+                'error': True,
+                'message': f'Error reading rankings history: {str(e)}'
+            })
 
     @app.route('/api/forecast/<int:chasing_car_id>/<int:target_car_id>')
     def forecast_overtake(chasing_car_id, target_car_id):
@@ -484,3 +635,209 @@ def register_routes(app, f1_timing):
             'speed_presets': config.Simulation.SPEED_PRESETS,
             'description': f'At {f1_timing.simulation_speed}x speed: {f1_timing.simulation_speed} seconds of race time per 1 second of real time'
         })
+
+
+def register_session_routes(app, session_manager):
+    """Register /api/sessions routes for the sessions hosted by a SessionManager"""
+    
+    def session_or_error(session_id):
+        """(engine, None) or (None, error response)"""
+        engine = session_manager.get_session(session_id)
+        if engine is None:
+            return None, jsonify({'error': True, 'message': f'Session {session_id} not found'})
+        return engine, None
+
+    @app.route('/api/sessions', methods=['GET', 'POST'])
+    def sessions():
+        """List sessions, or create one from a data directory"""
+        if request.method == 'POST':
+            try:
+                data = request.get_json() or {}
+                session_id = str(data['session_id'])
+                engine = session_manager.create_session(session_id, data['data_dir'])
+                return jsonify({
+                    'status': 'created',
+                    'session_id': session_id,
+                    'room': engine.room,
+                    'total_cars': len(engine.car_data)
+                })
+            except KeyError as e:
+                return jsonify({'error': True, 'message': f'Missing field: {str(e)}'})
+            except Exception as e:
+                return jsonify({'error': True, 'message': f'Error creating session: {str(e)}'})
+        
+        return jsonify({'sessions': session_manager.list_sessions()})
+
+    @app.route('/api/sessions/<session_id>', methods=['DELETE'])
+    def remove_session(session_id):
+        """Stop and remove a session"""
+        try:
+            if not session_manager.remove_session(session_id):
+                return jsonify({'error': True, 'message': f'Session {session_id} not found'})
+            return jsonify({'status': 'removed', 'session_id': session_id})
+        except Exception as e:
+            return jsonify({'error': True, 'message': f'Error removing session: {str(e)}'})
+
+    @app.route('/api/sessions/<session_id>/timing')
+    def session_timing(session_id):
+        """Live timing data of one session"""
+        engine, error = session_or_error(session_id)
+        if error:
+            return error
+        return snapshot_response(engine.get_snapshot())
+
+    @app.route('/stream/sessions/<session_id>/timing')
+    def session_stream(session_id):
+        """Server-Sent Events stream of one session's timing updates"""
+        engine, error = session_or_error(session_id)
+        if error:
+            return error
+        return sse_response(engine)
+
+    @app.route('/api/sessions/<session_id>/start')
+    def session_start(session_id):
+        """Start one session's clock"""
+        engine, error = session_or_error(session_id)
+        if error:
+            return error
+        started = engine.start_live_timing()
+        return jsonify({'status': 'started', 'already_running': not started, 'session_id': session_id})
+
+    @app.route('/api/sessions/<session_id>/stop')
+    def session_stop(session_id):
+        """Stop one session's clock"""
+        engine, error = session_or_error(session_id)
+        if error:
+            return error
+        engine.stop_live_timing()
+        return jsonify({'status': 'stopped', 'session_id': session_id})
+
+    @app.route('/api/sessions/<session_id>/reset')
+    def session_reset(session_id):
+        """Reset one session to race start"""
+        engine, error = session_or_error(session_id)
+        if error:
+            return error
+        engine.reset_race()
+        return jsonify({'status': 'reset', 'session_id': session_id})
+
+    @app.route('/api/sessions/<session_id>/seek')
+    def session_seek(session_id):
+        """Jump one session to a race time (seconds from start)"""
+        engine, error = session_or_error(session_id)
+        if error:
+            return error
+        race_seconds = request.args.get('t', type=float)
+        if race_seconds is None:
+            return jsonify({'error': True, 'message': 'Query parameter t (race seconds) is required'})
+        try:
+            race_seconds = engine.seek(race_seconds)
+            return jsonify({'status': 'seeked', 'race_time': race_seconds, 'session_id': session_id})
+        except Exception as e:
+            return jsonify({'error': True, 'message': f'Error seeking: {str(e)}'})
+
+    @app.route('/api/sessions/<session_id>/speed', methods=['GET', 'POST'])
+    def session_speed(session_id):
+        """Get or set one session's simulation speed"""
+        engine, error = session_or_error(session_id)
+        if error:
+            return error
+        
+        if request.method == 'POST':
+            try:
+                data = request.get_json() or {}
+                new_speed = float(data.get('speed', config.Simulation.DEFAULT_SPEED))
+                min_speed = config.Simulation.MIN_SPEED
+                max_speed = config.Simulation.MAX_SPEED
+                if not min_speed <= new_speed <= max_speed:
+                    return jsonify({
+                        'status': 'error',
+                        'message': f'Speed must be between {min_speed}x and {max_speed}x'
+                    })
+                engine.simulation_speed = new_speed
+            except Exception as e:
+                return jsonify({'status': 'error', 'message': f'Error setting speed: {str(e)}'})
+        
+        return jsonify({
+            'session_id': session_id,
+            'simulation_speed': engine.simulation_speed,
+            'update_interval': engine.update_interval,
+            'is_running': engine.is_running
+        })
+
+    @app.route('/api/sessions/<session_id>/rankings/history')
+    def session_rankings_history(session_id):
+        """Recorded ranking snapshots of one session"""
+        engine, error = session_or_error(session_id)
+        if error:
+            return error
+        from_time = request.args.get('from', type=float)
+        to_time = request.args.get('to', type=float)
+        snapshots = engine.get_rankings_history(from_time, to_time)
+        return jsonify({'snapshots': snapshots, 'count': len(snapshots), 'session_id': session_id})
+
+
+def register_admission_routes(app, admission):
+    """Register the client admission monitoring route of this worker"""
+    
+    @app.route('/api/clients')
+    def get_client_stats():
+        """Connected clients of this worker and of all workers sharing the message queue"""
+        stats = admission.get_stats()
+        stats['message_queue'] = config.Scaling.MESSAGE_QUEUE
+        stats['role'] = config.Scaling.ROLE if config.Scaling.MESSAGE_QUEUE else 'engine'
+        return jsonify(stats)
+
+
+def register_backpressure_routes(app, socketio):
+    """Register the slow-client monitoring route of this worker"""
+    
+    @app.route('/api/backpressure')
+    def get_backpressure_stats():
+        """Per-client sent and dropped timing frames and reduced-rate clients"""
+        return jsonify(socketio.server.manager.get_backpressure_stats())
+
+
+def register_compression(app):
+    """Compress HTTP responses the client accepts gzip/brotli for, counting bytes per endpoint"""
+    settings = config.Compression
+    stats = CompressionStats()
+    
+    @app.after_request
+    def compress_response(response):
+        if not settings.ENABLED or response.direct_passthrough or response.is_streamed \
+                or response.status_code != 200 \
+                or 'Content-Encoding' in response.headers \
+                or response.mimetype not in settings.MIMETYPES:
+            return response
+        
+        body = response.get_data()
+        endpoint = request.url_rule.rule if request.url_rule else request.path
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate_encoding(request.headers.get('Accept-Encoding')) \
+            if len(body) >= settings.MIN_SIZE else None
+        if encoding is None:
+            stats.record(endpoint, None, len(body), len(body))
+            return response
+        
+        level = settings.BROTLI_QUALITY if encoding == 'br' else settings.LEVEL
+        compressed_body = getattr(response, 'compressed_body', None)
+        compressed = compressed_body(encoding, level) if compressed_body else compress(body, encoding, level)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        if response.headers.get('ETag'):
+            # A compressed body is a different representation
+            response.headers['ETag'] = response.headers['ETag'][:-1] + f'-{encoding}"'
+        stats.record(endpoint, encoding, len(body), len(compressed))
+        return response
+    
+    @app.route('/api/compression')
+    def get_compression_stats():
+        """Uncompressed and sent bytes per endpoint"""
+        return jsonify({
+            'enabled': settings.ENABLED,
+            'level': settings.LEVEL,
+            'brotli_quality': settings.BROTLI_QUALITY,
+            'min_size': settings.MIN_SIZE,
+            'endpoints': stats.get_stats()
+        })
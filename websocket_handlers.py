@@ -5,69 +5,254 @@ Contains all SocketIO event handlers and connection management
 """
 
 from flask import request
-from flask_socketio import emit
+from flask_socketio import emit, join_room, leave_room, rooms
 from config import config
+from core.replay_cursors import ReplayCursorPool
+from core.frame_codec import encode_msgpack, msgpack_available
+from core.subscriptions import cars_key, positions_key, filter_payload
+from core.client_admission import ClientAdmission, create_admission_store
 
 
-# Connection management
-connected_clients = set()
-max_clients = config.Performance.MAX_CLIENTS
+def create_client_admission(socketio):
+    """Connection limits of this worker, shared with the other workers when there is a message queue"""
+    scaling = config.Scaling
+    if not scaling.MESSAGE_QUEUE:
+        return ClientAdmission(config.Performance.MAX_CLIENTS)
+    
+    store = create_admission_store(scaling.MESSAGE_QUEUE, f"{scaling.CHANNEL}:clients")
+    admission = ClientAdmission(scaling.MAX_CLIENTS_TOTAL, scaling.MAX_CLIENTS_PER_WORKER, store)
+    
+    def heartbeat_loop():
+        while True:
+            socketio.sleep(scaling.ADMISSION_HEARTBEAT_SECONDS)
+            admission.heartbeat()
+    
+    socketio.start_background_task(heartbeat_loop)
+    return admission
 
 
-def register_socketio_handlers(socketio, f1_timing):
-    """Register all SocketIO event handlers"""
+def register_socketio_handlers(socketio, f1_timing, admission=None, session_manager=None):
+    """Register all SocketIO event handlers.
+    
+    Race control and the per-client formats (subscriptions, delta,
+    MessagePack, replay cursors) act on f1_timing, the default session;
+    with a session manager, clients following another session get that
+    session's timing_update on request_data and an error for the formats.
+    """
+    cursor_pool = ReplayCursorPool(f1_timing, socketio)
+    admission = admission or ClientAdmission(config.Performance.MAX_CLIENTS)
+    connected_clients = admission.clients
+    
+    def followed_engine():
+        """Engine of the session this client follows (f1_timing without hosted sessions)"""
+        if session_manager is None:
+            return f1_timing
+        return session_manager.session_of_rooms(rooms())
+    
+    def in_default_session(error_event):
+        """Whether this client follows f1_timing; emits error_event when it does not"""
+        if followed_engine() is f1_timing:
+            return True
+        emit(error_event, {'error': True, 'message': 'Only available in the default session'})
+        return False
+    
+    def send_timing():
+        """Current timing snapshot to the requesting client in its negotiated encoding"""
+        engine = followed_engine()
+        if engine is None:
+            return
+        snapshot = engine.get_snapshot()
+        if engine is f1_timing and request.sid in f1_timing.binary_clients:
+            emit('timing_update_bin', snapshot.cached('msgpack', lambda: encode_msgpack(snapshot.payload)))
+        else:
+            emit('timing_update', snapshot)
+    
+    def requested_encoding(auth):
+        """Encoding asked for at connect (auth or query string), JSON unless msgpack is possible"""
+        encoding = (auth or {}).get('encoding') if isinstance(auth, dict) else None
+        encoding = encoding or request.args.get('encoding', 'json')
+        if encoding == 'msgpack' and config.Protocol.ALLOW_MSGPACK and msgpack_available():
+            return 'msgpack'
+        return 'json'
     
     @socketio.on('connect')
-    def handle_connect():
+    def handle_connect(auth=None):
         """Handle client connection with limits"""
-        max_clients_limit = config.Performance.MAX_CLIENTS
-        
-        if len(connected_clients) >= max_clients_limit:
-            print(f'Connection rejected: Maximum {max_clients_limit} clients reached')
+        if not admission.try_admit(request.sid):
+            print(f'Connection rejected: Maximum {admission.max_clients} clients reached')
             return False
         
-        connected_clients.add(request.sid)
         if config.Logging.SHOW_CLIENT_CONNECTIONS:
             print(f'Client connected. Total clients: {len(connected_clients)}')
         
+        # Clients start in this (the default) session; other sessions broadcast to their own rooms
+        if f1_timing.room is not None:
+            join_room(f1_timing.room)
+        
+        encoding = requested_encoding(auth)
+        if encoding == 'msgpack':
+            join_room(f1_timing.binary_room)
+            f1_timing.set_binary_encoding(request.sid, True)
+        emit('encoding', {'encoding': encoding})
+        
         # Send current data to newly connected client
-        current_data = f1_timing.get_current_data()
-        emit('timing_update', current_data)
+        send_timing()
 
     @socketio.on('disconnect')
     def handle_disconnect():
         """Handle client disconnection"""
-        connected_clients.discard(request.sid)
+        admission.release(request.sid)
+        cursor_pool.close(request.sid)
+        f1_timing.release_client(request.sid)
         if config.Logging.SHOW_CLIENT_CONNECTIONS:
             print(f'Client disconnected. Total clients: {len(connected_clients)}')
 
     @socketio.on('request_data')
     def handle_data_request():
         """Handle explicit data request from client"""
-        current_data = f1_timing.get_current_data()
-        emit('timing_update', current_data)
+        send_timing()
 
     @socketio.on('start_race')
     def handle_start_race():
         """Handle race start via WebSocket"""
         f1_timing.start_live_timing()
-        emit('race_status', {'status': 'started'}, broadcast=True)
+        emit('race_status', {'status': 'started'}, to=f1_timing.room, broadcast=True)
 
     @socketio.on('stop_race')
     def handle_stop_race():
         """Handle race stop via WebSocket"""
         f1_timing.stop_live_timing()
-        emit('race_status', {'status': 'stopped'}, broadcast=True)
+        emit('race_status', {'status': 'stopped'}, to=f1_timing.room, broadcast=True)
 
     @socketio.on('reset_race')
     def handle_reset_race():
         """Handle race reset via WebSocket"""
-        f1_timing.stop_live_timing()
-        f1_timing.current_time = f1_timing.race_start_time
-        f1_timing.current_rankings = []
-        current_data = f1_timing.get_current_data()
-        emit('timing_update', current_data, broadcast=True)
-        emit('race_status', {'status': 'reset'}, broadcast=True)
+        f1_timing.reset_race()
+        f1_timing.broadcast_current_data()
+        emit('race_status', {'status': 'reset'}, to=f1_timing.room, broadcast=True)
+
+    @socketio.on('seek')
+    def handle_seek(data):
+        """Handle a jump to a race time (seconds from start) via WebSocket"""
+        try:
+            race_seconds = f1_timing.seek(float(data.get('t')))
+            f1_timing.broadcast_current_data()
+            emit('race_status', {'status': 'seeked', 'race_time': race_seconds}, to=f1_timing.room, broadcast=True)
+        except Exception as e:
+            emit('seek_error', {'error': True, 'message': f'Error seeking: {str(e)}'})
+
+    def subscribe(key):
+        """Move this client into the room of one subscription and send its current subset"""
+        if not in_default_session('subscription_error'):
+            return
+        subscriptions = f1_timing.subscriptions
+        previous_room = subscriptions.subscribe(request.sid, key)
+        if previous_room:
+            leave_room(previous_room)
+        join_room(subscriptions.room(key))
+        emit('timing_update', filter_payload(f1_timing.get_current_data(), key))
+
+    @socketio.on('subscribe_cars')
+    def handle_subscribe_cars(data):
+        """Receive timing updates for the given cars only ({car_ids: [...]})"""
+        try:
+            car_ids = (data or {})['car_ids']
+            if not car_ids:
+                raise ValueError("car_ids must not be empty")
+            subscribe(cars_key(car_ids))
+        except Exception as e:
+            emit('subscription_error', {'error': True, 'message': f'Error subscribing: {str(e)}'})
+
+    @socketio.on('subscribe_positions')
+    def handle_subscribe_positions(data):
+        """Receive timing updates for positions start..start+count-1 only ({start, count})"""
+        try:
+            data = data or {}
+            subscribe(positions_key(data.get('start', 1), data.get('count', 5)))
+        except Exception as e:
+            emit('subscription_error', {'error': True, 'message': f'Error subscribing: {str(e)}'})
+
+    @socketio.on('unsubscribe')
+    def handle_unsubscribe(data=None):
+        """Back to the whole field"""
+        previous_room = f1_timing.subscriptions.unsubscribe(request.sid)
+        if previous_room:
+            leave_room(previous_room)
+        send_timing()
+
+    @socketio.on('subscribe_delta')
+    def handle_subscribe_delta(data=None):
+        """Receive timing_frame keyframes/deltas instead of full timing_update payloads"""
+        if not in_default_session('subscription_error'):
+            return
+        join_room(f1_timing.delta_room)
+        emit('timing_frame', f1_timing.subscribe_delta(request.sid))
+
+    @socketio.on('request_keyframe')
+    def handle_request_keyframe(data=None):
+        """Resync a delta client after a sequence gap"""
+        emit('timing_frame', f1_timing.delta_keyframe())
+
+    @socketio.on('unsubscribe_delta')
+    def handle_unsubscribe_delta(data=None):
+        """Back to full timing_update payloads"""
+        leave_room(f1_timing.delta_room)
+        f1_timing.unsubscribe_delta(request.sid)
+        send_timing()
+
+    def send_cursor_state(cursor):
+        """Cursor state and its current frame to the requesting client"""
+        emit('cursor_state', cursor.to_dict())
+        emit('timing_update', cursor_pool.frame_for(cursor))
+
+    @socketio.on('open_cursor')
+    def handle_open_cursor(data):
+        """Detach this client from the live broadcast with its own replay time and speed"""
+        if not in_default_session('cursor_error'):
+            return
+        try:
+            data = data or {}
+            cursor = cursor_pool.open(request.sid, data.get('t'), data.get('speed'))
+            send_cursor_state(cursor)
+        except Exception as e:
+            emit('cursor_error', {'error': True, 'message': f'Error opening cursor: {str(e)}'})
+
+    @socketio.on('cursor_seek')
+    def handle_cursor_seek(data):
+        """Move this client's replay cursor"""
+        try:
+            send_cursor_state(cursor_pool.seek(request.sid, float((data or {})['t'])))
+        except Exception as e:
+            emit('cursor_error', {'error': True, 'message': f'Error seeking cursor: {str(e)}'})
+
+    @socketio.on('cursor_speed')
+    def handle_cursor_speed(data):
+        """Change this client's playback speed"""
+        try:
+            send_cursor_state(cursor_pool.set_speed(request.sid, (data or {})['speed']))
+        except Exception as e:
+            emit('cursor_error', {'error': True, 'message': f'Error setting cursor speed: {str(e)}'})
+
+    @socketio.on('cursor_pause')
+    def handle_cursor_pause(data=None):
+        try:
+            send_cursor_state(cursor_pool.set_playing(request.sid, False))
+        except Exception as e:
+            emit('cursor_error', {'error': True, 'message': str(e)})
+
+    @socketio.on('cursor_play')
+    def handle_cursor_play(data=None):
+        try:
+            send_cursor_state(cursor_pool.set_playing(request.sid, True))
+        except Exception as e:
+            emit('cursor_error', {'error': True, 'message': str(e)})
+
+    @socketio.on('close_cursor')
+    def handle_close_cursor(data=None):
+        """Return this client to the live broadcast"""
+        cursor_pool.close(request.sid)
+        emit('cursor_closed', {})
+        send_timing()
 
     @socketio.on('request_forecast')
     def handle_forecast_request(data):
@@ -134,7 +319,7 @@ def register_socketio_handlers(socketio, f1_timing):
                     'status': 'success',
                     'simulation_speed': speed,
                     'message': f'Simulation speed set to {speed}x'
-                }, broadcast=True)
+                }, to=f1_timing.room, broadcast=True)
             else:
                 emit('speed_change_error', {
                     'message': f'Speed must be between {min_speed} and {max_speed}'
@@ -189,5 +374,102 @@ def register_socketio_handlers(socketio, f1_timing):
 
     return {
         'connected_clients': connected_clients,
-        'max_clients': max_clients
+        'max_clients': admission.max_clients,
+        'admission': admission,
+        'cursor_pool': cursor_pool
     }
+
+
+def register_worker_socketio_handlers(socketio, admission):
+    """Register the handlers of a web worker, which relays the engine's broadcasts.
+    
+    The engine process publishes timing updates through the message queue;
+    this worker only admits clients and answers them from the last
+    published payload. Per-client formats (delta, binary, subscriptions,
+    replay cursors) and race control stay with the engine process.
+    """
+    from core.session_manager import session_room
+    
+    manager = socketio.server.manager
+    default_room = session_room(config.Sessions.DEFAULT_SESSION_ID)
+    manager.timing_room = default_room
+    
+    def send_latest():
+        if manager.latest_timing is not None:
+            emit('timing_update', manager.latest_timing)
+    
+    @socketio.on('connect')
+    def handle_connect(auth=None):
+        """Handle client connection with limits shared across workers"""
+        if not admission.try_admit(request.sid):
+            print(f'Connection rejected: Maximum {admission.max_clients} clients reached')
+            return False
+        
+        if config.Logging.SHOW_CLIENT_CONNECTIONS:
+            print(f'Client connected. Worker clients: {len(admission.clients)}')
+        join_room(default_room)
+        emit('encoding', {'encoding': 'json'})
+        send_latest()
+
+    @socketio.on('disconnect')
+    def handle_disconnect():
+        """Handle client disconnection"""
+        admission.release(request.sid)
+        if config.Logging.SHOW_CLIENT_CONNECTIONS:
+            print(f'Client disconnected. Worker clients: {len(admission.clients)}')
+
+    @socketio.on('request_data')
+    def handle_data_request():
+        """Handle explicit data request from client"""
+        send_latest()
+
+
+def register_session_socketio_handlers(socketio, session_manager, cursor_pool=None):
+    """Register events for switching between hosted race sessions.
+    
+    A client follows one session at a time: joining a session leaves the
+    rooms of the one it followed (its delta, binary, subscription and replay
+    cursor state there included), so it never receives two sessions' frames.
+    """
+    
+    def leave_session_rooms(engine):
+        """Take this client out of every room of a session and drop its state there"""
+        for room in rooms():
+            if room == engine.room or room.startswith(f"{engine.room}:"):
+                leave_room(room)
+        engine.release_client(request.sid)
+        if cursor_pool is not None and engine is cursor_pool.engine:
+            cursor_pool.close(request.sid)
+    
+    def follow(engine):
+        join_room(engine.room)
+        emit('session_joined', {'session_id': engine.session_id, 'room': engine.room})
+        emit('timing_update', engine.get_snapshot())
+
+    @socketio.on('join_session')
+    def handle_join_session(data):
+        """Move this client to one session's room"""
+        session_id = str((data or {}).get('session_id', ''))
+        engine = session_manager.get_session(session_id)
+        if engine is None:
+            emit('session_error', {'error': True, 'message': f'Session {session_id} not found'})
+            return
+        
+        current = session_manager.session_of_rooms(rooms())
+        if current is not None and current is not engine:
+            leave_session_rooms(current)
+        follow(engine)
+
+    @socketio.on('leave_session')
+    def handle_leave_session(data):
+        """Leave one session; leaving any but the default session returns to the default one"""
+        session_id = str((data or {}).get('session_id', ''))
+        engine = session_manager.get_session(session_id)
+        if engine is None:
+            emit('session_error', {'error': True, 'message': f'Session {session_id} not found'})
+            return
+        
+        leave_session_rooms(engine)
+        emit('session_left', {'session_id': session_id})
+        if session_id != session_manager.default_session_id:
+            follow(session_manager.get_session(session_manager.default_session_id))